@@ -6,5 +6,11 @@ cd /app/models/db_schemes/minirag/
 alembic upgrade head
 cd /app
 
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    echo "Resetting Prometheus multiprocess directory..."
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 echo "Starting FastAPI server..."
-exec uvicorn main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
+exec "$@"
\ No newline at end of file
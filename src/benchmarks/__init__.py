@@ -0,0 +1,2 @@
+from .corpus import generate_documents, generate_queries
+from .stats import summarize_latencies, compare_results
@@ -0,0 +1,45 @@
+from typing import List
+import random
+
+VOCABULARY = (
+    "retrieval augmented generation embedding vector index search query answer document chunk "
+    "project asset model prompt context token latency throughput database postgres qdrant cosine "
+    "similarity neighbor graph cluster partition replica cache batch stream worker request response "
+    "language network training inference dataset feature layer attention transformer encoder decoder "
+    "gradient optimizer loss accuracy evaluation benchmark baseline regression metric histogram"
+).split()
+
+
+def generate_documents(count: int, words_per_document: int = 400, seed: int = 0) -> List[str]:
+    """
+    Generate deterministic synthetic documents, so runs on the same corpus size are comparable.
+
+    :param count: The number of documents.
+    :param words_per_document: The number of words in each document.
+    :param seed: The random seed.
+    :return: The documents text.
+    """
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        sentences = []
+        for _ in range(0, words_per_document, 12):
+            sentences.append(" ".join(rng.choices(VOCABULARY, k=12)).capitalize() + ".")
+        documents.append(" ".join(sentences))
+    return documents
+
+
+def generate_queries(count: int, words_per_query: int = 6, seed: int = 1) -> List[str]:
+    """
+    Generate deterministic synthetic questions over the corpus vocabulary.
+
+    :param count: The number of queries.
+    :param words_per_query: The number of words in each query.
+    :param seed: The random seed.
+    :return: The queries text.
+    """
+    rng = random.Random(seed)
+    return [
+        "What about " + " ".join(rng.choices(VOCABULARY, k=words_per_query)) + "?"
+        for _ in range(count)
+    ]
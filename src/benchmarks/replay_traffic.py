@@ -0,0 +1,187 @@
+"""
+Replay captured search/answer traffic against a running deployment.
+
+Reads the JSONL files written with TRAFFIC_CAPTURE_ENABLED and re-issues every
+request at its original offset from the first one, divided by `--speed`. The
+arrivals are open-loop: a request is sent when it is due whether or not the
+previous ones returned, so a slow target builds a backlog like in production.
+
+    python -m benchmarks.replay_traffic assets/traffic/capture-*.jsonl \\
+        --target http://localhost:8000 --speed 2 --output replay_results.json
+
+`--project-map 1:901,2:902` sends the requests of a project to another one.
+"""
+from .stats import summarize_latencies
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+
+def load_capture(paths: List[str], endpoints: List[str] = None) -> List[dict]:
+    """Load the captured requests of every file, ordered by timestamp."""
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if endpoints and record["endpoint"] not in endpoints:
+                    continue
+                records.append(record)
+    return sorted(records, key=lambda r: r["timestamp"])
+
+
+def build_schedule(records: List[dict], speed: float = 1.0, max_gap: float = None) -> List[float]:
+    """
+    The send offset (seconds from the replay start) of every request: the original
+    offsets divided by `speed`, with idle gaps capped to `max_gap` seconds.
+    """
+    offsets, offset = [], 0.0
+    for previous, record in zip([None] + records[:-1], records):
+        if previous is not None:
+            gap = (record["timestamp"] - previous["timestamp"]) / speed
+            offset += min(gap, max_gap) if max_gap is not None else gap
+        offsets.append(offset)
+    return offsets
+
+
+def request_url(record: dict, project_map: Dict[str, str]) -> str:
+    project_id = str(record["project_id"])
+    return record["endpoint"].replace("{project_id}", project_map.get(project_id, project_id))
+
+
+async def replay(records: List[dict], offsets: List[float], args) -> List[dict]:
+    import httpx
+
+    project_map = dict(pair.split(":", 1) for pair in args.project_map)
+    results = []
+
+    async def send(client, record, result):
+        started_at = time.perf_counter()
+        try:
+            response = await client.request(record["method"], request_url(record, project_map),
+                                            json=record["body"])
+            ok = response.status_code < 400
+            status_code = response.status_code
+        except httpx.HTTPError as e:
+            ok, status_code = False, type(e).__name__
+        result.update({
+            "latency": time.perf_counter() - started_at,
+            "ok": ok,
+            "status": status_code,
+        })
+
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout, limits=limits) as client:
+        tasks = []
+        replay_start = time.perf_counter()
+        for record, offset in zip(records, offsets):
+            delay = replay_start + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            result = {
+                "endpoint": record["endpoint"],
+                # how late the request left: a replay client too slow to keep up shows here
+                "send_lag": max(time.perf_counter() - replay_start - offset, 0.0),
+            }
+            results.append(result)
+            tasks.append(asyncio.create_task(send(client, record, result)))
+
+        await asyncio.gather(*tasks)
+        duration = time.perf_counter() - replay_start
+
+    for result in results:
+        result["duration"] = duration
+    return results
+
+
+def summarize(results: List[dict]) -> List[dict]:
+    """
+    Latency distribution and error rate per endpoint, plus all endpoints together.
+    The p*_ms percentiles cover the successful requests, error_p*_ms the failed ones.
+    """
+    if not results:
+        return []
+    duration = results[0]["duration"]
+
+    groups = {"*": results}
+    for result in results:
+        groups.setdefault(result["endpoint"], []).append(result)
+
+    rows = []
+    for endpoint, group in groups.items():
+        latencies = [r["latency"] for r in group if r["ok"]]
+        # timeouts and 5xx are often the slowest requests: reported apart, not dropped
+        error_latencies = [r["latency"] for r in group if not r["ok"]]
+        errors = len(error_latencies)
+        statuses = {}
+        for r in group:
+            if not r["ok"]:
+                statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+
+        error_summary = summarize_latencies(error_latencies, duration)
+        rows.append({
+            "endpoint": endpoint,
+            **summarize_latencies(latencies, duration, errors),
+            **{f"error_{k}": error_summary[k] for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms")},
+            "error_rate": round(errors / len(group), 4),
+            "error_statuses": statuses,
+            "max_send_lag_ms": round(max(r["send_lag"] for r in group) * 1000, 3),
+        })
+    return rows
+
+
+def format_row(row: dict) -> str:
+    return (f"{row['endpoint']:<40} n={row['requests']:<6} rps={row['throughput_rps']:<9} "
+            f"p50={row['p50_ms']}ms p95={row['p95_ms']}ms p99={row['p99_ms']}ms "
+            f"errors={row['error_rate']:.2%} error_p95={row['error_p95_ms']}ms "
+            f"send_lag<={row['max_send_lag_ms']}ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay captured search/answer traffic (open-loop).")
+    parser.add_argument("captures", nargs="+", help="capture JSONL files")
+    parser.add_argument("--target", default="http://localhost:8000", help="base url of the deployment")
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale, 2 replays twice as fast")
+    parser.add_argument("--max-gap", type=float, default=None, help="cap idle gaps to this many seconds")
+    parser.add_argument("--endpoints", type=lambda v: [e for e in v.split(",") if e], default=None,
+                        help="only replay these route templates")
+    parser.add_argument("--project-map", type=lambda v: [p for p in v.split(",") if p], default=[],
+                        help="old:new project ids, e.g. 1:901,2:902")
+    parser.add_argument("--limit", type=int, default=None, help="replay the first N requests only")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", default=None, help="write the summary as JSON")
+    args = parser.parse_args()
+
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    records = load_capture(args.captures, endpoints=args.endpoints)[:args.limit]
+    if not records:
+        print("No captured requests to replay")
+        return 1
+
+    offsets = build_schedule(records, speed=args.speed, max_gap=args.max_gap)
+    print(f"Replaying {len(records)} requests over {offsets[-1]:.1f}s against {args.target}", flush=True)
+
+    rows = summarize(asyncio.run(replay(records, offsets, args)))
+    for row in rows:
+        print(format_row(row))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"target": args.target, "speed": args.speed, "results": rows}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    return 1 if any(row["errors"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+End-to-end benchmark of /process, /index/push and /index/answer.
+
+Drives the FastAPI app in-process through httpx's ASGI transport with the FAKE
+LLM providers, so only the app, the database and the vector db are measured.
+Needs the Postgres configured in `.env`; use a disposable database, the
+benchmark projects are left in it.
+
+Run from `src/`:
+
+    python -m benchmarks.run_benchmarks --corpus-sizes 10,100 --concurrency 1,8,32 \\
+        --output benchmark_results.json --baseline benchmarks/baseline.json
+"""
+from .corpus import generate_documents, generate_queries
+from .stats import summarize_latencies, compare_results
+from typing import List
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+import uuid
+
+
+def configure_environment(args):
+    """
+    Point the settings at the fake providers; must run before the app is imported.
+    """
+    os.environ["GENERATION_BACKEND"] = "FAKE"
+    os.environ["EMBEDDING_BACKEND"] = "FAKE"
+    os.environ["FAKE_LLM_EMBEDDING_LATENCY_MS"] = str(args.embedding_latency_ms)
+    os.environ["FAKE_LLM_GENERATION_LATENCY_MS"] = str(args.generation_latency_ms)
+    os.environ["FAKE_LLM_ERROR_RATE"] = "0"
+    os.environ["VECTOR_DB_BACKEND"] = args.vector_db
+    os.environ["VECTOR_DB_PATH"] = f"benchmark_qdrant_{uuid.uuid4().hex[:8]}"
+    # the in-process transport bypasses the rate limits meant for real providers
+    os.environ["LLM_RATE_LIMITS"] = "{}"
+
+
+async def timed_request(client, method: str, url: str, **kwargs):
+    started_at = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return response, time.perf_counter() - started_at
+
+
+async def upload_corpus(client, project_id: int, documents: List[str]):
+    for i, document in enumerate(documents):
+        response = await client.post(
+            f"/api/v1/data/upload/{project_id}",
+            files={"file": (f"bench_doc_{i}.txt", document.encode("utf-8"), "text/plain")},
+        )
+        response.raise_for_status()
+
+
+async def run_sequential(client, scenario: str, corpus_size: int, repeats: int, method: str,
+                         url: str, **kwargs) -> dict:
+    latencies, errors = [], 0
+    started_at = time.perf_counter()
+    for _ in range(repeats):
+        response, latency = await timed_request(client, method, url, **kwargs)
+        if response.status_code == 200:
+            latencies.append(latency)
+        else:
+            errors += 1
+    duration = time.perf_counter() - started_at
+
+    return {
+        "scenario": scenario,
+        "corpus_size": corpus_size,
+        "concurrency": 1,
+        **summarize_latencies(latencies, duration, errors),
+    }
+
+
+async def run_concurrent(client, scenario: str, corpus_size: int, concurrency: int, requests: int,
+                         url: str, payloads: List[dict]) -> dict:
+    """
+    Send `requests` requests from `concurrency` workers, each one sending its next
+    request as soon as the previous one returns (closed-loop load).
+    """
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            response, latency = await timed_request(client, "POST", url, json=payloads[i % len(payloads)])
+            if response.status_code == 200:
+                latencies.append(latency)
+            else:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    duration = time.perf_counter() - started_at
+
+    return {
+        "scenario": scenario,
+        "corpus_size": corpus_size,
+        "concurrency": concurrency,
+        **summarize_latencies(latencies, duration, errors),
+    }
+
+
+async def run_benchmarks(args) -> List[dict]:
+    import httpx
+    from main import app
+    from controllers import ProjectController
+
+    results = []
+    project_ids = []
+    queries = generate_queries(max(args.answer_requests, 1), seed=args.seed + 1)
+    payloads = [{"text": q, "limit": args.limit} for q in queries]
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark",
+                                     timeout=args.timeout) as client:
+            for i, corpus_size in enumerate(args.corpus_sizes):
+                project_id = args.project_id_base + i
+                project_ids.append(project_id)
+
+                documents = generate_documents(corpus_size, words_per_document=args.words_per_document,
+                                               seed=args.seed)
+                await upload_corpus(client, project_id, documents)
+
+                results.append(await run_sequential(
+                    client, "process", corpus_size, args.repeats, "POST", f"/api/v1/data/process/{project_id}",
+                    json={"chunk_size": args.chunk_size, "overlap_size": args.overlap_size, "do_reset": 1},
+                ))
+                results.append(await run_sequential(
+                    client, "push", corpus_size, args.repeats, "POST", f"/api/v1/nlp/index/push/{project_id}",
+                    json={"do_reset": 1},
+                ))
+
+                for concurrency in args.concurrency:
+                    results.append(await run_concurrent(
+                        client, "answer", corpus_size, concurrency, args.answer_requests,
+                        f"/api/v1/nlp/index/answer/{project_id}", payloads,
+                    ))
+                    print(format_result(results[-1]), flush=True)
+
+        vector_db_path = ProjectController().get_database_path(os.environ["VECTOR_DB_PATH"])
+        shutil.rmtree(vector_db_path, ignore_errors=True)
+
+    files_dir = ProjectController().files_dir
+    for project_id in project_ids:
+        shutil.rmtree(os.path.join(files_dir, str(project_id)), ignore_errors=True)
+
+    return results
+
+
+def format_result(result: dict) -> str:
+    return (f"{result['scenario']:<8} corpus={result['corpus_size']:<6} c={result['concurrency']:<4} "
+            f"rps={result['throughput_rps']:<9} p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+            f"p99={result['p99_ms']}ms errors={result['errors']}")
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the RAG endpoints in-process.")
+    parser.add_argument("--corpus-sizes", type=parse_int_list, default=[10, 100], help="documents per corpus")
+    parser.add_argument("--concurrency", type=parse_int_list, default=[1, 8, 32], help="concurrent answer clients")
+    parser.add_argument("--answer-requests", type=int, default=200, help="answer requests per concurrency level")
+    parser.add_argument("--repeats", type=int, default=3, help="runs of /process and /index/push per corpus")
+    parser.add_argument("--words-per-document", type=int, default=400)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap-size", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=5, help="documents retrieved per answer")
+    parser.add_argument("--vector-db", choices=["QDRANT", "PGVECTOR"], default="QDRANT")
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--generation-latency-ms", type=float, default=0.0)
+    parser.add_argument("--project-id-base", type=int, default=900000, help="first project id used")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--output", default="benchmark_results.json", help="results JSON path")
+    parser.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative change counted as regression")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    results = asyncio.run(run_benchmarks(args))
+
+    report = {
+        "meta": {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "vector_db": args.vector_db,
+            "embedding_latency_ms": args.embedding_latency_ms,
+            "generation_latency_ms": args.generation_latency_ms,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline or not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    rows = compare_results(results, baseline["results"], tolerance=args.tolerance)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{flag:<10} {row['scenario']:<8} corpus={row['corpus_size']:<6} c={row['concurrency']:<4} "
+              f"{row['metric']:<15} {row['baseline']} -> {row['current']} ({row['change']:+.1%})")
+
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
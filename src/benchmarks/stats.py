@@ -0,0 +1,81 @@
+from typing import Dict, List
+import numpy as np
+
+# (metric, True when higher is better) checked against the baseline
+COMPARED_METRICS = [
+    ("throughput_rps", True),
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("p99_ms", False),
+]
+
+
+def summarize_latencies(latencies: List[float], duration: float, errors: int = 0) -> dict:
+    """
+    Summarize the latencies (seconds) of a load run.
+
+    :param latencies: The latency of every successful request.
+    :param duration: The wall-clock duration of the run in seconds.
+    :param errors: The number of failed requests.
+    :return: The throughput, error count and latency percentiles in milliseconds.
+    """
+    values = np.asarray(latencies, dtype=np.float64) * 1000.0
+    summary = {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(len(latencies) / duration, 3) if duration > 0 else 0.0,
+    }
+    if len(values) == 0:
+        return {**summary, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        **summary,
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def result_key(result: dict) -> tuple:
+    return result["scenario"], result["corpus_size"], result["concurrency"]
+
+
+def compare_results(current: List[dict], baseline: List[dict], tolerance: float = 0.2) -> List[Dict]:
+    """
+    Compare the results of a run against a stored baseline.
+
+    :param current: The results of the current run.
+    :param baseline: The baseline results.
+    :param tolerance: The relative change allowed before a metric counts as a regression.
+    :return: One row per compared metric, with its relative change and regression flag.
+    """
+    baseline_by_key = {result_key(r): r for r in baseline}
+
+    rows = []
+    for result in current:
+        reference = baseline_by_key.get(result_key(result))
+        if reference is None:
+            continue
+
+        for metric, higher_is_better in COMPARED_METRICS:
+            value, reference_value = result.get(metric), reference.get(metric)
+            if not value or not reference_value:
+                continue
+
+            change = (value - reference_value) / reference_value
+            regression = change < -tolerance if higher_is_better else change > tolerance
+            rows.append({
+                "scenario": result["scenario"],
+                "corpus_size": result["corpus_size"],
+                "concurrency": result["concurrency"],
+                "metric": metric,
+                "baseline": reference_value,
+                "current": value,
+                "change": round(change, 4),
+                "regression": regression,
+            })
+    return rows
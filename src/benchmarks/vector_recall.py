@@ -0,0 +1,268 @@
+"""
+Recall / latency / memory harness for the vector db providers.
+
+Loads a synthetic (clustered) or recorded embedding set into each provider,
+computes the exact top-k with NumPy, then sweeps the search settings and
+reports recall@k against QPS and storage size.
+
+Run from `src/` (PGVECTOR needs the Postgres configured in `.env`):
+
+    python -m benchmarks.vector_recall --sizes 10000,100000 --dim 384 \\
+        --backends QDRANT,PGVECTOR --pgvector-index-types hnsw,ivfflat \\
+        --ef-search 16,40,100 --probes 1,5,20
+
+Recorded embeddings can be given as .npy matrices with --vectors/--queries.
+
+Note: embedded Qdrant (path mode, as used by the app) always searches exactly,
+so its recall is 1.0 whatever `ef_search`; only its QPS and size are informative.
+"""
+from typing import List
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+
+
+def synthetic_embeddings(size: int, queries: int, dim: int, clusters: int = 64, seed: int = 0):
+    """
+    Generate clustered embeddings (closer to real ones than uniform noise) and
+    queries drawn from the same clusters.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+
+    def sample(n):
+        points = centers[rng.integers(0, clusters, size=n)]
+        return normalize(points + 0.35 * rng.normal(size=(n, dim)).astype(np.float32))
+
+    return sample(size), sample(queries)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, batch_size: int = 256) -> np.ndarray:
+    """Exact cosine top-k ids of every query, by brute force."""
+    ground_truth = []
+    for i in range(0, len(queries), batch_size):
+        scores = queries[i:i + batch_size] @ vectors.T
+        top = np.argpartition(-scores, kth=min(k, scores.shape[1] - 1), axis=1)[:, :k]
+        order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+        ground_truth.append(np.take_along_axis(top, order, axis=1))
+    return np.vstack(ground_truth)
+
+
+def recall_at_k(found: List[List[int]], ground_truth: np.ndarray, k: int) -> float:
+    hits = sum(len(set(ids[:k]) & set(truth[:k].tolist())) for ids, truth in zip(found, ground_truth))
+    return hits / (len(ground_truth) * k)
+
+
+def directory_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+async def load_collection(provider, collection_name: str, vectors: np.ndarray, batch_size: int = 500) -> float:
+    """Insert the vectors with their row number as text, so results map back to ids."""
+    await provider.create_collection(collection_name=collection_name, embedding_size=vectors.shape[1], do_reset=True)
+
+    started_at = time.perf_counter()
+    for i in range(0, len(vectors), batch_size):
+        batch = vectors[i:i + batch_size]
+        ids = list(range(i, i + len(batch)))
+        await provider.insert_many(
+            collection_name=collection_name,
+            texts=[str(j) for j in ids],
+            vectors=batch.tolist(),
+            metadata=None,
+            record_ids=ids,
+            batch_size=batch_size,
+        )
+    return time.perf_counter() - started_at
+
+
+async def measure_search(provider, collection_name: str, queries: np.ndarray, ground_truth: np.ndarray,
+                         k: int, **search_params) -> dict:
+    found = []
+    started_at = time.perf_counter()
+    for query in queries:
+        results = await provider.search_by_vector(collection_name=collection_name, vector=query.tolist(),
+                                                  limit=k, **search_params) or []
+        found.append([int(r.text) for r in results])
+    duration = time.perf_counter() - started_at
+
+    return {
+        "recall": round(recall_at_k(found, ground_truth, k), 4),
+        "qps": round(len(queries) / duration, 2) if duration > 0 else 0.0,
+        "mean_latency_ms": round(duration / len(queries) * 1000, 3),
+    }
+
+
+async def run_qdrant(vectors, queries, ground_truth, args) -> List[dict]:
+    from stores.vectordb.providers import QdrantDBProvider
+
+    path = tempfile.mkdtemp(prefix="recall_qdrant_")
+    provider = QdrantDBProvider(db_client=path, default_vector_size=vectors.shape[1], distance_method="cosine")
+    await provider.connect()
+
+    rows = []
+    try:
+        collection_name = f"recall_{len(vectors)}"
+        load_time = await load_collection(provider, collection_name, vectors)
+        size_bytes = directory_size(path)
+
+        for ef_search in args.ef_search or [None]:
+            rows.append({
+                "backend": "QDRANT",
+                "size": len(vectors),
+                "index": "embedded",
+                "ef_search": ef_search,
+                "probes": None,
+                "load_s": round(load_time, 3),
+                "index_s": 0.0,
+                "size_mb": round(size_bytes / 1048576, 2),
+                **await measure_search(provider, collection_name, queries, ground_truth, args.k,
+                                       ef_search=ef_search),
+            })
+    finally:
+        await provider.disconnect()
+        shutil.rmtree(path, ignore_errors=True)
+    return rows
+
+
+async def run_pgvector(vectors, queries, ground_truth, args) -> List[dict]:
+    from helpers import get_settings, create_db_engine
+    from stores.vectordb.providers import PGVectorProvider
+    from stores.vectordb.VectorDBEnums import PgVectorIndexTypeEnums
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.sql import text as sql_text
+
+    engine = create_db_engine(get_settings(), name="recall_benchmark")
+    db_client = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    # the index is built explicitly per sweep, never by the inserts
+    provider = PGVectorProvider(db_client=db_client, default_vector_size=vectors.shape[1],
+                                distance_method="cosine", index_threshold=len(vectors) + 1)
+    await provider.connect()
+
+    rows = []
+    collection_name = f"recall_{len(vectors)}"
+    try:
+        load_time = await load_collection(provider, collection_name, vectors)
+
+        for index_type in args.pgvector_index_types:
+            async with db_client() as session:
+                await session.execute(sql_text(f'DROP INDEX IF EXISTS {provider.default_index_name(collection_name)}'))
+                await session.commit()
+
+            index_time = 0.0
+            if index_type != "none":
+                provider.index_threshold = 0
+                started_at = time.perf_counter()
+                await provider.create_vector_index(collection_name=collection_name,
+                                                   index_type=PgVectorIndexTypeEnums(index_type).value)
+                index_time = time.perf_counter() - started_at
+
+            info = await provider.get_collection_info(collection_name=collection_name)
+            size_bytes = info["table_size_bytes"] if info else 0
+
+            if index_type == PgVectorIndexTypeEnums.HNSW.value:
+                sweep = [{"ef_search": ef} for ef in args.ef_search or [None]]
+            elif index_type == PgVectorIndexTypeEnums.IVFFLAT.value:
+                sweep = [{"probes": probes} for probes in args.probes or [None]]
+            else:
+                sweep = [{}]
+
+            for params in sweep:
+                rows.append({
+                    "backend": "PGVECTOR",
+                    "size": len(vectors),
+                    "index": index_type,
+                    "ef_search": params.get("ef_search"),
+                    "probes": params.get("probes"),
+                    "load_s": round(load_time, 3),
+                    "index_s": round(index_time, 3),
+                    "size_mb": round(size_bytes / 1048576, 2),
+                    **await measure_search(provider, collection_name, queries, ground_truth, args.k, **params),
+                })
+    finally:
+        await provider.delete_collection(collection_name=collection_name)
+        await engine.dispose()
+    return rows
+
+
+COLUMNS = ["backend", "size", "index", "ef_search", "probes", "recall", "qps", "mean_latency_ms",
+           "load_s", "index_s", "size_mb"]
+
+
+def format_table(rows: List[dict]) -> str:
+    widths = {c: max(len(c), *(len(str(r.get(c))) for r in rows)) for c in COLUMNS}
+    lines = ["  ".join(c.ljust(widths[c]) for c in COLUMNS)]
+    lines += ["  ".join(str(r.get(c)).ljust(widths[c]) for c in COLUMNS) for r in rows]
+    return "\n".join(lines)
+
+
+async def run(args) -> List[dict]:
+    if args.vectors:
+        recorded = normalize(np.load(args.vectors).astype(np.float32))
+        recorded_queries = normalize(np.load(args.queries).astype(np.float32)) if args.queries else None
+
+    rows = []
+    for size in args.sizes:
+        if args.vectors:
+            vectors = recorded[:size]
+            queries = recorded_queries[:args.query_count] if recorded_queries is not None else \
+                recorded[np.random.default_rng(args.seed).choice(len(recorded), args.query_count)]
+        else:
+            vectors, queries = synthetic_embeddings(size, args.query_count, args.dim, seed=args.seed)
+
+        ground_truth = exact_top_k(vectors, queries, args.k)
+
+        if "QDRANT" in args.backends:
+            rows.extend(await run_qdrant(vectors, queries, ground_truth, args))
+        if "PGVECTOR" in args.backends:
+            rows.extend(await run_pgvector(vectors, queries, ground_truth, args))
+
+    return rows
+
+
+def parse_list(cast):
+    return lambda value: [cast(v) for v in value.split(",") if v.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sweep recall@k against QPS and size per vector backend.")
+    parser.add_argument("--sizes", type=parse_list(int), default=[10000], help="collection sizes")
+    parser.add_argument("--dim", type=int, default=384, help="synthetic embedding size")
+    parser.add_argument("--query-count", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--backends", type=parse_list(str.upper), default=["QDRANT", "PGVECTOR"])
+    parser.add_argument("--pgvector-index-types", type=parse_list(str.lower), default=["none", "hnsw", "ivfflat"],
+                        help="'none' measures the exact sequential scan")
+    parser.add_argument("--ef-search", type=parse_list(int), default=[16, 40, 100, 200])
+    parser.add_argument("--probes", type=parse_list(int), default=[1, 5, 10, 20])
+    parser.add_argument("--vectors", default=None, help="recorded embeddings (.npy, N x dim)")
+    parser.add_argument("--queries", default=None, help="recorded query embeddings (.npy)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the rows as JSON")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args))
+    print(format_table(rows))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
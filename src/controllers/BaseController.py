@@ -8,6 +8,10 @@ class BaseController:
         self.settings = get_settings()
         self.base_dir = os.path.dirname(os.path.dirname(__file__))
         self.files_dir = os.path.join(self.base_dir, "assets/files")
+        # uploads stored once per content hash, shared by the projects
+        self.blobs_dir = os.path.join(self.files_dir, "blobs")
+        # text extracted from the blobs, per content hash and parser version
+        self.extracted_dir = os.path.join(self.files_dir, "extracted")
 
         self.database_dir = os.path.join(self.base_dir, "assets/database")
 
@@ -24,4 +28,10 @@ class BaseController:
         database_path = os.path.join(self.database_dir, db_name)
         if not os.path.exists(database_path):
             os.makedirs(database_path)
-        return database_path
\ No newline at end of file
+        return database_path
+
+    def get_blob_path(self, content_hash: str, file_ext: str = "") -> str:
+        """
+        Get the path of the blob holding the content with the given sha256
+        """
+        return os.path.join(self.blobs_dir, content_hash[:2], content_hash + file_ext)
@@ -2,11 +2,17 @@ from fastapi import UploadFile
 from .BaseController import BaseController
 from .ProjectController import ProjectController
 from models import ResponseSignal
+from typing import Optional, Tuple
+import aiofiles
+import hashlib
+import logging
 import random
 import string
 import os
 import re
 
+logger = logging.getLogger(__name__)
+
 class DataController(BaseController):
     def __init__(self):
         super().__init__()
@@ -15,12 +21,51 @@ class DataController(BaseController):
     def validate_uploaded_file(self, file:UploadFile):
         if file.content_type not in self.settings.FILE_ALLOWED_TYPES:
             return False, ResponseSignal.FILE_TYPE_NOT_SUPPORTED.value
-        
-        if file.size > self.settings.FILE_MAX_SIZE * self.size_scale:
-            return False, ResponseSignal.FILE_SIZE_EXCEEDED.value
-        
+
+        # the size limit is enforced on the bytes actually read, by `store_uploaded_file`
         return True, ResponseSignal.FILE_VALIDATED_SUCCESS.value
 
+    async def store_uploaded_file(self, file: UploadFile, chunk_size: int) -> Tuple[bool, str, Optional[str], int]:
+        """
+        Stream the upload into the blob store, hashing it on the way.
+
+        The content is written to a temporary file, then moved to its content-addressed
+        blob path, unless that blob already exists (a duplicate is never written twice).
+        Returns (is_valid, result_signal, content_hash, size).
+        """
+        max_size = self.settings.FILE_MAX_SIZE * self.size_scale
+        file_ext = os.path.splitext(self.get_clean_file_name(orig_file_name=file.filename))[-1]
+
+        tmp_dir = os.path.join(self.blobs_dir, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, self.generate_random_string(length=16))
+
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as f:
+                while chunk := await file.read(chunk_size):
+                    size += len(chunk)
+                    if size > max_size:
+                        return False, ResponseSignal.FILE_SIZE_EXCEEDED.value, None, size
+                    digest.update(chunk)
+                    await f.write(chunk)
+
+            content_hash = digest.hexdigest()
+            blob_path = self.get_blob_path(content_hash=content_hash, file_ext=file_ext)
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                # atomic: a concurrent upload of the same content writes the same bytes
+                os.replace(tmp_path, blob_path)
+        except Exception as e:
+            logger.error(f"Error while storing uploaded file: {e}")
+            return False, ResponseSignal.FILE_UPLOAD_FAILED.value, None, size
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return True, ResponseSignal.FILE_UPLOAD_SUCCESS.value, content_hash, size
+
     def generate_unique_filepath(self, orig_file_name: str, project_id: str):
 
         random_key = self.generate_random_string()
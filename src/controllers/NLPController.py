@@ -1,23 +1,81 @@
 from .BaseController import BaseController
+from helpers import current_project_id
 from models.db_schemes import Project, DataChunk
 from stores.llm.LLMEnums import DocumentTypeEnum
-from typing import List, Optional, Tuple
+from utils.retrieval import mmr_select, adaptive_cutoff
+from utils.metrics import RAG_STAGE_LATENCY, RAG_STAGE_COUNT
+from utils.tracing import start_span, set_span_error
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import hashlib
 import logging
 import json
+import time
 
 logger = logging.getLogger(__name__)
 
 class NLPController(BaseController):
-    def __init__(self, vectordb_client, generation_client, embedding_client, template_parser):
+    def __init__(self, vectordb_client, generation_client, embedding_client, template_parser,
+                    reranker_client=None):
         super().__init__()
         self.vectordb_client = vectordb_client
         self.generation_client = generation_client
         self.embedding_client = embedding_client
         self.template_parser = template_parser
+        self.reranker_client = reranker_client
+
+        # per-stage durations of this controller's calls, for the Server-Timing header
+        self.stage_timings: Dict[str, float] = {}
+
+    @contextmanager
+    def track_stage(self, stage: str, provider: str):
+        """
+        Time a pipeline stage into the stage histogram, `stage_timings` and a
+        "rag.<stage>" span. The yielded dict's "ok" flag can be cleared to count
+        the stage as failed.
+        """
+        outcome = {"ok": True}
+        labels = {"stage": stage, "provider": provider or "", "backend": self.settings.VECTOR_DB_BACKEND}
+        with start_span(f"rag.{stage}", **{f"rag.{k}": v for k, v in labels.items()},
+                        **{"project.id": current_project_id.get()}) as span:
+            started_at = time.perf_counter()
+            try:
+                yield outcome
+            except Exception:
+                outcome["ok"] = False
+                raise
+            finally:
+                duration = time.perf_counter() - started_at
+                self.stage_timings[stage] = self.stage_timings.get(stage, 0.0) + duration
+
+                RAG_STAGE_LATENCY.labels(**labels).observe(duration)
+                RAG_STAGE_COUNT.labels(**labels, status="ok" if outcome["ok"] else "error").inc()
+                if not outcome["ok"]:
+                    set_span_error(span, f"{stage} failed")
 
     def create_collection_name(self, project_id: str):
         return f"collection_{self.vectordb_client.default_vector_size}_{project_id}".strip()
     
+    def get_index_signature(self, processing_signature: Optional[str]) -> str:
+        """
+        Get the fingerprint of indexing an asset's chunks with the current embedding
+        model: an asset whose stored signature matches already has these vectors.
+        """
+        params = {
+            "processing_signature": processing_signature,
+            "embedding_model_id": self.embedding_client.embedding_model_id,
+            "embedding_size": self.embedding_client.embedding_size,
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+    async def delete_from_vector_db(self, project: Project, chunks_ids: List[int]) -> bool:
+        """Delete the vectors of the given chunks from the project collection."""
+        if not chunks_ids:
+            return True
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return await self.vectordb_client.delete_by_record_ids(collection_name=collection_name,
+                                                               record_ids=chunks_ids)
+
     async def reset_vector_db_collection(self, project: Project) -> bool:
         """Reset the vector db collection for the project."""
         collection_name = self.create_collection_name(project_id=project.project_id)
@@ -35,12 +93,13 @@ class NLPController(BaseController):
     async def index_into_vector_db(self, project: Project, chunks: List[DataChunk],
                             chunks_ids: List[int], do_reset: bool = False) -> bool:
         """Index the chunks into the vector db."""
+        project_token = current_project_id.set(project.project_id)
         try:
             collection_name = self.create_collection_name(project_id=project.project_id)
 
             texts = [chunk.chunk_text for chunk in chunks]
             metadata = [chunk.chunk_metadata for chunk in chunks]
-            vectors = self.embedding_client.embed_text(text=texts, 
+            vectors = await self.embedding_client.embed_text(text=texts, 
                                                     document_type=DocumentTypeEnum.DOCUMENT.value)
 
 
@@ -61,17 +120,22 @@ class NLPController(BaseController):
         except Exception as e:
             logger.error(f"Failed to index chunks into vector DB: {e}")
             return False
+        finally:
+            current_project_id.reset(project_token)
     
     async def search_vector_db_collection(self, project: Project, text: str, limit: int = 10) -> Optional[List]:
         """Search the vector db collection for the project."""
+        project_token = current_project_id.set(project.project_id)
         try:
             query_vector = None
             collection_name = self.create_collection_name(project_id=project.project_id)
             
-            vectors = self.embedding_client.embed_text(
-                text=text,
-                document_type=DocumentTypeEnum.QUERY.value
-            )
+            with self.track_stage("query_embed", provider=self.settings.EMBEDDING_BACKEND) as stage:
+                vectors = await self.embedding_client.embed_text(
+                    text=text,
+                    document_type=DocumentTypeEnum.QUERY.value
+                )
+                stage["ok"] = bool(vectors)
 
             if not vectors or len(vectors) == 0:
                 return False
@@ -82,61 +146,123 @@ class NLPController(BaseController):
             if not query_vector:
                 return False
             
-            results = await self.vectordb_client.search_by_vector(
-                collection_name=collection_name,
-                vector=query_vector,
-                limit=limit
-            )
-            return results if results else None
+            use_mmr = self.settings.RETRIEVAL_MMR_LAMBDA is not None
+            fetch_limit = limit * max(self.settings.RETRIEVAL_OVERFETCH_FACTOR, 1) if use_mmr else limit
+
+            ef_search = None
+            if self.reranker_client:
+                # cheap, wide ANN candidates: the reranker restores the precision
+                fetch_limit = max(fetch_limit, limit * max(self.settings.RERANKER_CANDIDATES_FACTOR, 1))
+                ef_search = self.settings.RERANKER_EF_SEARCH
+
+            with self.track_stage("vector_search", provider=self.settings.VECTOR_DB_BACKEND) as stage:
+                results = await self.vectordb_client.search_by_vector(
+                    collection_name=collection_name,
+                    vector=query_vector,
+                    limit=fetch_limit,
+                    with_vectors=use_mmr or self.reranker_client is not None,
+                    ef_search=ef_search,
+                    project_id=project.project_id
+                )
+                stage["ok"] = results is not False
+            if not results:
+                return None
+
+            if self.reranker_client:
+                results = await self.rerank_results(query=text, query_vector=query_vector,
+                                                    results=results, top_k=fetch_limit if use_mmr else limit)
+
+            return self.post_process_results(query_vector=query_vector, results=results, limit=limit)
         except Exception as e:
             logger.error(f"Failed to search vector DB: {e}")
             return None
+        finally:
+            current_project_id.reset(project_token)
         
     
         
-    async def answer_rag_question(self, project: Project, query: str, limit: int = 10):
-        
-        answer, full_prompt, chat_history = None, None, None
+    async def rerank_results(self, query: str, query_vector: list, results: List, top_k: int) -> List:
+        """Re-score the ANN candidates in one batched reranker call."""
+        with self.track_stage("rerank", provider=self.settings.RERANKER_BACKEND):
+            return await self.reranker_client.rerank(
+                query=query,
+                query_vector=query_vector,
+                documents=results,
+                top_k=top_k
+            )
+
+    def post_process_results(self, query_vector: list, results: List, limit: int) -> List:
+        """Diversify the retrieved documents with MMR, then apply the adaptive top-k cutoff."""
+        if self.settings.RETRIEVAL_MMR_LAMBDA is not None and all(r.vector for r in results):
+            selected = mmr_select(
+                query_vector=query_vector,
+                vectors=[r.vector for r in results],
+                k=limit,
+                lambda_mult=self.settings.RETRIEVAL_MMR_LAMBDA,
+                duplicate_threshold=self.settings.RETRIEVAL_DUPLICATE_THRESHOLD,
+            )
+            results = [results[i] for i in selected]
+        else:
+            results = results[:limit]
 
-        # step1: retrieve related documents
-        retrieved_documents = await self.search_vector_db_collection(
-            project=project,
-            text=query,
-            limit=limit,
+        kept = adaptive_cutoff(
+            scores=[r.score for r in results],
+            min_relative_score=self.settings.RETRIEVAL_MIN_RELATIVE_SCORE,
+            max_score_gap=self.settings.RETRIEVAL_MAX_SCORE_GAP,
+            min_results=self.settings.RETRIEVAL_MIN_RESULTS,
         )
+        return [results[i] for i in kept]
 
-        if not retrieved_documents or len(retrieved_documents) == 0:
-            return answer, full_prompt, chat_history
+    async def answer_rag_question(self, project: Project, query: str, limit: int = 10):
         
-        # step2: Construct LLM prompt
-        system_prompt = self.template_parser.get("rag", "system_prompt")
-
-        documents_prompts = "\n".join([
-            self.template_parser.get("rag", "document_prompt", {
-                    "doc_num": idx + 1,
-                    "chunk_text": self.generation_client.process_text(doc.text),
-            })
-            for idx, doc in enumerate(retrieved_documents)
-        ])
-
-        footer_prompt = self.template_parser.get("rag", "footer_prompt", {
-            "query": query
-        })
-
-        # step3: Construct Generation Client Prompts
-        chat_history = [
-            self.generation_client.construct_prompt(
-                prompt=system_prompt,
-                role=self.generation_client.enums.SYSTEM.value,
+        answer, full_prompt, chat_history = None, None, None
+        project_token = current_project_id.set(project.project_id)
+        try:
+            # step1: retrieve related documents
+            retrieved_documents = await self.search_vector_db_collection(
+                project=project,
+                text=query,
+                limit=limit,
             )
-        ]
 
-        full_prompt = "\n\n".join([ documents_prompts,  footer_prompt])
+            if not retrieved_documents or len(retrieved_documents) == 0:
+                return answer, full_prompt, chat_history
+        
+            # a local step, it has no provider
+            with self.track_stage("template_render", provider=None):
+                # step2: Construct LLM prompt
+                system_prompt = self.template_parser.get("rag", "system_prompt")
 
-        # step4: Retrieve the Answer
-        answer = self.generation_client.generate_text(
-            prompt=full_prompt,
-            chat_history=chat_history
-        )
+                documents_prompts = "\n".join([
+                    self.template_parser.get("rag", "document_prompt", {
+                            "doc_num": idx + 1,
+                            "chunk_text": self.generation_client.process_text(doc.text),
+                    })
+                    for idx, doc in enumerate(retrieved_documents)
+                ])
+
+                footer_prompt = self.template_parser.get("rag", "footer_prompt", {
+                    "query": query
+                })
+
+                # step3: Construct Generation Client Prompts
+                chat_history = [
+                    self.generation_client.construct_prompt(
+                        prompt=system_prompt,
+                        role=self.generation_client.enums.SYSTEM.value,
+                    )
+                ]
 
-        return answer, full_prompt, chat_history
+                full_prompt = "\n\n".join([ documents_prompts,  footer_prompt])
+
+            # step4: Retrieve the Answer
+            with self.track_stage("generation", provider=self.settings.GENERATION_BACKEND) as stage:
+                answer = await self.generation_client.generate_text(
+                    prompt=full_prompt,
+                    chat_history=chat_history
+                )
+                stage["ok"] = answer is not None
+
+            return answer, full_prompt, chat_history
+        finally:
+            current_project_id.reset(project_token)
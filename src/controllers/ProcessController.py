@@ -5,15 +5,36 @@ from langchain_community.document_loaders import TextLoader
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from dataclasses import dataclass
-from typing import List
+from functools import lru_cache
+from importlib import metadata
+from typing import List, Optional
+import gzip
+import hashlib
+import shutil
+import json
+import logging
 import os 
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class Document:
     page_content: str
     metadata: dict
 
+@lru_cache(maxsize=None)
+def get_library_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
 class ProcessController(BaseController):
+    # bump when the chunking output changes, so every asset is processed again
+    SPLITTER_VERSION = "simple-1"
+    # bump when the text extraction changes, so the cached extractions are not reused
+    PARSER_VERSION = "1"
+
     def __init__(self , project_id: str):
         super().__init__()
         self.project_id = project_id
@@ -25,12 +46,105 @@ class ProcessController(BaseController):
         """
         return os.path.splitext(file_id)[-1]
     
-    def get_file_loader(self, file_id: str):
+    def get_file_path(self, file_id: str, content_hash: str = None) -> str:
+        """
+        Get the path of an asset: its shared blob when it has a content hash,
+        else the file stored in the project directory.
+        """
+        if content_hash:
+            return self.get_blob_path(content_hash=content_hash, file_ext=self.get_file_extension(file_id=file_id))
+        return os.path.join(self.project_path, file_id)
+
+    def get_content_hash(self, file_id: str, content_hash: str = None) -> Optional[str]:
+        """
+        Get the sha256 of an asset's content, hashing the file of the assets stored
+        before the content-addressed uploads; None if the file is missing.
+        """
+        if content_hash:
+            return content_hash
+
+        file_path = self.get_file_path(file_id=file_id)
+        if not os.path.exists(file_path):
+            return None
+
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def store_file_as_blob(self, file_id: str) -> Optional[str]:
+        """
+        Copy the file of an asset stored before the content-addressed uploads into
+        the blob store (a hard link when possible), so it is hashed only once.
+        Blocking: run it in a thread. Returns the content hash, None if the file is missing.
+        """
+        content_hash = self.get_content_hash(file_id=file_id)
+        if content_hash is None:
+            return None
+
+        blob_path = self.get_file_path(file_id=file_id, content_hash=content_hash)
+        if os.path.exists(blob_path):
+            return content_hash
+
+        tmp_dir = os.path.join(self.blobs_dir, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, self.generate_random_string(length=16))
+        try:
+            try:
+                os.link(self.get_file_path(file_id=file_id), tmp_path)
+            except OSError:
+                shutil.copyfile(self.get_file_path(file_id=file_id), tmp_path)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(tmp_path, blob_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return content_hash
+
+    def remove_project_file(self, file_id: str):
+        """
+        Remove the project copy of an asset now served from its blob.
+        """
+        file_path = self.get_file_path(file_id=file_id)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def get_parser_version(self, file_id: str) -> Optional[str]:
+        """
+        Get the version of the text extraction of a file: the loader and the version
+        of the library it runs. None for the unsupported file types.
+        """
+        file_ext = self.get_file_extension(file_id=file_id)
+
+        if file_ext == ProcessingEnum.TXT.value:
+            return f"{self.PARSER_VERSION}-text"
+
+        if file_ext == ProcessingEnum.PDF.value:
+            return f"{self.PARSER_VERSION}-pymupdf-{get_library_version('pymupdf')}"
+
+        return None
+
+    def get_processing_signature(self, file_id: str, content_hash: str, chunk_size: int, overlap_size: int) -> str:
+        """
+        Get the fingerprint of processing a content with the given chunking parameters:
+        an asset whose stored signature matches already holds these chunks.
+        """
+        params = {
+            "content_hash": content_hash,
+            "chunk_size": chunk_size,
+            "overlap_size": overlap_size,
+            "splitter_version": self.SPLITTER_VERSION,
+            "parser_version": self.get_parser_version(file_id=file_id),
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get_file_loader(self, file_id: str, content_hash: str = None):
         """
         Get the file loader based on the file extension.
         """
         file_ext = self.get_file_extension(file_id=file_id)
-        file_path = os.path.join(self.project_path, file_id)
+        file_path = self.get_file_path(file_id=file_id, content_hash=content_hash)
 
         if not os.path.exists(file_path) :
             return None
@@ -43,14 +157,69 @@ class ProcessController(BaseController):
         
         return None
     
-    def get_file_content(self, file_id: str):
+    def get_extraction_path(self, content_hash: str, parser_version: str) -> str:
         """
-        Get the file content based on the file extension.
+        Get the path of the cached extraction of a content by a parser version.
         """
-        loader = self.get_file_loader(file_id=file_id)
-        if loader :
-            return loader.load()
-        return None
+        return os.path.join(self.extracted_dir, content_hash[:2], f"{content_hash}-{parser_version}.json.gz")
+
+    def load_extracted_content(self, extraction_path: str) -> Optional[List[Document]]:
+        """
+        Load the pages of a cached extraction, None if there is no usable one.
+        """
+        if not os.path.exists(extraction_path):
+            return None
+        try:
+            with gzip.open(extraction_path, "rt", encoding="utf-8") as f:
+                pages = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring the unreadable extraction {extraction_path}: {e}")
+            return None
+
+        return [Document(page_content=page["page_content"], metadata=page["metadata"]) for page in pages]
+
+    def store_extracted_content(self, extraction_path: str, file_content: list):
+        """
+        Cache the pages extracted from a file; written to a temporary file then
+        renamed, so concurrent runs never read a partial extraction.
+        """
+        pages = [{"page_content": rec.page_content, "metadata": rec.metadata} for rec in file_content]
+        tmp_path = f"{extraction_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(extraction_path), exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(pages, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, extraction_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache the extraction {extraction_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_file_content(self, file_id: str, content_hash: str = None):
+        """
+        Get the file content based on the file extension. The extracted pages are
+        cached per content hash and parser version, so re-chunking an asset does
+        not parse it again.
+        """
+        extraction_path = None
+        parser_version = self.get_parser_version(file_id=file_id)
+        if self.settings.FILE_EXTRACTION_CACHE_ENABLED and parser_version:
+            extraction_hash = self.get_content_hash(file_id=file_id, content_hash=content_hash)
+            if extraction_hash:
+                extraction_path = self.get_extraction_path(content_hash=extraction_hash,
+                                                           parser_version=parser_version)
+                file_content = self.load_extracted_content(extraction_path=extraction_path)
+                if file_content is not None:
+                    return file_content
+
+        loader = self.get_file_loader(file_id=file_id, content_hash=content_hash)
+        if not loader:
+            return None
+
+        file_content = loader.load()
+        if extraction_path:
+            self.store_extracted_content(extraction_path=extraction_path, file_content=file_content)
+        return file_content
     
     def perocess_file_content(self, file_content: list, file_id: str,
                             chunk_size: int=100, overlap_size: int=20):
@@ -1 +1,4 @@
-from .config import get_settings, Settings
\ No newline at end of file
+from .config import get_settings, Settings
+from .request_context import current_project_id, current_endpoint, track_request_endpoint
+from .database import (get_db_client, get_primary_db_client, RequestSessionFactory, create_db_engine,
+                       ReplicaRouter, create_replica_router)
\ No newline at end of file
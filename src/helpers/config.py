@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional,List
+from typing import Optional,List,Dict
 
 class Settings(BaseSettings):
     APP_NAME: str
@@ -9,6 +9,7 @@ class Settings(BaseSettings):
     FILE_ALLOWED_TYPES: str
     FILE_MAX_SIZE: int
     FILE_DEFULT_CHUNK_SIZE: int
+    FILE_EXTRACTION_CACHE_ENABLED: bool = True
     MONGODB_URL: str
     MONGODB_DATABASE: str
     POSTGRES_USERNAME: str
@@ -16,6 +17,18 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str
     POSTGRES_PORT: int
     POSTGRES_MAIN_DATABASE: str
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: float = 30
+    POSTGRES_POOL_RECYCLE: int = -1
+    POSTGRES_POOL_PRE_PING: bool = False
+    POSTGRES_STATEMENT_CACHE_SIZE: int = 100
+    POSTGRES_JIT: Optional[bool] = None
+    POSTGRES_REPLICA_HOSTS: List[str] = []
+    POSTGRES_REPLICA_MAX_LAG_SECONDS: float = 10.0
+    POSTGRES_REPLICA_CHECK_INTERVAL: float = 5.0
+    PROJECT_CACHE_TTL_SECONDS: int = 300
+    PROJECT_CACHE_MAX_SIZE: int = 10000
 
     GENERATION_BACKEND: str
     EMBEDDING_BACKEND: str
@@ -25,6 +38,31 @@ class Settings(BaseSettings):
     COHERE_API_KEY: str = None
     COHERE_API_URL: str = None
 
+    OLLAMA_API_URL: str = "http://localhost:11434"
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    OLLAMA_NUM_CTX: Optional[int] = None
+    OLLAMA_NUM_PARALLEL: int = 4
+    OLLAMA_EMBEDDING_BATCH_SIZE: int = 32
+    OLLAMA_REQUEST_TIMEOUT: float = 120.0
+
+    # e.g. {"OPENAI": {"requests_per_minute": 500, "tokens_per_minute": 200000}}
+    LLM_RATE_LIMITS: Dict[str, Dict[str, int]] = {}
+    LLM_RATE_LIMIT_PROJECT_WEIGHTS: Dict[str, float] = {}
+
+    # USD per million tokens by model id, e.g. {"gpt-4o-mini": {"prompt": 0.15, "completion": 0.6}}
+    LLM_TOKEN_PRICES: Dict[str, Dict[str, float]] = {}
+    LLM_USAGE_PERSIST: bool = True
+    LLM_USAGE_FLUSH_INTERVAL_SECONDS: float = 10.0
+    LLM_USAGE_BUCKET_SECONDS: int = 3600
+
+    FAKE_LLM_EMBEDDING_LATENCY_MS: float = 0.0
+    FAKE_LLM_GENERATION_LATENCY_MS: float = 0.0
+    FAKE_LLM_LATENCY_JITTER_MS: float = 0.0
+    FAKE_LLM_LATENCY_DISTRIBUTION: str = "constant"
+    FAKE_LLM_MAX_REQUESTS_PER_SECOND: Optional[float] = None
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_SEED: int = 0
+
     GENERATION_MODEL_ID_LITERAL: List[str] = None
     GENERATION_MODEL_ID: str = None
     EMBEDDING_MODEL_ID: str = None
@@ -33,11 +71,50 @@ class Settings(BaseSettings):
     GENERATION_DAFAULT_MAX_TOKENS: int = None
     GENERATION_DAFAULT_TEMPERATURE: float = None
     VECTOR_DB_PGVEC_INDEX_THRESHOLD: int = 100
+    VECTOR_DB_PGVEC_SHARED_TABLE: bool = False
+    VECTOR_DB_PGVEC_STORE_TEXT: bool = True
     VECTOR_DB_BACKEND_LITERAL: List[str] = None
     VECTOR_DB_BACKEND: str
     VECTOR_DB_PATH: str
     VECTOR_DB_DISTANCE_METHOD: str = None
 
+    RETRIEVAL_MMR_LAMBDA: Optional[float] = None
+    RETRIEVAL_OVERFETCH_FACTOR: int = 3
+    RETRIEVAL_DUPLICATE_THRESHOLD: Optional[float] = None
+    RETRIEVAL_MIN_RELATIVE_SCORE: Optional[float] = None
+    RETRIEVAL_MAX_SCORE_GAP: Optional[float] = None
+    RETRIEVAL_MIN_RESULTS: int = 1
+
+    RERANKER_BACKEND: Optional[str] = None
+    RERANKER_CANDIDATES_FACTOR: int = 4
+    RERANKER_EF_SEARCH: Optional[int] = None
+    RERANKER_LEXICAL_WEIGHT: float = 0.3
+
+    SERVER_TIMING_ENABLED: bool = False
+
+    PROFILING_ENABLED: bool = False
+    PROFILING_ADMIN_TOKEN: Optional[str] = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_DIR: str = "assets/profiles"
+    PROFILING_MAX_PROFILES: int = 200
+
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"
+    TRACING_OTLP_ENDPOINT: Optional[str] = None
+    TRACING_SERVICE_NAME: str = "minirag"
+    TRACING_SAMPLE_RATIO: float = 1.0
+
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 250.0
+    LOOP_MONITOR_BLOCK_THRESHOLD_MS: float = 100.0
+    LOOP_MONITOR_STACK_DEPTH: int = 20
+
+    TRAFFIC_CAPTURE_ENABLED: bool = False
+    TRAFFIC_CAPTURE_PATH: str = "assets/traffic/capture.jsonl"
+    TRAFFIC_CAPTURE_SAMPLE_RATE: float = 1.0
+    TRAFFIC_CAPTURE_REDACT_TEXT: bool = False
+
 
     PRIMARY_LANG: str = "en"
     DEFAULT_LANG: str = "en"
@@ -0,0 +1,223 @@
+from fastapi import Request
+from contextlib import asynccontextmanager
+from sqlalchemy import event, text as sql_text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from typing import Optional
+from utils.metrics import InstrumentedAsyncQueuePool, setup_db_metrics, DB_REPLICA_LAG
+from utils.tracing import setup_db_tracing
+from .config import Settings
+import asyncio
+import itertools
+import logging
+
+
+def create_db_engine(settings: Settings, host: str = None, port: int = None, name: str = "primary"):
+    """
+    Create the asyncpg engine with the pool and statement cache settings,
+    instrumented with the pool and query metrics (and query spans when tracing).
+    """
+    host = host or settings.POSTGRES_HOST
+    port = port or settings.POSTGRES_PORT
+    postgres_conn = (
+        f"postgresql+asyncpg://{settings.POSTGRES_USERNAME}:{settings.POSTGRES_PASSWORD}"
+        f"@{host}:{port}/{settings.POSTGRES_MAIN_DATABASE}"
+        f"?prepared_statement_cache_size={settings.POSTGRES_STATEMENT_CACHE_SIZE}"
+    )
+
+    server_settings = {"application_name": settings.APP_NAME}
+    if settings.POSTGRES_JIT is not None:
+        server_settings["jit"] = "on" if settings.POSTGRES_JIT else "off"
+
+    engine = create_async_engine(
+        postgres_conn,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.POSTGRES_POOL_SIZE,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+        pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+        connect_args={
+            "statement_cache_size": settings.POSTGRES_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    )
+    setup_db_metrics(engine, name=name)
+    setup_db_tracing(engine, name=name)
+    return engine
+
+
+class ReplicaRouter:
+    """
+    Session factory for read-only queries: hands out sessions on the read replicas
+    in round-robin, skipping the ones lagging more than `max_lag_seconds` behind,
+    and falls back to the primary when no replica is usable.
+    """
+
+    def __init__(self, primary_client: sessionmaker, replica_engines: dict,
+                 max_lag_seconds: float = 10.0, check_interval: float = 5.0):
+        self.primary_client = primary_client
+        self.replica_engines = replica_engines
+        self.replica_clients = {
+            name: sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            for name, engine in replica_engines.items()
+        }
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+
+        # replicas start as unusable until their first lag check
+        self.healthy = []
+        self.round_robin = itertools.count()
+        self.monitor_task = None
+
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def has_replicas(self) -> bool:
+        """Whether read replicas are configured; without any, every read goes to the primary."""
+        return bool(self.replica_clients)
+
+    def get_replica_client(self) -> Optional[sessionmaker]:
+        """The session factory of the next healthy replica, None when none is usable."""
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return self.replica_clients[healthy[next(self.round_robin) % len(healthy)]]
+
+    def get_read_client(self) -> sessionmaker:
+        return self.get_replica_client() or self.primary_client
+
+    def __call__(self):
+        return self.get_read_client()()
+
+    async def get_lag(self, name: str) -> float:
+        """
+        Get the replay lag of a replica in seconds; 0 when it has replayed everything
+        it received, so an idle primary does not make replicas look stale.
+        """
+        async with self.replica_clients[name]() as session:
+            result = await session.execute(sql_text(
+                'SELECT CASE '
+                'WHEN NOT pg_is_in_recovery() THEN 0 '
+                'WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+                'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+            ))
+            return float(result.scalar_one())
+
+    async def check_replicas(self):
+        healthy = []
+        for name in self.replica_clients:
+            try:
+                lag = await self.get_lag(name)
+            except Exception as e:
+                self.logger.warning(f"Read replica {name} is unreachable: {e}")
+                continue
+
+            DB_REPLICA_LAG.labels(engine=name).set(lag)
+            if lag <= self.max_lag_seconds:
+                healthy.append(name)
+            else:
+                self.logger.warning(f"Read replica {name} lags {lag:.1f}s behind, skipping it")
+
+        self.healthy = healthy
+
+    async def monitor(self):
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(self.check_interval)
+
+    async def start(self):
+        if self.replica_clients:
+            await self.check_replicas()
+            self.monitor_task = asyncio.create_task(self.monitor())
+
+    async def stop(self):
+        if self.monitor_task:
+            self.monitor_task.cancel()
+            self.monitor_task = None
+
+        for engine in self.replica_engines.values():
+            await engine.dispose()
+
+
+def create_replica_router(settings: Settings, primary_client: sessionmaker) -> Optional[ReplicaRouter]:
+    """
+    Create the read router over the `POSTGRES_REPLICA_HOSTS` engines ("host" or "host:port").
+
+    :return: None without replicas, reads then stay on the request session.
+    """
+    if not settings.POSTGRES_REPLICA_HOSTS:
+        return None
+
+    replica_engines = {}
+    for i, replica in enumerate(settings.POSTGRES_REPLICA_HOSTS or []):
+        host, _, port = replica.partition(":")
+        replica_engines[f"replica_{i}"] = create_db_engine(
+            settings, host=host, port=int(port) if port else None, name=f"replica_{i}"
+        )
+
+    return ReplicaRouter(
+        primary_client=primary_client,
+        replica_engines=replica_engines,
+        max_lag_seconds=settings.POSTGRES_REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.POSTGRES_REPLICA_CHECK_INTERVAL,
+    )
+
+
+class RequestSessionFactory:
+    """
+    Session factory handing out the same AsyncSession on every call, so all the
+    models used by one request share a single session (and pool checkout).
+    The session is closed by `get_db_client` when the request ends.
+
+    `reader()` hands out a replica session for read-only queries, until the
+    request writes something: from then on reads stay on the primary session
+    so the request sees its own writes. Without a healthy replica it hands out
+    the request session too, never a second primary connection. The replica is
+    picked once per request, its reads see a single replication point.
+    """
+
+    def __init__(self, session: AsyncSession, read_client: ReplicaRouter = None):
+        self.session = session
+        self.read_client = read_client
+        self.replica_client = None
+        self.has_written = False
+
+        event.listen(self.session.sync_session, "after_flush", self.mark_written)
+
+    def mark_written(self, *args):
+        self.has_written = True
+
+    @asynccontextmanager
+    async def __call__(self):
+        yield self.session
+
+    @asynccontextmanager
+    async def reader(self):
+        if self.replica_client is None and self.read_client is not None and self.read_client.has_replicas:
+            self.replica_client = self.read_client.get_replica_client()
+
+        if self.replica_client is None or self.has_written:
+            yield self.session
+            return
+
+        async with self.replica_client() as session:
+            yield session
+
+
+async def get_db_client(request: Request):
+    """
+    FastAPI dependency providing a request-scoped session factory for the models.
+    """
+    async with request.app.db_client() as session:
+        yield RequestSessionFactory(session, read_client=getattr(request.app, "db_read_client", None))
+
+
+async def get_primary_db_client(request: Request):
+    """
+    FastAPI dependency like `get_db_client` with every read on the primary session,
+    for the routes writing from what they read (upload, process, push): a lagging
+    replica would hide the rows they just wrote or are about to mark as done.
+    """
+    async with request.app.db_client() as session:
+        yield RequestSessionFactory(session)
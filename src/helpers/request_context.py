@@ -0,0 +1,17 @@
+from contextvars import ContextVar
+from fastapi import Request
+
+# Project served by the current request, used to attribute provider calls.
+current_project_id: ContextVar = ContextVar("current_project_id", default=None)
+
+# Route template (e.g. /api/v1/nlp/index/answer/{project_id}) of the current request.
+current_endpoint: ContextVar = ContextVar("current_endpoint", default=None)
+
+
+async def track_request_endpoint(request: Request):
+    """
+    App-wide FastAPI dependency setting `current_endpoint`. Async, so it runs in
+    the endpoint's context and the value is visible to the provider calls.
+    """
+    route = request.scope.get("route")
+    current_endpoint.set(getattr(route, "path", None))
@@ -1,14 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from contextlib import asynccontextmanager
-from routes import base, data, nlp
-from helpers import get_settings
+from routes import base, data, nlp, admin
+from helpers import get_settings, create_db_engine, create_replica_router, track_request_endpoint
 import logging
 from stores.llm.LLMProviderFactory import LLMProviderFactory
+from stores.llm.LLMUsageTracker import LLMUsageTracker
+from models import LLMUsageModel
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
+from stores.reranker.RerankerProviderFactory import RerankerProviderFactory
 from stores.llm.templates.template_parser import TemplateParser
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
-from utils.metrics import setup_metrics
+from utils.metrics import setup_metrics, mark_metrics_process_dead
+from utils.profiling import setup_profiling
+from utils.tracing import setup_tracing, shutdown_tracing
+from utils.loop_monitor import create_loop_monitor
+from utils.traffic_capture import setup_traffic_capture
 
 
 logging.basicConfig(level=logging.INFO)
@@ -18,20 +25,40 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     settings = get_settings()
     try:
+        # Watch the event loop for blocking calls (optional)
+        app.loop_monitor = create_loop_monitor(settings)
+        if app.loop_monitor:
+            await app.loop_monitor.start()
+
         # Initialize client and database connections
-        postgres_conn = f"postgresql+asyncpg://{settings.POSTGRES_USERNAME}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_MAIN_DATABASE}"
-        app.db_engine = create_async_engine(postgres_conn)
+        app.db_engine = create_db_engine(settings)
         app.db_client = sessionmaker(
             app.db_engine, class_=AsyncSession, expire_on_commit=False
         )
+
+        # Read-only queries go to the replicas (primary when none is healthy), None without replicas
+        app.db_read_client = create_replica_router(settings, primary_client=app.db_client)
+        if app.db_read_client:
+            await app.db_read_client.start()
         
+        # Token usage accounting, persisted in batches by a background task
+        app.usage_tracker = LLMUsageTracker(
+            usage_model=LLMUsageModel(db_client=app.db_client) if settings.LLM_USAGE_PERSIST else None,
+            token_prices=settings.LLM_TOKEN_PRICES,
+            flush_interval=settings.LLM_USAGE_FLUSH_INTERVAL_SECONDS,
+            bucket_seconds=settings.LLM_USAGE_BUCKET_SECONDS,
+        )
+        await app.usage_tracker.start()
+
         # Initialize factories
-        llm_provider_factory = LLMProviderFactory(settings)
-        vector_db_provider_factory = VectorDBProviderFactory(settings, db_client=app.db_client)
+        llm_provider_factory = LLMProviderFactory(settings, usage_tracker=app.usage_tracker)
+        vector_db_provider_factory = VectorDBProviderFactory(settings, db_client=app.db_client,
+                                                             read_db_client=app.db_read_client)
 
         # Initialize LLM clients
         app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND)
         app.generation_client.set_generation_model(model_id=settings.GENERATION_MODEL_ID)
+        await app.generation_client.connect()
         logger.info("Generation client initialized: %s", settings.GENERATION_BACKEND)
 
         app.embedding_client = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND)
@@ -39,11 +66,17 @@ async def lifespan(app: FastAPI):
             model_id=settings.EMBEDDING_MODEL_ID,
             embedding_size=settings.EMBEDDING_MODEL_SIZE
         )
+        await app.embedding_client.connect()
         
         # Initialize vector DB client
         app.vectordb_client = vector_db_provider_factory.create(provider=settings.VECTOR_DB_BACKEND)
         await app.vectordb_client.connect()
 
+        # Initialize reranker (optional)
+        app.reranker_client = RerankerProviderFactory(settings).create(provider=settings.RERANKER_BACKEND)
+        if app.reranker_client:
+            logger.info("Reranker initialized: %s", settings.RERANKER_BACKEND)
+
         # Initialize template parser
         app.template_parser = TemplateParser(
             language=settings.PRIMARY_LANG,
@@ -54,18 +87,39 @@ async def lifespan(app: FastAPI):
         logger.error("Service initialization failed: %s", e)
         raise
     yield 
+    await app.usage_tracker.stop()
+    if app.db_read_client:
+        await app.db_read_client.stop()
     await app.db_engine.dispose()     
     await app.vectordb_client.disconnect()
     logger.info("Vector DB connection closed")
+    await app.generation_client.disconnect()
+    await app.embedding_client.disconnect()
+    logger.info("LLM clients closed")
+    if app.loop_monitor:
+        await app.loop_monitor.stop()
+    mark_metrics_process_dead()
+    shutdown_tracing(app)
         
-app = FastAPI(lifespan=lifespan)
+# the route of each request is needed to attribute the LLM usage
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(track_request_endpoint)])
 
 # Setup Prometheus metrics
 setup_metrics(app)
 
+# Setup on-demand request profiling (no-op unless enabled)
+setup_profiling(app, get_settings())
+
+# Setup search/answer traffic capture for replay (no-op unless enabled)
+setup_traffic_capture(app, get_settings())
+
+# Setup OpenTelemetry tracing (no-op unless enabled)
+setup_tracing(app, get_settings())
+
 
 app.include_router(base.base_router)
 app.include_router(data.data_router)
 app.include_router(nlp.nlp_router)
+app.include_router(admin.admin_router)
 
 
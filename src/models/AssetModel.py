@@ -1,13 +1,17 @@
 from .BaseDataModel import BaseDataModel
+from .ProjectStatsModel import ProjectStatsModel
 from .db_schemes import Asset
 from .enums.DataBaseEnum import DataBaseEnum
 from bson import ObjectId
 from sqlalchemy.future import select
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 
 class AssetModel(BaseDataModel):
     def __init__(self, db_client):
         super().__init__(db_client=db_client)
         self.db_client = db_client
+        self.project_stats_model = ProjectStatsModel(db_client=db_client)
 
 
     @classmethod
@@ -16,30 +20,130 @@ class AssetModel(BaseDataModel):
         return instance
     
 
-    async def create_asset(self, asset: Asset) -> str:
+    async def create_asset(self, asset: Asset) -> Asset:
+        """
+        Insert an asset; when a concurrent upload already stored the same content
+        in the project (unique content hash), return that asset instead.
+        """
         async with self.db_client() as session:
-            async with session.begin():
-                session.add(asset)
+            try:
+                # a savepoint, the request session stays usable after a conflict
+                async with session.begin_nested():
+                    session.add(asset)
+                    await self.project_stats_model.increment_stats(session, asset.asset_project_id,
+                                                                   asset_count=1, asset_bytes=asset.asset_size)
+            except IntegrityError:
+                if asset.asset_content_hash is None:
+                    raise
+                return await self.get_asset_by_content_hash(
+                    asset_project_id=asset.asset_project_id,
+                    content_hash=asset.asset_content_hash
+                )
             await session.commit()
             await session.refresh(asset)
         return asset
     
+    @staticmethod
+    def get_all_project_assets_query(asset_project_id: int, asset_type: str):
+        return select(Asset).where(
+            Asset.asset_project_id == asset_project_id,
+            Asset.asset_type == asset_type
+        )
+
+    @staticmethod
+    def get_asset_record_query(asset_project_id: int, asset_name: str):
+        return select(Asset).where(
+            Asset.asset_project_id == asset_project_id,
+            Asset.asset_name == asset_name
+        )
+
+    @staticmethod
+    def get_asset_by_content_hash_query(asset_project_id: int, content_hash: str):
+        return select(Asset).where(
+            Asset.asset_project_id == asset_project_id,
+            Asset.asset_content_hash == content_hash
+        )
+
     async def get_all_project_assets(self, asset_project_id: str, asset_type: str) -> list:
-        async with self.db_client() as session:
-            stmt = select(Asset).where(
-                Asset.asset_project_id == asset_project_id,
-                Asset.asset_type == asset_type
-            )
-            result = await session.execute(stmt)
+        async with self.read_client() as session:
+            result = await session.execute(self.get_all_project_assets_query(
+                asset_project_id=asset_project_id,
+                asset_type=asset_type
+            ))
             records = result.scalars().all()
         return records
     
     async def get_asset_record(self, asset_project_id: str, asset_name: str)-> Asset:
+        async with self.read_client() as session:
+            result = await session.execute(self.get_asset_record_query(
+                asset_project_id=asset_project_id,
+                asset_name=asset_name
+            ))
+            record = result.scalar_one_or_none()
+        return record
+
+    async def get_asset_by_content_hash(self, asset_project_id: str, content_hash: str) -> Asset:
+        # decides whether an upload is inserted, so read on the primary: a lagging
+        # replica would miss an asset just created
         async with self.db_client() as session:
-            stmt = select(Asset).where(
-                Asset.asset_project_id == asset_project_id,
-                Asset.asset_name == asset_name
-            )
-            result = await session.execute(stmt)
+            result = await session.execute(self.get_asset_by_content_hash_query(
+                asset_project_id=asset_project_id,
+                content_hash=content_hash
+            ))
             record = result.scalar_one_or_none()
         return record
+
+    async def update_asset_signatures(self, asset_ids: list, **signatures):
+        """
+        Set the signature columns (e.g. asset_index_signature=...) of the given assets.
+        """
+        if not asset_ids:
+            return
+        async with self.db_client() as session:
+            await session.execute(
+                update(Asset).where(Asset.asset_id.in_(asset_ids)).values(**signatures)
+            )
+            await session.commit()
+
+    async def set_asset_content_hash(self, asset_id: int, content_hash: str) -> bool:
+        """
+        Record the content hash of an asset stored before the content-addressed uploads.
+
+        :return: False if the project already has an asset with this content.
+        """
+        async with self.db_client() as session:
+            try:
+                # a savepoint, the request session stays usable after a conflict
+                async with session.begin_nested():
+                    await session.execute(
+                        update(Asset).where(Asset.asset_id == asset_id).values(asset_content_hash=content_hash)
+                    )
+            except IntegrityError:
+                return False
+            await session.commit()
+        return True
+
+    async def update_index_signatures(self, index_signatures: dict, batch_size: int = 1000):
+        """
+        Set the index signature of many assets (asset id -> signature), batched by primary key.
+        """
+        rows = [
+            {"asset_id": asset_id, "asset_index_signature": signature}
+            for asset_id, signature in index_signatures.items()
+        ]
+        async with self.db_client() as session:
+            for i in range(0, len(rows), batch_size):
+                await session.execute(update(Asset), rows[i:i+batch_size])
+            await session.commit()
+
+    async def reset_project_signatures(self, asset_project_id: int):
+        """
+        Forget the processing and index signatures of a project's assets, so the
+        next runs process and index all of them again.
+        """
+        async with self.db_client() as session:
+            await session.execute(
+                update(Asset).where(Asset.asset_project_id == asset_project_id)
+                .values(asset_processing_signature=None, asset_index_signature=None)
+            )
+            await session.commit()
@@ -4,4 +4,6 @@ from pydantic import BaseModel, Field
 class BaseDataModel:
     def __init__(self,db_client : object):
         self.db_client = db_client
+        # request-scoped factories route read-only queries to the replicas
+        self.read_client = getattr(db_client, "reader", db_client)
         self.app_settings = get_settings()
\ No newline at end of file
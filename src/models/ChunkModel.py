@@ -1,67 +1,213 @@
 from .BaseDataModel import BaseDataModel
+from .ProjectStatsModel import ProjectStatsModel
 from .db_schemes import DataChunk
 from .enums.DataBaseEnum import DataBaseEnum
 from bson.objectid import ObjectId
 from pymongo import InsertOne
 from sqlalchemy.future import select
-from sqlalchemy import func, delete
+from sqlalchemy import text as sql_text, delete, func
+from sqlalchemy.exc import IntegrityError
+from collections import defaultdict
+
+# lock wait allowed to the creation of a chunks partition
+PARTITION_LOCK_TIMEOUT = "10s"
 
 class ChunkModel(BaseDataModel):
+    # chunks is LIST partitioned by project; partitions known to exist in this process,
+    # a hint only: the inserts create a partition dropped since then (see flush_chunks)
+    known_partitions = set()
 
     def __init__(self, db_client: object):
         super().__init__(db_client=db_client)
         self.db_client = db_client
+        self.project_stats_model = ProjectStatsModel(db_client=db_client)
 
     @classmethod
     async def create_instance(cls, db_client: object):
         instance = cls(db_client)
         return instance
 
+    def partition_name(self, project_id: int) -> str:
+        return f"{DataBaseEnum.CHUNK_PARTITION_PREFIX.value}{int(project_id)}"
+
+    async def ensure_project_partition(self, project_id: int, refresh: bool = False):
+        """
+        Create the chunks partition of a project if it does not exist yet.
+
+        The partition is created on a connection of its own and committed there, the
+        request session and its pending writes are left alone. `refresh` bypasses
+        `known_partitions`, for an insert that found the partition missing.
+
+        The table is created apart then attached: ATTACH PARTITION locks `chunks` in
+        SHARE UPDATE EXCLUSIVE mode, which the open transaction of the request session
+        (its reads, or the deletes of `replace_asset_chunks`) does not conflict with.
+        CREATE TABLE ... PARTITION OF needs ACCESS EXCLUSIVE and would wait on it forever.
+        """
+        if project_id in ChunkModel.known_partitions and not refresh:
+            return
+
+        partition_name = self.partition_name(project_id)
+        parent_name = DataBaseEnum.COLLECTION_CHUNK_NAME.value
+        async with self.db_client() as session:
+            engine = session.bind
+
+        async with engine.begin() as connection:
+            # fail instead of queueing every query on chunks behind a stuck DDL
+            await connection.execute(sql_text(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'"))
+            # serialize concurrent creations of the same partition
+            await connection.execute(sql_text('SELECT pg_advisory_xact_lock(hashtext(:name))'),
+                                     {"name": partition_name})
+
+            result = await connection.execute(sql_text('SELECT to_regclass(:name)'), {"name": partition_name})
+            if result.scalar_one() is None:
+                await connection.execute(sql_text(
+                    f'CREATE TABLE {partition_name} (LIKE {parent_name} INCLUDING DEFAULTS)'
+                ))
+                await connection.execute(sql_text(
+                    f'ALTER TABLE {parent_name} ATTACH PARTITION {partition_name} '
+                    f'FOR VALUES IN ({int(project_id)})'
+                ))
+
+        ChunkModel.known_partitions.add(project_id)
+
+    @staticmethod
+    def is_missing_partition_error(error: IntegrityError) -> bool:
+        # check_violation raised by an insert routed to no partition
+        return (getattr(error.orig, "sqlstate", None) == "23514"
+                and "no partition of relation" in str(error.orig))
+
+    async def flush_chunks(self, session, chunks: list, batch_size: int = 100):
+        """
+        Insert the chunks in batches within a savepoint. A partition dropped since it
+        was cached in `known_partitions` is created again and the insert retried once.
+        """
+        for attempt in range(2):
+            try:
+                async with session.begin_nested():
+                    for i in range(0, len(chunks), batch_size):
+                        session.add_all(chunks[i:i+batch_size])
+                        await session.flush()
+                return
+            except IntegrityError as e:
+                if attempt or not self.is_missing_partition_error(e):
+                    raise
+                for project_id in {chunk.chunk_project_id for chunk in chunks}:
+                    await self.ensure_project_partition(project_id, refresh=True)
+
+    async def increment_chunk_stats(self, session, chunks: list):
+        deltas = defaultdict(lambda: [0, 0])
+        for chunk in chunks:
+            deltas[chunk.chunk_project_id][0] += 1
+            deltas[chunk.chunk_project_id][1] += len(chunk.chunk_text.encode("utf-8"))
+
+        for project_id, (chunk_count, chunk_bytes) in deltas.items():
+            await self.project_stats_model.increment_stats(session, project_id,
+                                                           chunk_count=chunk_count, chunk_bytes=chunk_bytes)
+
     async def create_chunk(self, chunk: DataChunk):
+        await self.ensure_project_partition(chunk.chunk_project_id)
 
         async with self.db_client() as session:
-            async with session.begin():
-                session.add(chunk)
+            await self.flush_chunks(session, [chunk])
+            await self.increment_chunk_stats(session, [chunk])
             await session.commit()
             await session.refresh(chunk)
         return chunk
 
+    @staticmethod
+    def get_chunk_query(chunk_id: int):
+        return select(DataChunk).where(DataChunk.chunk_id == chunk_id)
+
     async def get_chunk(self, chunk_id: str):
 
-        async with self.db_client() as session:
-            result = await session.execute(select(DataChunk).where(DataChunk.chunk_id == chunk_id))
+        async with self.read_client() as session:
+            result = await session.execute(self.get_chunk_query(chunk_id=chunk_id))
             chunk = result.scalar_one_or_none()
         return chunk
 
     async def insert_many_chunks(self, chunks: list, batch_size: int=100):
+        for project_id in {chunk.chunk_project_id for chunk in chunks}:
+            await self.ensure_project_partition(project_id)
 
         async with self.db_client() as session:
-            async with session.begin():
-                for i in range(0, len(chunks), batch_size):
-                    batch = chunks[i:i+batch_size]
-                    session.add_all(batch)
+            await self.flush_chunks(session, chunks, batch_size=batch_size)
+            await self.increment_chunk_stats(session, chunks)
             await session.commit()
         return len(chunks)
 
+    async def get_asset_chunk_ids(self, project_id: int, asset_id: int) -> list:
+        async with self.read_client() as session:
+            result = await session.execute(
+                select(DataChunk.chunk_id)
+                .where(DataChunk.chunk_project_id == project_id, DataChunk.chunk_asset_id == asset_id)
+            )
+            return result.scalars().all()
+
+    async def replace_asset_chunks(self, project_id: int, asset_id: int, chunks: list, batch_size: int=100):
+        """
+        Replace the chunks of an asset by `chunks` in one transaction, keeping the
+        project stats in step.
+
+        :return: The ids of the deleted chunks, whose vectors are now stale.
+        """
+        await self.ensure_project_partition(project_id)
+
+        async with self.db_client() as session:
+            result = await session.execute(
+                delete(DataChunk)
+                .where(DataChunk.chunk_project_id == project_id, DataChunk.chunk_asset_id == asset_id)
+                .returning(DataChunk.chunk_id, func.octet_length(DataChunk.chunk_text))
+            )
+            deleted = result.all()
+            if deleted:
+                await self.project_stats_model.increment_stats(
+                    session, project_id,
+                    chunk_count=-len(deleted), chunk_bytes=-sum(size for _, size in deleted)
+                )
+
+            await self.flush_chunks(session, chunks, batch_size=batch_size)
+            await self.increment_chunk_stats(session, chunks)
+            await session.commit()
+
+        return [chunk_id for chunk_id, _ in deleted]
+
     async def delete_chunks_by_project_id(self, project_id: ObjectId):
+        """
+        Empty the project partition with TRUNCATE: constant time whatever the number
+        of chunks, no dead tuples left to vacuum, and only the partition is locked.
+
+        :return: The number of deleted chunks, read from the project stats.
+        """
+        await self.ensure_project_partition(project_id)
+
+        partition_name = self.partition_name(project_id)
         async with self.db_client() as session:
-            stmt = delete(DataChunk).where(DataChunk.chunk_project_id == project_id)
-            result = await session.execute(stmt)
+            await session.execute(sql_text(f'TRUNCATE TABLE {partition_name}'))
+            previous = await self.project_stats_model.reset_stats(session, project_id, "chunk_count", "chunk_bytes")
             await session.commit()
-        return result.rowcount
+        return previous["chunk_count"]
     
-    async def get_poject_chunks(self, project_id: ObjectId, page_no: int=1, page_size: int=50):
-        async with self.db_client() as session:
-            stmt = select(DataChunk).where(DataChunk.chunk_project_id == project_id).offset((page_no - 1) * page_size).limit(page_size)
-            result = await session.execute(stmt)
+    @staticmethod
+    def get_poject_chunks_query(project_id: int, page_no: int=1, page_size: int=50, asset_ids: list = None):
+        stmt = select(DataChunk).where(DataChunk.chunk_project_id == project_id)
+        if asset_ids is not None:
+            stmt = stmt.where(DataChunk.chunk_asset_id.in_(asset_ids))
+        return (
+            stmt
+            .order_by(DataChunk.chunk_id)
+            .offset((page_no - 1) * page_size)
+            .limit(page_size)
+        )
+
+    async def get_poject_chunks(self, project_id: ObjectId, page_no: int=1, page_size: int=50,
+                                asset_ids: list = None):
+        async with self.read_client() as session:
+            result = await session.execute(self.get_poject_chunks_query(
+                project_id=project_id, page_no=page_no, page_size=page_size, asset_ids=asset_ids
+            ))
             records = result.scalars().all()
         return records
     
     async def get_total_chunks_count(self, project_id: ObjectId):
-        total_count = 0
-        async with self.db_client() as session:
-            count_sql = select(func.count(DataChunk.chunk_id)).where(DataChunk.chunk_project_id == project_id)
-            records_count = await session.execute(count_sql)
-            total_count = records_count.scalar()
-        
-        return total_count
\ No newline at end of file
+        project_stats = await self.project_stats_model.get_project_stats(project_id=project_id)
+        return project_stats["chunk_count"]
\ No newline at end of file
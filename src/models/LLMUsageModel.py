@@ -0,0 +1,78 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import LLMUsage
+from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import func, cast
+from typing import List
+import datetime
+
+USAGE_KEY_COLUMNS = ["usage_period_start", "usage_project_id", "usage_endpoint", "usage_provider", "usage_model"]
+USAGE_COUNTER_COLUMNS = ["request_count", "prompt_tokens", "completion_tokens", "embedding_tokens", "cost_usd"]
+
+
+class LLMUsageModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        instance = cls(db_client=db_client)
+        return instance
+
+    async def add_usage(self, rows: List[dict]):
+        """
+        Add the counters of `rows` (one dict per bucket key, keys unique within
+        the batch) to the stored rows, in a single upsert.
+        """
+        if not rows:
+            return
+
+        stmt = insert(LLMUsage).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[getattr(LLMUsage, name) for name in USAGE_KEY_COLUMNS],
+            set_={
+                **{name: getattr(LLMUsage, name) + stmt.excluded[name] for name in USAGE_COUNTER_COLUMNS},
+                "updated_at": func.now(),
+            },
+        )
+        async with self.db_client() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    def summary_columns(self):
+        # SUM(bigint) is a numeric in Postgres, read as Decimal (not JSON serializable):
+        # cast back to the column type
+        return [
+            cast(func.sum(getattr(LLMUsage, name)), getattr(LLMUsage, name).type).label(name)
+            for name in USAGE_COUNTER_COLUMNS
+        ]
+
+    async def get_usage_by_project(self, since: datetime.datetime, limit: int = 20) -> List[dict]:
+        """
+        The projects with the highest cost since `since`, most expensive first.
+        """
+        async with self.read_client() as session:
+            result = await session.execute(
+                select(LLMUsage.usage_project_id, *self.summary_columns())
+                .where(LLMUsage.usage_period_start >= since)
+                .group_by(LLMUsage.usage_project_id)
+                .order_by(func.sum(LLMUsage.cost_usd).desc(), func.sum(LLMUsage.prompt_tokens).desc())
+                .limit(limit)
+            )
+            return [dict(row._mapping) for row in result.all()]
+
+    async def get_project_usage(self, project_id: int, since: datetime.datetime) -> List[dict]:
+        """
+        The usage of a project since `since`, per endpoint and model.
+        """
+        async with self.read_client() as session:
+            result = await session.execute(
+                select(LLMUsage.usage_endpoint, LLMUsage.usage_provider, LLMUsage.usage_model,
+                       *self.summary_columns())
+                .where(LLMUsage.usage_project_id == project_id, LLMUsage.usage_period_start >= since)
+                .group_by(LLMUsage.usage_endpoint, LLMUsage.usage_provider, LLMUsage.usage_model)
+                .order_by(func.sum(LLMUsage.cost_usd).desc())
+            )
+            return [dict(row._mapping) for row in result.all()]
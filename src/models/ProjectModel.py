@@ -3,12 +3,22 @@ from .db_schemes import Project
 from .enums.DataBaseEnum import DataBaseEnum
 from sqlalchemy.future import select
 from sqlalchemy import func
+from utils.cache import TTLCache
 
 class ProjectModel(BaseDataModel):
+    # Project rows never change once created, so lookups are cached per process
+    project_cache = None
+
     def __init__(self, db_client: object):
         super().__init__(db_client=db_client)
         self.db_client = db_client
 
+        if ProjectModel.project_cache is None:
+            ProjectModel.project_cache = TTLCache(
+                ttl=self.app_settings.PROJECT_CACHE_TTL_SECONDS,
+                max_size=self.app_settings.PROJECT_CACHE_MAX_SIZE,
+            )
+
         
     @classmethod
     async def create_instance(cls, db_client: object):
@@ -17,25 +27,31 @@ class ProjectModel(BaseDataModel):
     
     async def create_project(self, project: Project):
         async with self.db_client() as session:
-            async with session.begin():
-                session.add(project)
+            session.add(project)
             await session.commit()
             await session.refresh(project)
         return project
             
             
+    @staticmethod
+    def get_project_query(project_id: int):
+        return select(Project).where(Project.project_id == project_id)
+
     async def get_project_or_create_one(self, project_id: str):
+        project = self.project_cache.get(project_id)
+        if project is not None:
+            return project
+
         async with self.db_client() as session:
-            async with session.begin():
-                query = select(Project).where(Project.project_id == project_id)
-                result = await session.execute(query)
-                project = result.scalar_one_or_none()
-                if project is None:
-                    project_rec = Project(project_id=project_id)
-                    project = await self.create_project(project_rec)
-                    return project
-                else:
-                    return project
+            result = await session.execute(self.get_project_query(project_id=project_id))
+            project = result.scalar_one_or_none()
+
+        if project is None:
+            project_rec = Project(project_id=project_id)
+            project = await self.create_project(project_rec)
+
+        self.project_cache.set(project_id, project)
+        return project
         
 
 
@@ -43,16 +59,15 @@ class ProjectModel(BaseDataModel):
     
     async def get_all_projects(self, page : int = 1 , page_size : int = 10):
         async with self.db_client() as session:
-            async with session.begin():
-                total_documents = await session.execute(
-                    select(func.count(Project.project_id))
-                )
-                total_documents = total_documents.scalar_one()
-
-                total_pages = total_documents // page_size
-                if total_documents % page_size > 0:
-                    total_pages += 1
-
-                query = select(Project).offset((page - 1) * page_size).limit(page_size)
-                projects = await session.execute(query).scalars().all()
-                return projects, total_pages
\ No newline at end of file
+            total_documents = await session.execute(
+                select(func.count(Project.project_id))
+            )
+            total_documents = total_documents.scalar_one()
+
+            total_pages = total_documents // page_size
+            if total_documents % page_size > 0:
+                total_pages += 1
+
+            query = select(Project).offset((page - 1) * page_size).limit(page_size)
+            projects = (await session.execute(query)).scalars().all()
+            return projects, total_pages
\ No newline at end of file
@@ -0,0 +1,70 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import ProjectStats
+from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import func
+
+class ProjectStatsModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        instance = cls(db_client=db_client)
+        return instance
+
+    async def increment_stats(self, session, project_id: int, **deltas):
+        """
+        Add `deltas` (column name -> value) to the counters of a project.
+
+        Runs in the caller's session without committing, so the counters are
+        committed (or rolled back) together with the rows they count.
+        """
+        stmt = insert(ProjectStats).values(stats_project_id=project_id, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProjectStats.stats_project_id],
+            set_={
+                **{name: getattr(ProjectStats, name) + stmt.excluded[name] for name in deltas},
+                "updated_at": func.now(),
+            },
+        )
+        await session.execute(stmt)
+
+    async def reset_stats(self, session, project_id: int, *names: str):
+        """
+        Set the given counters of a project back to 0, in the caller's session.
+
+        :return: The counter values before the reset.
+        """
+        stmt = insert(ProjectStats).values(stats_project_id=project_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProjectStats.stats_project_id],
+            set_={**{name: 0 for name in names}, "updated_at": func.now()},
+        )
+        previous = await session.execute(
+            select(*[getattr(ProjectStats, name) for name in names])
+            .where(ProjectStats.stats_project_id == project_id)
+            .with_for_update()
+        )
+        previous = previous.one_or_none()
+        await session.execute(stmt)
+
+        return dict(zip(names, previous or [0] * len(names)))
+
+    @staticmethod
+    def get_project_stats_query(project_id: int):
+        return select(ProjectStats).where(ProjectStats.stats_project_id == project_id)
+
+    async def get_project_stats(self, project_id: int) -> dict:
+        async with self.read_client() as session:
+            result = await session.execute(self.get_project_stats_query(project_id=project_id))
+            stats = result.scalar_one_or_none()
+
+        return {
+            "asset_count": stats.asset_count if stats else 0,
+            "asset_bytes": stats.asset_bytes if stats else 0,
+            "chunk_count": stats.chunk_count if stats else 0,
+            "chunk_bytes": stats.chunk_bytes if stats else 0,
+        }
@@ -3,4 +3,6 @@ from .enums.ProcessingEnum import ProcessingEnum
 from .ProjectModel import ProjectModel
 from .ChunkModel import ChunkModel
 from .BaseDataModel import BaseDataModel
-from .AssetModel import AssetModel
\ No newline at end of file
+from .AssetModel import AssetModel
+from .ProjectStatsModel import ProjectStatsModel
+from .LLMUsageModel import LLMUsageModel
\ No newline at end of file
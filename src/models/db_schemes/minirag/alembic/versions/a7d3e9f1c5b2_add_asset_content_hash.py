@@ -0,0 +1,31 @@
+"""add asset content hash
+
+Revision ID: a7d3e9f1c5b2
+Revises: f2a6c4d8e1b7
+Create Date: 2026-10-19 14:05:12.618734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9f1c5b2'
+down_revision: Union[str, None] = 'f2a6c4d8e1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('assets', sa.Column('asset_content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_asset_project_id_content_hash', 'assets', ['asset_project_id', 'asset_content_hash'],
+                    unique=True, postgresql_where=sa.text('asset_content_hash IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_asset_project_id_content_hash', table_name='assets')
+    op.drop_column('assets', 'asset_content_hash')
@@ -0,0 +1,30 @@
+"""add asset processing and index signatures
+
+Revision ID: b3e8f2a6d4c9
+Revises: a7d3e9f1c5b2
+Create Date: 2026-10-19 16:42:37.205118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8f2a6d4c9'
+down_revision: Union[str, None] = 'a7d3e9f1c5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('assets', sa.Column('asset_processing_signature', sa.String(length=64), nullable=True))
+    op.add_column('assets', sa.Column('asset_index_signature', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('assets', 'asset_index_signature')
+    op.drop_column('assets', 'asset_processing_signature')
@@ -0,0 +1,100 @@
+"""partition chunks by project
+
+Revision ID: c8fc8678d766
+Revises: b8425cd89985
+Create Date: 2026-10-19 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8fc8678d766'
+down_revision: Union[str, None] = 'b8425cd89985'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CHUNK_COLUMNS = (
+    "chunk_id, chunk_uuid, chunk_text, chunk_metadata, chunk_order, "
+    "chunk_project_id, chunk_asset_id, created_at, updated_at"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE chunks RENAME TO chunks_unpartitioned")
+    op.execute("ALTER TABLE chunks_unpartitioned RENAME CONSTRAINT chunks_pkey TO chunks_unpartitioned_pkey")
+    op.execute("ALTER SEQUENCE chunks_chunk_id_seq OWNED BY NONE")
+
+    # the partition key has to be part of every unique constraint
+    op.execute("""
+        CREATE TABLE chunks (
+            chunk_id integer NOT NULL DEFAULT nextval('chunks_chunk_id_seq'),
+            chunk_uuid uuid NOT NULL,
+            chunk_text varchar NOT NULL,
+            chunk_metadata jsonb,
+            chunk_order integer NOT NULL,
+            chunk_project_id integer NOT NULL REFERENCES projects (project_id),
+            chunk_asset_id integer NOT NULL REFERENCES assets (asset_id),
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz,
+            CONSTRAINT chunks_pkey PRIMARY KEY (chunk_id, chunk_project_id),
+            CONSTRAINT uq_chunk_uuid_project_id UNIQUE (chunk_uuid, chunk_project_id)
+        ) PARTITION BY LIST (chunk_project_id)
+    """)
+    op.execute("ALTER SEQUENCE chunks_chunk_id_seq OWNED BY chunks.chunk_id")
+
+    op.execute("""
+        DO $$
+        DECLARE
+            rec record;
+        BEGIN
+            FOR rec IN SELECT project_id FROM projects LOOP
+                EXECUTE format('CREATE TABLE chunks_p%s PARTITION OF chunks FOR VALUES IN (%s)',
+                               rec.project_id, rec.project_id);
+            END LOOP;
+        END $$
+    """)
+
+    op.execute(f"INSERT INTO chunks ({CHUNK_COLUMNS}) SELECT {CHUNK_COLUMNS} FROM chunks_unpartitioned")
+
+    # CASCADE drops the per-row ON DELETE CASCADE foreign keys of the pgvector collection tables
+    op.execute("DROP TABLE chunks_unpartitioned CASCADE")
+
+    op.create_index('ix_chunk_asset_id', 'chunks', ['chunk_asset_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE chunks RENAME TO chunks_partitioned")
+    op.execute("ALTER TABLE chunks_partitioned RENAME CONSTRAINT chunks_pkey TO chunks_partitioned_pkey")
+    op.execute("ALTER INDEX ix_chunk_asset_id RENAME TO ix_chunk_asset_id_partitioned")
+    op.execute("ALTER SEQUENCE chunks_chunk_id_seq OWNED BY NONE")
+
+    op.create_table('chunks',
+    sa.Column('chunk_id', sa.Integer(), server_default=sa.text("nextval('chunks_chunk_id_seq')"), nullable=False),
+    sa.Column('chunk_uuid', sa.UUID(), nullable=False),
+    sa.Column('chunk_text', sa.String(), nullable=False),
+    sa.Column('chunk_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('chunk_order', sa.Integer(), nullable=False),
+    sa.Column('chunk_project_id', sa.Integer(), nullable=False),
+    sa.Column('chunk_asset_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['chunk_asset_id'], ['assets.asset_id'], ),
+    sa.ForeignKeyConstraint(['chunk_project_id'], ['projects.project_id'], ),
+    sa.PrimaryKeyConstraint('chunk_id'),
+    sa.UniqueConstraint('chunk_uuid')
+    )
+    op.execute("ALTER SEQUENCE chunks_chunk_id_seq OWNED BY chunks.chunk_id")
+
+    op.execute(f"INSERT INTO chunks ({CHUNK_COLUMNS}) SELECT {CHUNK_COLUMNS} FROM chunks_partitioned")
+    op.execute("DROP TABLE chunks_partitioned CASCADE")
+
+    op.create_index('ix_chunk_asset_id', 'chunks', ['chunk_asset_id'], unique=False)
+    op.create_index('ix_chunk_project_id', 'chunks', ['chunk_project_id'], unique=False)
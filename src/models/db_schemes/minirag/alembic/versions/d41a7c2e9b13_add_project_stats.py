@@ -0,0 +1,54 @@
+"""add project stats
+
+Revision ID: d41a7c2e9b13
+Revises: c8fc8678d766
+Create Date: 2026-10-19 11:02:17.583120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7c2e9b13'
+down_revision: Union[str, None] = 'c8fc8678d766'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('project_stats',
+    sa.Column('stats_project_id', sa.Integer(), nullable=False),
+    sa.Column('asset_count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('asset_bytes', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('chunk_count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('chunk_bytes', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['stats_project_id'], ['projects.project_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('stats_project_id')
+    )
+
+    # backfill the counters of the existing projects
+    op.execute("""
+        INSERT INTO project_stats (stats_project_id, asset_count, asset_bytes, chunk_count, chunk_bytes)
+        SELECT p.project_id,
+               COALESCE(a.asset_count, 0), COALESCE(a.asset_bytes, 0),
+               COALESCE(c.chunk_count, 0), COALESCE(c.chunk_bytes, 0)
+        FROM projects p
+        LEFT JOIN (
+            SELECT asset_project_id, COUNT(*) AS asset_count, SUM(asset_size) AS asset_bytes
+            FROM assets GROUP BY asset_project_id
+        ) a ON a.asset_project_id = p.project_id
+        LEFT JOIN (
+            SELECT chunk_project_id, COUNT(*) AS chunk_count, SUM(octet_length(chunk_text)) AS chunk_bytes
+            FROM chunks GROUP BY chunk_project_id
+        ) c ON c.chunk_project_id = p.project_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('project_stats')
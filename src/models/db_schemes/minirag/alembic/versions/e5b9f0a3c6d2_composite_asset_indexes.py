@@ -0,0 +1,37 @@
+"""composite asset indexes
+
+Revision ID: e5b9f0a3c6d2
+Revises: d41a7c2e9b13
+Create Date: 2026-10-19 11:48:05.371904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9f0a3c6d2'
+down_revision: Union[str, None] = 'd41a7c2e9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_asset_project_id_name', 'assets', ['asset_project_id', 'asset_name'], unique=False)
+    op.create_index('ix_asset_project_id_type', 'assets', ['asset_project_id', 'asset_type'], unique=False)
+
+    # both covered by the composite indexes (asset_type is never filtered on alone)
+    op.drop_index('ix_asset_project_id', table_name='assets')
+    op.drop_index('ix_asset_type', table_name='assets')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_asset_type', 'assets', ['asset_type'], unique=False)
+    op.create_index('ix_asset_project_id', 'assets', ['asset_project_id'], unique=False)
+
+    op.drop_index('ix_asset_project_id_type', table_name='assets')
+    op.drop_index('ix_asset_project_id_name', table_name='assets')
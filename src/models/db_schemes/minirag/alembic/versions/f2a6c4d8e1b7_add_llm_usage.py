@@ -0,0 +1,50 @@
+"""add llm usage
+
+Revision ID: f2a6c4d8e1b7
+Revises: e5b9f0a3c6d2
+Create Date: 2026-10-19 13:21:44.902315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6c4d8e1b7'
+down_revision: Union[str, None] = 'e5b9f0a3c6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_usage',
+    sa.Column('usage_id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('usage_period_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('usage_project_id', sa.Integer(), nullable=True),
+    sa.Column('usage_endpoint', sa.String(), server_default='', nullable=False),
+    sa.Column('usage_provider', sa.String(), nullable=False),
+    sa.Column('usage_model', sa.String(), nullable=False),
+    sa.Column('request_count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('prompt_tokens', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('completion_tokens', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('embedding_tokens', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('cost_usd', sa.Float(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('usage_id')
+    )
+    # NULLS NOT DISTINCT (Postgres 15+): calls outside of a project share one row per bucket
+    op.create_index('uq_llm_usage_period_key', 'llm_usage',
+                    ['usage_period_start', 'usage_project_id', 'usage_endpoint', 'usage_provider', 'usage_model'],
+                    unique=True, postgresql_nulls_not_distinct=True)
+    op.create_index('ix_llm_usage_project_id_period', 'llm_usage', ['usage_project_id', 'usage_period_start'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_llm_usage_project_id_period', table_name='llm_usage')
+    op.drop_index('uq_llm_usage_period_key', table_name='llm_usage')
+    op.drop_table('llm_usage')
@@ -1,4 +1,6 @@
 from .minirag_base import SQLAlchemyBase
 from .asset import Asset
 from .project import Project
-from .datachunk import DataChunk, RetrievedDocument
\ No newline at end of file
+from .datachunk import DataChunk, RetrievedDocument
+from .project_stats import ProjectStats
+from .llm_usage import LLMUsage
\ No newline at end of file
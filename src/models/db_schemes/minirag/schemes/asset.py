@@ -17,6 +17,12 @@ class Asset(SQLAlchemyBase):
     asset_name = Column(String, nullable=False)
     asset_size = Column(Integer, nullable=False)
     asset_config = Column(JSONB, nullable=True)
+    # sha256 of the content, naming the shared blob; None for the assets stored per project
+    asset_content_hash = Column(String(64), nullable=True)
+    # fingerprints of the last processing (content + chunking parameters) and indexing
+    # (processing + embedding model) runs, unchanged assets are skipped by both
+    asset_processing_signature = Column(String(64), nullable=True)
+    asset_index_signature = Column(String(64), nullable=True)
 
     asset_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
 
@@ -28,6 +34,9 @@ class Asset(SQLAlchemyBase):
     chunks = relationship("DataChunk", back_populates="asset")
 
     __table_args__ = (
-        Index('ix_asset_project_id', asset_project_id),
-        Index('ix_asset_type', asset_type),
+        Index('ix_asset_project_id_name', asset_project_id, asset_name),
+        Index('ix_asset_project_id_type', asset_project_id, asset_type),
+        # one asset per content and project, the concurrent uploads of a content conflict
+        Index('ix_asset_project_id_content_hash', asset_project_id, asset_content_hash, unique=True,
+              postgresql_where=asset_content_hash.isnot(None)),
     )
\ No newline at end of file
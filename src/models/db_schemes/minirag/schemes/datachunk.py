@@ -2,8 +2,9 @@ from .minirag_base import SQLAlchemyBase
 from sqlalchemy import Column, Integer,DateTime ,String, ForeignKey, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy import Index
-from pydantic import BaseModel
+from sqlalchemy import Index, UniqueConstraint
+from pydantic import BaseModel, Field
+from typing import List, Optional
 import uuid
 
 class DataChunk(SQLAlchemyBase):
@@ -11,13 +12,14 @@ class DataChunk(SQLAlchemyBase):
     __tablename__ = "chunks"
 
     chunk_id = Column(Integer, primary_key=True, autoincrement=True)
-    chunk_uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+    chunk_uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, nullable=False)
 
     chunk_text = Column(String, nullable=False)
     chunk_metadata = Column(JSONB, nullable=True)
     chunk_order = Column(Integer, nullable=False)
 
-    chunk_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    # LIST partition key: part of the primary key, one partition per project
+    chunk_project_id = Column(Integer, ForeignKey("projects.project_id"), primary_key=True, nullable=False)
     chunk_asset_id = Column(Integer, ForeignKey("assets.asset_id"), nullable=False)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -27,10 +29,12 @@ class DataChunk(SQLAlchemyBase):
     asset = relationship("Asset", back_populates="chunks")
 
     __table_args__ = (
-        Index('ix_chunk_project_id', chunk_project_id),
+        UniqueConstraint('chunk_uuid', 'chunk_project_id', name='uq_chunk_uuid_project_id'),
         Index('ix_chunk_asset_id', chunk_asset_id),
+        {'postgresql_partition_by': 'LIST (chunk_project_id)'},
     )
 
 class RetrievedDocument(BaseModel):
     text: str
-    score: float
\ No newline at end of file
+    score: float
+    vector: Optional[List[float]] = Field(default=None, exclude=True)
\ No newline at end of file
@@ -0,0 +1,34 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, Integer, BigInteger, Float, DateTime, String, Index, func
+
+
+class LLMUsage(SQLAlchemyBase):
+    """
+    LLM tokens and cost aggregated per time bucket, project, endpoint and model:
+    one row per combination, incremented by the batched usage writes.
+
+    Not tied to `projects` by a foreign key, the spend of deleted projects is kept.
+    """
+    __tablename__ = "llm_usage"
+
+    usage_id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    usage_period_start = Column(DateTime(timezone=True), nullable=False)
+    usage_project_id = Column(Integer, nullable=True)
+    usage_endpoint = Column(String, nullable=False, server_default="")
+    usage_provider = Column(String, nullable=False)
+    usage_model = Column(String, nullable=False)
+
+    request_count = Column(BigInteger, nullable=False, server_default="0")
+    prompt_tokens = Column(BigInteger, nullable=False, server_default="0")
+    completion_tokens = Column(BigInteger, nullable=False, server_default="0")
+    embedding_tokens = Column(BigInteger, nullable=False, server_default="0")
+    cost_usd = Column(Float, nullable=False, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('uq_llm_usage_period_key', usage_period_start, usage_project_id, usage_endpoint,
+              usage_provider, usage_model, unique=True, postgresql_nulls_not_distinct=True),
+        Index('ix_llm_usage_project_id_period', usage_project_id, usage_period_start),
+    )
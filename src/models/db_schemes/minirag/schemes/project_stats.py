@@ -0,0 +1,19 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, func
+
+
+class ProjectStats(SQLAlchemyBase):
+    """
+    Per-project counters kept up to date in the same transaction as the
+    inserts and deletes, so reading them never scans the data tables.
+    """
+    __tablename__ = "project_stats"
+
+    stats_project_id = Column(Integer, ForeignKey("projects.project_id", ondelete="CASCADE"), primary_key=True)
+
+    asset_count = Column(BigInteger, nullable=False, server_default="0")
+    asset_bytes = Column(BigInteger, nullable=False, server_default="0")
+    chunk_count = Column(BigInteger, nullable=False, server_default="0")
+    chunk_bytes = Column(BigInteger, nullable=False, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -4,4 +4,7 @@ from enum import Enum
 class DataBaseEnum(Enum):
     COLLECTION_PROJECT_NAME = "projects"
     COLLECTION_CHUNK_NAME = "chunks"
-    COLLECTION_ASSET_NAME = "assets"
\ No newline at end of file
+    CHUNK_PARTITION_PREFIX = "chunks_p"
+    COLLECTION_ASSET_NAME = "assets"
+    COLLECTION_PROJECT_STATS_NAME = "project_stats"
+    COLLECTION_LLM_USAGE_NAME = "llm_usage"
\ No newline at end of file
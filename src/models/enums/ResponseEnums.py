@@ -5,6 +5,7 @@ class ResponseSignal(Enum):
     FILE_TYPE_NOT_SUPPORTED = "file_type_not_supported"
     FILE_SIZE_EXCEEDED = "file_size_exceeded"
     FILE_UPLOAD_SUCCESS = "file_upload_success"
+    FILE_UPLOAD_DEDUPLICATED = "file_upload_deduplicated"
     FILE_UPLOAD_FAILED = "file_upload_failed"
     FILE_PROCESSING_SUCCESS = "file_processing_success"
     FILE_PROCESSING_FAILED = "file_processing_failed"
@@ -18,4 +19,8 @@ class ResponseSignal(Enum):
     VECTORDB_SEARCH_SUCCESS = "vectordb_search_success"
     RAG_ANSWER_ERROR = "rag_answer_error"
     RAG_ANSWER_SUCCESS = "rag_answer_success"
+    PROFILING_DISABLED = "profiling_disabled"
+    PROFILES_RETRIEVED = "profiles_retrieved"
+    PROFILE_NOT_FOUND = "profile_not_found"
+    LLM_USAGE_RETRIEVED = "llm_usage_retrieved"
     
\ No newline at end of file
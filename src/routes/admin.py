@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, Request, Header, HTTPException, status
+from fastapi.responses import JSONResponse, FileResponse
+from helpers import get_settings, Settings, get_db_client
+from models import ResponseSignal, LLMUsageModel
+from typing import Optional
+import datetime
+import hmac
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+admin_router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["api_v1", "admin"],
+)
+
+
+async def verify_admin_token(x_admin_token: Optional[str] = Header(default=None),
+                             app_settings: Settings = Depends(get_settings)):
+    if not app_settings.PROFILING_ADMIN_TOKEN or not x_admin_token or \
+            not hmac.compare_digest(x_admin_token, app_settings.PROFILING_ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+
+@admin_router.get("/profiles", dependencies=[Depends(verify_admin_token)])
+async def list_profiles(request: Request):
+    """
+    List the stored request profiles, newest first.
+    """
+    if request.app.profile_store is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"signal": ResponseSignal.PROFILING_DISABLED.value}
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.PROFILES_RETRIEVED.value,
+            "profiles": request.app.profile_store.list(),
+        }
+    )
+
+
+@admin_router.get("/profiles/{profile_id}", dependencies=[Depends(verify_admin_token)])
+async def download_profile(request: Request, profile_id: str):
+    """
+    Download a stored profile (pyinstrument HTML or cProfile pstats).
+    """
+    profile_path = request.app.profile_store.get_path(profile_id) if request.app.profile_store else None
+    if profile_path is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"signal": ResponseSignal.PROFILE_NOT_FOUND.value}
+        )
+
+    return FileResponse(profile_path, filename=profile_path.rsplit("/", 1)[-1])
+
+
+def get_usage_since(hours: float) -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=hours)
+
+
+@admin_router.get("/usage", dependencies=[Depends(verify_admin_token)])
+async def get_usage_by_project(request: Request, hours: float = 24, limit: int = 20,
+                               db_client = Depends(get_db_client)):
+    """
+    The projects with the highest LLM cost over the last `hours`.
+    Usage not yet flushed by the tracker is not included.
+    """
+    usage_model = await LLMUsageModel.create_instance(db_client=db_client)
+    usage = await usage_model.get_usage_by_project(since=get_usage_since(hours), limit=limit)
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.LLM_USAGE_RETRIEVED.value,
+            "hours": hours,
+            "projects": usage,
+        }
+    )
+
+
+@admin_router.get("/usage/{project_id}", dependencies=[Depends(verify_admin_token)])
+async def get_project_usage(request: Request, project_id: int, hours: float = 24,
+                            db_client = Depends(get_db_client)):
+    """
+    The LLM usage of a project over the last `hours`, per endpoint and model.
+    """
+    usage_model = await LLMUsageModel.create_instance(db_client=db_client)
+    usage = await usage_model.get_project_usage(project_id=project_id, since=get_usage_since(hours))
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.LLM_USAGE_RETRIEVED.value,
+            "project_id": project_id,
+            "hours": hours,
+            "usage": usage,
+        }
+    )
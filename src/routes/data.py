@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, UploadFile, status, Request
 from fastapi.responses import JSONResponse
-from helpers import get_settings, Settings
+from helpers import get_settings, Settings, get_primary_db_client
 from controllers import DataController, ProjectController, ProcessController
 from models import ProjectModel, ChunkModel, AssetModel
 from models.enums.AssetTypeEnum import AssetTypeEnum
@@ -8,8 +8,7 @@ from models.db_schemes import DataChunk, Asset
 from models import ResponseSignal
 from .schemes.data import ProcessRequest
 from controllers import NLPController
-import aiofiles
-import os
+import asyncio
 import logging
 
 logger = logging.getLogger('uvicorn.error')
@@ -23,10 +22,11 @@ data_router = APIRouter(
 
 @data_router.post("/upload/{project_id}")
 async def upload_data(request: Request, project_id: int, file:UploadFile,
-                    app_settings: Settings = Depends(get_settings)):
+                    app_settings: Settings = Depends(get_settings),
+                    db_client = Depends(get_primary_db_client)):
     
     project_model = await ProjectModel.create_instance(
-        db_client= request.app.db_client
+        db_client=db_client
     )
 
     project = await project_model.get_project_or_create_one(
@@ -44,51 +44,72 @@ async def upload_data(request: Request, project_id: int, file:UploadFile,
             }
         )
     
-    file_path, file_id = data_controller.generate_unique_filepath(
-        orig_file_name=file.filename,
-        project_id=project_id
+    # hashed and size-checked while written to the content-addressed blob store
+    is_stored, result_signal, content_hash, file_size = await data_controller.store_uploaded_file(
+        file=file,
+        chunk_size=app_settings.FILE_DEFULT_CHUNK_SIZE
     )
-    try: 
-        async with aiofiles.open(file_path, 'wb') as f:
-            while chunk := await file.read(app_settings.FILE_DEFULT_CHUNK_SIZE):
-                await f.write(chunk)
-    except Exception as e:
-        logger.error(f"Error while uploading file: {e}")
+    if not is_stored:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={
-                "signal": ResponseSignal.FILE_UPLOAD_FAILED.value
+                "signal": result_signal
             }
         )
+
     asset_model = await AssetModel.create_instance(
-        db_client= request.app.db_client
+        db_client=db_client
+    )
+
+    # the same content uploaded again to the project: nothing to add
+    asset_record = await asset_model.get_asset_by_content_hash(
+        asset_project_id=project.project_id,
+        content_hash=content_hash
+    )
+    if asset_record is not None:
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "signal": ResponseSignal.FILE_UPLOAD_DEDUPLICATED.value,
+                "file_id": str(asset_record.asset_id)
+            }
+        )
+
+    _, file_id = data_controller.generate_unique_filepath(
+        orig_file_name=file.filename,
+        project_id=project_id
     )
     asset_resource = Asset(
         asset_project_id=project.project_id,
         asset_type=AssetTypeEnum.FILE.value,
         asset_name=file_id,
-        asset_size=os.path.getsize(file_path)
+        asset_size=file_size,
+        asset_content_hash=content_hash
     )
 
     asset_record = await asset_model.create_asset(
         asset=asset_resource
     )
+    # a concurrent upload of the same content won the insert
+    is_deduplicated = asset_record.asset_name != file_id
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
-            "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+            "signal": (ResponseSignal.FILE_UPLOAD_DEDUPLICATED.value if is_deduplicated
+                       else ResponseSignal.FILE_UPLOAD_SUCCESS.value),
             "file_id": str(asset_record.asset_id)        }
     )
 
 @data_router.post("/process/{project_id}")
-async def process_endpoint(request : Request,project_id : int , process_request : ProcessRequest):
+async def process_endpoint(request : Request,project_id : int , process_request : ProcessRequest,
+                            db_client = Depends(get_primary_db_client)):
 
     chunk_size = process_request.chunk_size
     overlap_size = process_request.overlap_size
     do_reset  = process_request.do_reset
 
     project_model = await ProjectModel.create_instance(
-        db_client= request.app.db_client
+        db_client=db_client
     )
 
     project = await project_model.get_project_or_create_one(
@@ -100,10 +121,11 @@ async def process_endpoint(request : Request,project_id : int , process_request
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
         template_parser=request.app.template_parser,
+        reranker_client=request.app.reranker_client,
     )
     
     asset_model = await AssetModel.create_instance(
-        db_client= request.app.db_client
+        db_client=db_client
     )
 
     project_files_ids = {}
@@ -121,7 +143,8 @@ async def process_endpoint(request : Request,project_id : int , process_request
             )
         
         project_files_ids = {
-            asset_record.asset_id: asset_record.asset_name
+            asset_record.asset_id: (asset_record.asset_name, asset_record.asset_content_hash,
+                                    asset_record.asset_processing_signature)
         }
     else:
         project_files = await asset_model.get_all_project_assets(
@@ -130,7 +153,7 @@ async def process_endpoint(request : Request,project_id : int , process_request
         )
 
         project_files_ids = {
-            record.asset_id: record.asset_name
+            record.asset_id: (record.asset_name, record.asset_content_hash, record.asset_processing_signature)
             for record in project_files
         }
     if len(project_files_ids) == 0:
@@ -145,9 +168,11 @@ async def process_endpoint(request : Request,project_id : int , process_request
 
     no_records = 0
     no_files = 0
+    no_skipped_files = 0
+    failed_files = []
 
     chunk_model = await ChunkModel.create_instance(
-        db_client= request.app.db_client
+        db_client=db_client
     )
 
     if do_reset ==1:
@@ -159,10 +184,38 @@ async def process_endpoint(request : Request,project_id : int , process_request
         _ = await chunk_model.delete_chunks_by_project_id(
             project_id=project.project_id
         )
+        await asset_model.reset_project_signatures(
+            asset_project_id=project.project_id
+        )
         
-    for asset_id, file_id in project_files_ids.items():
+    for asset_id, (file_id, asset_content_hash, processing_signature) in project_files_ids.items():
+
+        content_hash = asset_content_hash
+        if content_hash is None:
+            # stored before the content-addressed uploads: moved to the blob store once
+            content_hash = await asyncio.to_thread(process_controller.store_file_as_blob, file_id)
+            if content_hash is None:
+                logger.error(f"Error while processing file: {file_id}")
+                continue
+            is_updated = await asset_model.set_asset_content_hash(
+                asset_id=asset_id,
+                content_hash=content_hash
+            )
+            if is_updated:
+                process_controller.remove_project_file(file_id=file_id)
+
+        signature = process_controller.get_processing_signature(
+            file_id=file_id,
+            content_hash=content_hash,
+            chunk_size=chunk_size,
+            overlap_size=overlap_size
+        )
+        # same content and chunking parameters as the last run: its chunks are up to date
+        if do_reset != 1 and signature == processing_signature:
+            no_skipped_files += 1
+            continue
 
-        file_content = process_controller.get_file_content(file_id=file_id)
+        file_content = process_controller.get_file_content(file_id=file_id, content_hash=content_hash)
         if file_content is None :
             logger.error(f"Error while processing file: {file_id}")
             continue
@@ -192,15 +245,60 @@ async def process_endpoint(request : Request,project_id : int , process_request
             for i, chunk in enumerate(file_chunks)
         ]
 
-        no_records += await chunk_model.insert_many_chunks(
+        # the vectors of the previous chunks are dropped first: once the chunks are
+        # replaced, their ids are lost and the vectors could never be deleted again
+        stale_chunks_ids = await chunk_model.get_asset_chunk_ids(
+            project_id=project.project_id,
+            asset_id=asset_id
+        )
+        if stale_chunks_ids:
+            # indexed again by the next push whatever happens from here
+            await asset_model.update_asset_signatures(
+                asset_ids=[asset_id],
+                asset_index_signature=None
+            )
+        is_deleted = await nlp_controller.delete_from_vector_db(
+            project=project,
+            chunks_ids=stale_chunks_ids
+        )
+        if not is_deleted:
+            # the old chunks and processing signature are kept, the next run retries
+            logger.error(f"Error while deleting the stale vectors of file: {file_id}")
+            failed_files.append(file_id)
+            continue
+
+        await chunk_model.replace_asset_chunks(
+            project_id=project.project_id,
+            asset_id=asset_id,
             chunks=file_chunks_records
         )
+
+        await asset_model.update_asset_signatures(
+            asset_ids=[asset_id],
+            asset_processing_signature=signature,
+            asset_index_signature=None
+        )
+
+        no_records += len(file_chunks_records)
         no_files += 1
 
+    if failed_files:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "signal": ResponseSignal.FILE_PROCESSING_FAILED.value,
+                "inserted_chunks": no_records,
+                "processed_files": no_files,
+                "skipped_files": no_skipped_files,
+                "failed_files": failed_files
+            }
+        )
+
     return JSONResponse(
         content={
             "signal": ResponseSignal.FILE_PROCESSING_SUCCESS.value,
             "inserted_chunks": no_records,
-            "processed_files": no_files
+            "processed_files": no_files,
+            "skipped_files": no_skipped_files
         }
     )
\ No newline at end of file
@@ -1,18 +1,29 @@
-from fastapi import FastAPI, APIRouter, status, Request
+from fastapi import FastAPI, APIRouter, status, Request, Depends
 from fastapi.responses import JSONResponse
 
 from routes.schemes.nlp import PushRequest, SearchRequest
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
+from models.AssetModel import AssetModel
+from models.enums.AssetTypeEnum import AssetTypeEnum
+from models.ProjectStatsModel import ProjectStatsModel
 from controllers import NLPController
 from models import ResponseSignal
+from helpers import get_db_client, get_primary_db_client, get_settings
+from utils.metrics import format_server_timing
 from tqdm.auto import tqdm
 
-from typing import List
+from typing import List, Optional
 import logging
 
 logger = logging.getLogger('uvicorn.error')
 
+def get_timing_headers(nlp_controller: NLPController) -> Optional[dict]:
+    """Server-Timing header with the controller's stage breakdown, when enabled."""
+    if not get_settings().SERVER_TIMING_ENABLED or not nlp_controller.stage_timings:
+        return None
+    return {"Server-Timing": format_server_timing(nlp_controller.stage_timings)}
+
 nlp_router = APIRouter(
     prefix="/api/v1/nlp",
     tags=["api_v1","nlp"],
@@ -21,14 +32,15 @@ nlp_router = APIRouter(
 
 
 @nlp_router.post("/index/push/{project_id}")
-async def index_project(request: Request, project_id: int, push_request: PushRequest):
+async def index_project(request: Request, project_id: int, push_request: PushRequest,
+                        db_client = Depends(get_primary_db_client)):
 
     project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client
+        db_client=db_client
     )
 
     chunk_model = await ChunkModel.create_instance(
-        db_client=request.app.db_client
+        db_client=db_client
     )
 
     project = await project_model.get_project_or_create_one(
@@ -48,6 +60,11 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
         template_parser=request.app.template_parser,
+        reranker_client=request.app.reranker_client,
+    )
+
+    asset_model = await AssetModel.create_instance(
+        db_client=db_client
     )
 
     has_records = True
@@ -58,18 +75,36 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
     # create collection if not exists
     collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
 
-    _ = await request.app.vectordb_client.create_collection(
+    is_new_collection = await request.app.vectordb_client.create_collection(
         collection_name=collection_name,
         embedding_size=request.app.embedding_client.embedding_size,
         do_reset=push_request.do_reset,
     )
 
+    # only the assets processed or embedded differently since their last push are indexed,
+    # all of them into a new (or reset) collection
+    project_assets = await asset_model.get_all_project_assets(
+        asset_project_id=project.project_id,
+        asset_type=AssetTypeEnum.FILE.value
+    )
+    index_signatures = {
+        asset.asset_id: nlp_controller.get_index_signature(asset.asset_processing_signature)
+        for asset in project_assets
+    }
+    pending_assets_ids = [
+        asset.asset_id for asset in project_assets
+        if is_new_collection or asset.asset_index_signature != index_signatures[asset.asset_id]
+    ]
+
     # setup batching
-    total_chunks_count = await chunk_model.get_total_chunks_count(project_id=project.project_id)
+    total_chunks_count = None
+    if len(pending_assets_ids) == len(project_assets):
+        total_chunks_count = await chunk_model.get_total_chunks_count(project_id=project.project_id)
     pbar = tqdm(total=total_chunks_count, desc="Vector Indexing", position=0)
 
-    while has_records:
-        page_chunks = await chunk_model.get_poject_chunks(project_id=project.project_id, page_no=page_no)
+    while has_records and pending_assets_ids:
+        page_chunks = await chunk_model.get_poject_chunks(project_id=project.project_id, page_no=page_no,
+                                                          asset_ids=pending_assets_ids)
         if len(page_chunks):
             page_no += 1
         
@@ -79,6 +114,13 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
 
         chunks_ids =  [ c.chunk_id for c in page_chunks ]
         idx += len(page_chunks)
+
+        # vectors left by an interrupted or older push of these chunks are replaced
+        if not is_new_collection:
+            _ = await nlp_controller.delete_from_vector_db(
+                project=project,
+                chunks_ids=chunks_ids
+            )
         
         is_inserted = await nlp_controller.index_into_vector_db(
             project=project,
@@ -96,21 +138,27 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
 
         pbar.update(len(page_chunks))
         inserted_items_count += len(page_chunks)
+
+    await asset_model.update_index_signatures(
+        index_signatures={asset_id: index_signatures[asset_id] for asset_id in pending_assets_ids}
+    )
         
     return JSONResponse(
         content={
             "signal": ResponseSignal.INSERT_INTO_VECTORDB_SUCCESS.value,
-            "inserted_items_count": inserted_items_count
+            "inserted_items_count": inserted_items_count,
+            "indexed_assets_count": len(pending_assets_ids),
+            "skipped_assets_count": len(project_assets) - len(pending_assets_ids)
         }
     )
 
 @nlp_router.get("/index/info/{project_id}")
-async def get_index_info(request: Request,project_id: int,):
+async def get_index_info(request: Request,project_id: int, db_client = Depends(get_db_client)):
     """
     Get the index information for a project.
     """
     project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client,
+        db_client=db_client,
     )
     project = await project_model.get_project_or_create_one(
         project_id=project_id,
@@ -122,27 +170,37 @@ async def get_index_info(request: Request,project_id: int,):
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
         template_parser=request.app.template_parser,
+        reranker_client=request.app.reranker_client,
     )
 
     collection_info = await nlp_controller.get_vector_db_collection_info(
         project=project,
     )
 
+    project_stats_model = await ProjectStatsModel.create_instance(
+        db_client=db_client,
+    )
+    project_stats = await project_stats_model.get_project_stats(
+        project_id=project.project_id,
+    )
+
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
             "signal": ResponseSignal.VECTORDB_COLLECTION_RETRIEVED.value,
-            "collection_info": collection_info
+            "collection_info": collection_info,
+            "project_stats": project_stats,
         }
     )
 
 @nlp_router.post("/index/search/{project_id}")
-async def search_index(request: Request,project_id: int,search_request: SearchRequest):
+async def search_index(request: Request,project_id: int,search_request: SearchRequest,
+                        db_client = Depends(get_db_client)):
     """
     Search the index for a project.
     """
     project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client,
+        db_client=db_client,
     )
     project = await project_model.get_project_or_create_one(
         project_id=project_id,
@@ -161,6 +219,7 @@ async def search_index(request: Request,project_id: int,search_request: SearchRe
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
         template_parser=request.app.template_parser,
+        reranker_client=request.app.reranker_client,
     )
 
     search_result = await nlp_controller.search_vector_db_collection(
@@ -182,13 +241,15 @@ async def search_index(request: Request,project_id: int,search_request: SearchRe
             "search_result": [
                 result.dict() for result in search_result
                 ]
-        }
+        },
+        headers=get_timing_headers(nlp_controller),
     )
 
 @nlp_router.post("/index/answer/{project_id}")
-async def answer_rag(request: Request, project_id: int, search_request: SearchRequest):
+async def answer_rag(request: Request, project_id: int, search_request: SearchRequest,
+                    db_client = Depends(get_db_client)):
     project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client,
+        db_client=db_client,
     )
     project = await project_model.get_project_or_create_one(
         project_id=project_id,
@@ -199,6 +260,7 @@ async def answer_rag(request: Request, project_id: int, search_request: SearchRe
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
         template_parser=request.app.template_parser,
+        reranker_client=request.app.reranker_client,
     )
 
     answer, full_prompt, chat_history = await nlp_controller.answer_rag_question(
@@ -220,5 +282,6 @@ async def answer_rag(request: Request, project_id: int, search_request: SearchRe
             "answer": answer,
             "full_prompt": full_prompt,
             "chat_history": chat_history
-        }
+        },
+        headers=get_timing_headers(nlp_controller),
     )
\ No newline at end of file
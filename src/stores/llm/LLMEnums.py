@@ -3,6 +3,8 @@ from enum import Enum
 class LLMEnums(Enum):
     OPENAI = "OPENAI"
     COHERE = "COHERE"
+    FAKE = "FAKE"
+    OLLAMA = "OLLAMA"
 
 class OpenAIEnums(Enum):
     SYSTEM = "system"
@@ -17,6 +19,26 @@ class CoHereEnums(Enum):
     DOCUMENT = "search_document"
     QUERY = "search_query"
 
+class OllamaEnums(Enum):
+    SYSTEM = "system"
+    USER = "user"
+    ASSISTANT = "assistant"
+
+class FakeEnums(Enum):
+    SYSTEM = "system"
+    USER = "user"
+    ASSISTANT = "assistant"
+
+class FakeLatencyDistributionEnums(Enum):
+    CONSTANT = "constant"
+    UNIFORM = "uniform"
+    NORMAL = "normal"
+    EXPONENTIAL = "exponential"
+
+class LLMPriorityEnums(Enum):
+    INTERACTIVE = 0
+    BULK = 1
+
 class DocumentTypeEnum(Enum):
     DOCUMENT = "document"
     QUERY = "query"
\ No newline at end of file
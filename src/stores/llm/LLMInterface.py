@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from utils.tracing import set_llm_usage_attributes
 
 class LLMInterface(ABC):
     """
@@ -26,7 +27,7 @@ class LLMInterface(ABC):
         pass
 
     @abstractmethod
-    def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+    async def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
                             temperature: float = None):
         """
         Generate text based on the provided prompt and chat history.
@@ -40,7 +41,7 @@ class LLMInterface(ABC):
         pass
     
     @abstractmethod
-    def embed_text(self, text: str, document_type: str = None):
+    async def embed_text(self, text: str, document_type: str = None):
         """
         Embed the provided text into a vector representation.
 
@@ -59,4 +60,53 @@ class LLMInterface(ABC):
         :param role: The role of the user (e.g., 'user', 'assistant').
         :return: The constructed prompt.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def connect(self):
+        """
+        Open the provider resources (e.g., warm up models). No-op by default.
+        """
+        pass
+
+    async def disconnect(self):
+        """
+        Release the provider resources (e.g., pooled HTTP connections). No-op by default.
+        """
+        pass
+
+    def set_usage_tracker(self, usage_tracker, provider_name: str):
+        """
+        Set the tracker receiving the token usage reported by the provider.
+
+        :param usage_tracker: An `LLMUsageTracker` instance, or None to stop tracking.
+        :param provider_name: The LLM backend name the usage is recorded under.
+        """
+        self.usage_tracker = usage_tracker
+        self.usage_provider_name = provider_name
+
+    def report_usage(self, model_id: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                     embedding_tokens: int = 0):
+        """
+        Report the tokens billed for one call to the usage tracker, if any, and to
+        the span of the call when it is traced.
+
+        :param model_id: The model that served the call.
+        :param prompt_tokens: The input tokens of a generation.
+        :param completion_tokens: The output tokens of a generation.
+        :param embedding_tokens: The input tokens of an embedding call.
+        """
+        if embedding_tokens:
+            set_llm_usage_attributes(input_tokens=embedding_tokens)
+        else:
+            set_llm_usage_attributes(input_tokens=prompt_tokens or 0, output_tokens=completion_tokens or 0)
+
+        usage_tracker = getattr(self, "usage_tracker", None)
+        if usage_tracker is None:
+            return
+        usage_tracker.record(
+            provider=self.usage_provider_name,
+            model_id=model_id,
+            prompt_tokens=prompt_tokens or 0,
+            completion_tokens=completion_tokens or 0,
+            embedding_tokens=embedding_tokens or 0,
+        )
\ No newline at end of file
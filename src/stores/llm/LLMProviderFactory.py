@@ -1,16 +1,67 @@
 from .LLMEnums import LLMEnums
-from .providers import OpenAIProvider, CoHereProvider
+from .providers import OpenAIProvider, CoHereProvider, FakeProvider, OllamaProvider
+from .LLMRateLimiter import LLMRateLimiter, RateLimitedProvider
+from .LLMTracing import TracedProvider
+from utils.tracing import is_tracing_enabled
 
 class LLMProviderFactory:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, usage_tracker=None):
         """
         Initializes the LLMProviderFactory with a configuration dictionary.
 
         :param config: A dictionary containing configuration settings for the LLM provider.
+        :param usage_tracker: The `LLMUsageTracker` the providers report their token usage to (optional).
         """
         self.config = config
+        self.usage_tracker = usage_tracker
+        self.rate_limiters = {}
+
+    def get_rate_limiter(self, provider: str):
+        """
+        Get the rate limiter shared by all instances of a provider.
+
+        :param provider: The name of the LLM provider.
+        :return: The rate limiter or None if no limits are configured for the provider.
+        """
+        limits = (self.config.LLM_RATE_LIMITS or {}).get(provider)
+        if not limits:
+            return None
+
+        if provider not in self.rate_limiters:
+            self.rate_limiters[provider] = LLMRateLimiter(
+                name=provider,
+                requests_per_minute=limits.get("requests_per_minute"),
+                tokens_per_minute=limits.get("tokens_per_minute"),
+                project_weights=self.config.LLM_RATE_LIMIT_PROJECT_WEIGHTS,
+            )
+        return self.rate_limiters[provider]
 
     def create(self, provider: str):
+        """
+        Creates an instance of the specified LLM provider, wrapped by its rate limiter if configured
+        and traced when tracing is enabled.
+
+        :param provider: The name of the LLM provider to create.
+        :return: An instance of the specified LLM provider.
+        """
+        instance = self.create_provider(provider=provider)
+        if instance is None:
+            return instance
+
+        if self.usage_tracker is not None:
+            instance.set_usage_tracker(self.usage_tracker, provider_name=provider)
+
+        rate_limiter = self.get_rate_limiter(provider=provider)
+        if rate_limiter is not None:
+            instance = RateLimitedProvider(provider=instance, rate_limiter=rate_limiter)
+
+        if is_tracing_enabled():
+            # outermost, so the span covers the rate limiter wait
+            instance = TracedProvider(provider=instance, provider_name=provider)
+
+        return instance
+
+    def create_provider(self, provider: str):
         """
         Creates an instance of the specified LLM provider.
 
@@ -34,6 +85,31 @@ class LLMProviderFactory:
                 default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
                 default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE
             )
+        if provider == LLMEnums.OLLAMA.value:
+            return OllamaProvider(
+                api_url=self.config.OLLAMA_API_URL,
+                default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
+                default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
+                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE,
+                keep_alive=self.config.OLLAMA_KEEP_ALIVE,
+                num_ctx=self.config.OLLAMA_NUM_CTX,
+                num_parallel=self.config.OLLAMA_NUM_PARALLEL,
+                embedding_batch_size=self.config.OLLAMA_EMBEDDING_BATCH_SIZE,
+                request_timeout=self.config.OLLAMA_REQUEST_TIMEOUT
+            )
+        if provider == LLMEnums.FAKE.value:
+            return FakeProvider(
+                default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
+                default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
+                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE,
+                embedding_latency_ms=self.config.FAKE_LLM_EMBEDDING_LATENCY_MS,
+                generation_latency_ms=self.config.FAKE_LLM_GENERATION_LATENCY_MS,
+                latency_jitter_ms=self.config.FAKE_LLM_LATENCY_JITTER_MS,
+                latency_distribution=self.config.FAKE_LLM_LATENCY_DISTRIBUTION,
+                max_requests_per_second=self.config.FAKE_LLM_MAX_REQUESTS_PER_SECOND,
+                error_rate=self.config.FAKE_LLM_ERROR_RATE,
+                seed=self.config.FAKE_LLM_SEED
+            )
         
         return None
         
\ No newline at end of file
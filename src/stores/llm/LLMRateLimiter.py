@@ -0,0 +1,217 @@
+from .LLMInterface import LLMInterface
+from .LLMEnums import LLMPriorityEnums, DocumentTypeEnum
+from helpers import current_project_id
+from utils.metrics import LLM_RATE_LIMIT_QUEUE_DEPTH, LLM_RATE_LIMIT_WAIT
+from utils.tokens import estimate_tokens
+from typing import Dict, List, Union
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        """
+        A token bucket refilled continuously at `per_minute` units per minute.
+
+        :param per_minute: The bucket capacity and refill amount per minute.
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def time_until(self, amount: float) -> float:
+        """
+        Get the seconds to wait until `amount` units are available.
+
+        :param amount: The requested units, clamped to the bucket capacity.
+        :return: The seconds to wait, 0 if available now.
+        """
+        self.refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class LLMRateLimiter:
+    def __init__(self, name: str, requests_per_minute: int = None, tokens_per_minute: int = None,
+                    project_weights: Dict[str, float] = None):
+        """
+        Token-bucket limiter (requests/min and tokens/min) with strict priority classes
+        and weighted fair queuing across projects within a class.
+
+        :param name: The provider name used as metrics label.
+        :param requests_per_minute: The requests allowed per minute (optional).
+        :param tokens_per_minute: The tokens allowed per minute (optional).
+        :param project_weights: The fairness weight per project id, 1.0 by default.
+        """
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.project_weights = {str(k): float(v) for k, v in (project_weights or {}).items()}
+
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.virtual_time: Dict[int, float] = {}
+        self.project_finish: Dict[tuple, float] = {}
+        # (finish, sequence, key) heaps per priority, to evict the finish tags the virtual time passed
+        self.finish_order: Dict[int, list] = {}
+        self.wakeup_handle = None
+
+        self.logger = logging.getLogger(__name__)
+
+    def get_delay(self, tokens: int) -> float:
+        delays = [0.0]
+        if self.request_bucket:
+            delays.append(self.request_bucket.time_until(1))
+        if self.token_bucket:
+            delays.append(self.token_bucket.time_until(tokens))
+        return max(delays)
+
+    def dispatch(self):
+        """
+        Release waiters in (priority, virtual finish time) order while the buckets allow it.
+        """
+        if self.wakeup_handle:
+            self.wakeup_handle.cancel()
+            self.wakeup_handle = None
+
+        while self.waiters:
+            priority, _, _, start, tokens, future = self.waiters[0]
+
+            if not future.done():
+                delay = self.get_delay(tokens)
+                if delay > 0:
+                    self.wakeup_handle = asyncio.get_running_loop().call_later(delay, self.dispatch)
+                    return
+
+                if self.request_bucket:
+                    self.request_bucket.consume(1)
+                if self.token_bucket:
+                    self.token_bucket.consume(tokens)
+                self.virtual_time[priority] = start
+                self.prune_finish_tags(priority)
+                future.set_result(True)
+
+            heapq.heappop(self.waiters)
+            LLM_RATE_LIMIT_QUEUE_DEPTH.labels(
+                provider=self.name, priority=LLMPriorityEnums(priority).name
+            ).dec()
+
+    def prune_finish_tags(self, priority: int):
+        """
+        Forget the projects whose finish tag the virtual time of the class reached: their
+        next call starts at the virtual time either way, and idle projects pile up otherwise.
+        """
+        finish_order = self.finish_order.get(priority)
+        virtual_time = self.virtual_time.get(priority, 0.0)
+
+        while finish_order and finish_order[0][0] <= virtual_time:
+            finish, _, key = heapq.heappop(finish_order)
+            # a later call of the project pushed a newer tag, keep it
+            if self.project_finish.get(key) == finish:
+                del self.project_finish[key]
+
+    async def acquire(self, priority: int, tokens: int = 1, project_id=None):
+        """
+        Wait until the call is allowed to be sent to the provider.
+
+        :param priority: One of `LLMPriorityEnums` values, lower goes first.
+        :param tokens: The estimated tokens consumed by the call.
+        :param project_id: The project the call is made for (fairness key).
+        """
+        priority_name = LLMPriorityEnums(priority).name
+        weight = self.project_weights.get(str(project_id), 1.0)
+
+        key = (priority, project_id)
+        start = max(self.virtual_time.get(priority, 0.0), self.project_finish.get(key, 0.0))
+        finish = start + max(tokens, 1) / weight
+        self.project_finish[key] = finish
+        heapq.heappush(self.finish_order.setdefault(priority, []), (finish, next(self.sequence), key))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, finish, next(self.sequence), start, tokens, future))
+        LLM_RATE_LIMIT_QUEUE_DEPTH.labels(provider=self.name, priority=priority_name).inc()
+
+        started_at = time.perf_counter()
+        try:
+            self.dispatch()
+            await future
+        finally:
+            LLM_RATE_LIMIT_WAIT.labels(provider=self.name, priority=priority_name).observe(
+                time.perf_counter() - started_at
+            )
+
+
+class RateLimitedProvider(LLMInterface):
+    def __init__(self, provider: LLMInterface, rate_limiter: LLMRateLimiter):
+        """
+        Wrap an LLM provider so every call goes through the rate limiter first.
+
+        Query embeddings and generations are interactive, document embeddings are bulk.
+
+        :param provider: The wrapped provider instance.
+        :param rate_limiter: The limiter shared by the instances of the provider.
+        """
+        self.provider = provider
+        self.rate_limiter = rate_limiter
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def set_generation_model(self, model_id: str):
+        return self.provider.set_generation_model(model_id=model_id)
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        return self.provider.set_embedding_model(model_id=model_id, embedding_size=embedding_size)
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.provider.construct_prompt(prompt=prompt, role=role)
+
+    async def connect(self):
+        return await self.provider.connect()
+
+    async def disconnect(self):
+        return await self.provider.disconnect()
+
+    async def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        """
+        Generate text through the wrapped provider with interactive priority.
+        """
+        output_tokens = max_output_tokens if max_output_tokens is not None else \
+            getattr(self.provider, "default_generation_max_output_tokens", None) or 0
+
+        await self.rate_limiter.acquire(
+            priority=LLMPriorityEnums.INTERACTIVE.value,
+            tokens=max(estimate_tokens([prompt] + [str(m) for m in chat_history]), 1) + output_tokens,
+            project_id=current_project_id.get(),
+        )
+        return await self.provider.generate_text(prompt=prompt, chat_history=chat_history,
+                                                 max_output_tokens=max_output_tokens, temperature=temperature)
+
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+        """
+        Embed text through the wrapped provider; document embeddings use bulk priority.
+        """
+        priority = LLMPriorityEnums.INTERACTIVE.value
+        if document_type == DocumentTypeEnum.DOCUMENT.value:
+            priority = LLMPriorityEnums.BULK.value
+
+        await self.rate_limiter.acquire(
+            priority=priority,
+            tokens=max(estimate_tokens([text] if isinstance(text, str) else text), 1),
+            project_id=current_project_id.get(),
+        )
+        return await self.provider.embed_text(text=text, document_type=document_type)
@@ -0,0 +1,86 @@
+from .LLMInterface import LLMInterface
+from helpers import current_project_id
+from utils.tracing import start_span, set_span_attributes, current_llm_span
+from contextlib import contextmanager
+from typing import List, Union
+
+class TracedProvider(LLMInterface):
+    def __init__(self, provider: LLMInterface, provider_name: str):
+        """
+        Wrap an LLM provider so every generation and embedding call runs in a span
+        carrying the model and the token counts billed by the provider.
+
+        :param provider: The wrapped provider instance (possibly rate limited).
+        :param provider_name: The LLM backend name, e.g. "OPENAI".
+        """
+        self.provider = provider
+        self.provider_name = provider_name
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    @contextmanager
+    def llm_span(self, name: str, **attributes):
+        """
+        Open the span of a call, current for the `report_usage` of the wrapped provider.
+        """
+        with start_span(name, **attributes) as span:
+            token = current_llm_span.set(span)
+            try:
+                yield span
+            finally:
+                current_llm_span.reset(token)
+
+    def set_generation_model(self, model_id: str):
+        return self.provider.set_generation_model(model_id=model_id)
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        return self.provider.set_embedding_model(model_id=model_id, embedding_size=embedding_size)
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.provider.construct_prompt(prompt=prompt, role=role)
+
+    async def connect(self):
+        return await self.provider.connect()
+
+    async def disconnect(self):
+        return await self.provider.disconnect()
+
+    async def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                            temperature: float = None):
+        """
+        Generate text through the wrapped provider inside a "llm.generate" span.
+        """
+        with self.llm_span(
+            "llm.generate",
+            **{
+                "gen_ai.system": self.provider_name,
+                "gen_ai.operation.name": "chat",
+                "gen_ai.request.model": getattr(self.provider, "generation_model_id", None),
+                "gen_ai.request.max_tokens": max_output_tokens,
+                "gen_ai.request.temperature": temperature,
+                "project.id": current_project_id.get(),
+            },
+        ):
+            return await self.provider.generate_text(prompt=prompt, chat_history=chat_history,
+                                                     max_output_tokens=max_output_tokens, temperature=temperature)
+
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+        """
+        Embed text through the wrapped provider inside a "llm.embed" span.
+        """
+        texts = [text] if isinstance(text, str) else text
+        with self.llm_span(
+            "llm.embed",
+            **{
+                "gen_ai.system": self.provider_name,
+                "gen_ai.operation.name": "embeddings",
+                "gen_ai.request.model": getattr(self.provider, "embedding_model_id", None),
+                "llm.document_type": document_type,
+                "llm.input_count": len(texts),
+                "project.id": current_project_id.get(),
+            },
+        ) as span:
+            vectors = await self.provider.embed_text(text=text, document_type=document_type)
+            set_span_attributes(span, **{"llm.output_count": len(vectors) if vectors else 0})
+            return vectors
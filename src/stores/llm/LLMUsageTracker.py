@@ -0,0 +1,129 @@
+from helpers import current_project_id, current_endpoint
+from utils.metrics import LLM_TOKEN_USAGE, LLM_COST
+from typing import Dict, Optional, Tuple
+import asyncio
+import datetime
+import logging
+import time
+
+TOKEN_KINDS = ("prompt", "completion", "embedding")
+
+
+class LLMUsageTracker:
+    def __init__(self, usage_model=None, token_prices: Optional[Dict[str, Dict[str, float]]] = None,
+                 flush_interval: float = 10.0, bucket_seconds: int = 3600, max_pending_rows: int = 1000):
+        """
+        Accounts the tokens reported by the LLM providers per project, endpoint and model:
+        Prometheus counters are updated on every call, and the usage is aggregated per
+        `bucket_seconds` in memory then upserted by a background task every `flush_interval`.
+
+        :param usage_model: The `LLMUsageModel` persisting the usage, None to only export metrics.
+        :param token_prices: USD per million tokens by model id, e.g.
+            {"gpt-4o-mini": {"prompt": 0.15, "completion": 0.6}, "text-embedding-3-small": {"embedding": 0.02}}.
+        :param flush_interval: Seconds between two batched writes.
+        :param bucket_seconds: The time granularity of the stored usage rows.
+        :param max_pending_rows: Pending rows triggering an early flush.
+        """
+        self.usage_model = usage_model
+        self.token_prices = token_prices or {}
+        self.flush_interval = flush_interval
+        self.bucket_seconds = max(int(bucket_seconds), 1)
+        self.max_pending_rows = max_pending_rows
+
+        self.pending: Dict[Tuple, dict] = {}
+        self.flush_requested = asyncio.Event()
+        self.flush_task = None
+
+        self.logger = logging.getLogger(__name__)
+
+    def compute_cost(self, model_id: str, tokens: Dict[str, int]) -> float:
+        prices = self.token_prices.get(model_id) or {}
+        return sum(tokens[kind] * prices.get(kind, 0.0) for kind in TOKEN_KINDS) / 1_000_000
+
+    def record(self, provider: str, model_id: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+               embedding_tokens: int = 0):
+        """
+        Account one provider call to the current project and endpoint.
+        """
+        project_id = current_project_id.get()
+        endpoint = current_endpoint.get() or ""
+        model_id = model_id or ""
+        tokens = {"prompt": prompt_tokens, "completion": completion_tokens, "embedding": embedding_tokens}
+        cost = self.compute_cost(model_id, tokens)
+
+        labels = {"project": str(project_id) if project_id is not None else "", "endpoint": endpoint,
+                  "provider": provider, "model": model_id}
+        for kind, count in tokens.items():
+            if count:
+                LLM_TOKEN_USAGE.labels(**labels, kind=kind).inc(count)
+        if cost:
+            LLM_COST.labels(**labels).inc(cost)
+
+        if self.usage_model is None:
+            return
+
+        period_start = int(time.time()) // self.bucket_seconds * self.bucket_seconds
+        key = (period_start, project_id, endpoint, provider, model_id)
+        row = self.pending.get(key)
+        if row is None:
+            row = self.pending[key] = {"request_count": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                       "embedding_tokens": 0, "cost_usd": 0.0}
+        row["request_count"] += 1
+        row["prompt_tokens"] += prompt_tokens
+        row["completion_tokens"] += completion_tokens
+        row["embedding_tokens"] += embedding_tokens
+        row["cost_usd"] += cost
+
+        if len(self.pending) >= self.max_pending_rows:
+            self.flush_requested.set()
+
+    async def flush(self):
+        """
+        Write the pending usage in one upsert; kept for the next flush if the write fails.
+        """
+        if not self.pending or self.usage_model is None:
+            return
+
+        pending, self.pending = self.pending, {}
+        rows = [
+            {
+                "usage_period_start": datetime.datetime.fromtimestamp(period_start, tz=datetime.timezone.utc),
+                "usage_project_id": project_id,
+                "usage_endpoint": endpoint,
+                "usage_provider": provider,
+                "usage_model": model_id,
+                **counters,
+            }
+            for (period_start, project_id, endpoint, provider, model_id), counters in pending.items()
+        ]
+        try:
+            await self.usage_model.add_usage(rows)
+        except Exception as e:
+            self.logger.error(f"Failed to store the LLM usage of {len(rows)} rows: {e}")
+            for key, counters in pending.items():
+                row = self.pending.setdefault(key, dict.fromkeys(counters, 0))
+                for name, value in counters.items():
+                    row[name] += value
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_requested.clear()
+            await self.flush()
+
+    async def start(self):
+        if self.usage_model is not None and self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+            self.flush_task = None
+        await self.flush()
@@ -31,7 +31,7 @@ class CoHereProvider(LLMInterface):
 
         self.enums = CoHereEnums
         
-        self.client = cohere.ClientV2(
+        self.client = cohere.AsyncClientV2(
             api_key=self.api_key,
             )
 
@@ -81,7 +81,7 @@ class CoHereProvider(LLMInterface):
             "content": prompt
         }
     
-    def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+    async def generate_text(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
                         temperature: float = None):
         """
         Generate text based on the provided prompt and chat history.
@@ -108,13 +108,19 @@ class CoHereProvider(LLMInterface):
             self.construct_prompt(prompt=prompt, role=CoHereEnums.USER.value)
             )
 
-        response = self.client.chat(
+        response = await self.client.chat(
             model=self.generation_model_id,
             messages=chat_history,
             max_tokens=max_output_tokens,
             temperature=temperature
         )
 
+        billed_units = response.usage.billed_units if response and response.usage else None
+        if billed_units:
+            self.report_usage(model_id=self.generation_model_id,
+                              prompt_tokens=int(billed_units.input_tokens or 0),
+                              completion_tokens=int(billed_units.output_tokens or 0))
+
         if not response or not response.text:
             self.logger.error("Error while generating text with CoHere")
             return None
@@ -122,7 +128,7 @@ class CoHereProvider(LLMInterface):
         return response.message.content[0].text
     
 
-    def embed_text(self, text: Union[str,List[str]], document_type: str = None):
+    async def embed_text(self, text: Union[str,List[str]], document_type: str = None):
         """
         Embed the provided text into a vector representation.
         
@@ -146,13 +152,18 @@ class CoHereProvider(LLMInterface):
             input_type = CoHereEnums.QUERY
 
 
-        response = self.client.embed(
+        response = await self.client.embed(
             model=self.embedding_model_id,
             texts=[self.process_text(t) for t in text],
             input_type= input_type,
             embedding_types=['float']
         )
 
+        billed_units = response.meta.billed_units if response and response.meta else None
+        if billed_units:
+            self.report_usage(model_id=self.embedding_model_id,
+                              embedding_tokens=int(billed_units.input_tokens or 0))
+
         if not response or not response.embeddings or not response.embeddings.float:
             self.logger.error("Error while embedding text with CoHere")
             return None
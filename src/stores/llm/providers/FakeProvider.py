@@ -0,0 +1,258 @@
+from ..LLMInterface import LLMInterface
+from ..LLMEnums import FakeEnums, FakeLatencyDistributionEnums
+from utils.tokens import estimate_tokens
+from functools import lru_cache
+from typing import List, Union
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import re
+import time
+
+CANNED_ANSWERS = [
+    "Based on the provided documents, the answer is covered in the first document.",
+    "The documents describe this topic in detail; the key points are summarized below.",
+    "According to the retrieved context, this question is answered by the listed documents.",
+    "The provided documents do not contain sufficient information to fully answer this question.",
+]
+
+FEATURES_PER_TOKEN = 8
+
+
+@lru_cache(maxsize=100000)
+def hash_token_features(seed: int, model_id: str, embedding_size: int, token: str) -> tuple:
+    """
+    The (dimension, sign) features of a token, cached across the provider instances:
+    keyed on everything they depend on, no instance is kept alive by the cache.
+    """
+    digest = hashlib.sha256(f"{seed}:{model_id}:{token}".encode("utf-8")).digest()
+    return tuple(
+        (int.from_bytes(digest[i:i + 3], "big") % embedding_size, 1.0 if digest[i + 3] & 1 else -1.0)
+        for i in range(0, FEATURES_PER_TOKEN * 4, 4)
+    )
+
+
+class FakeProvider(LLMInterface):
+
+    def __init__(self, default_input_max_characters: int = 1000,
+                default_generation_max_output_tokens: int = 1000,
+                default_generation_temperature: float = 0.1,
+                embedding_latency_ms: float = 0.0,
+                generation_latency_ms: float = 0.0,
+                latency_jitter_ms: float = 0.0,
+                latency_distribution: str = FakeLatencyDistributionEnums.CONSTANT.value,
+                max_requests_per_second: float = None,
+                error_rate: float = 0.0,
+                seed: int = 0):
+        """
+        Initialize the FakeProvider, an offline provider for load testing.
+
+        Embeddings are deterministic: every token is hashed to a few signed dimensions
+        and a text is embedded as the normalized sum of its tokens, so texts sharing words
+        stay close to each other. Generations are canned answers picked by prompt hash.
+
+        :param default_input_max_characters: The maximum number of characters for input text.
+        :param default_generation_max_output_tokens: The maximum number of tokens for text generation.
+        :param default_generation_temperature: The temperature for text generation (ignored).
+        :param embedding_latency_ms: The mean simulated latency of an embedding call.
+        :param generation_latency_ms: The mean simulated latency of a generation call.
+        :param latency_jitter_ms: The spread of the latency distribution.
+        :param latency_distribution: One of `FakeLatencyDistributionEnums`.
+        :param max_requests_per_second: The throughput limit across all calls (optional).
+        :param error_rate: The probability in [0, 1] that a call fails.
+        :param seed: The seed for embeddings, latencies and injected errors.
+        """
+        self.default_input_max_characters = default_input_max_characters
+        self.default_generation_max_output_tokens = default_generation_max_output_tokens
+        self.default_generation_temperature = default_generation_temperature
+
+        self.embedding_latency_ms = embedding_latency_ms or 0.0
+        self.generation_latency_ms = generation_latency_ms or 0.0
+        self.latency_jitter_ms = latency_jitter_ms or 0.0
+        self.latency_distribution = latency_distribution or FakeLatencyDistributionEnums.CONSTANT.value
+        self.max_requests_per_second = max_requests_per_second
+        self.error_rate = error_rate or 0.0
+        self.seed = seed or 0
+
+        self.generation_model_id = None
+
+        self.embedding_model_id = None
+        self.embedding_size = None
+
+        self.enums = FakeEnums
+
+        self.random = random.Random(self.seed)
+        self.next_request_at = 0.0
+
+        self.logger = logging.getLogger(__name__)
+
+    def set_generation_model(self, model_id: str):
+        """
+        Set the generation model to be used.
+
+        :param model_id: The ID of the model to be set.
+        """
+        self.generation_model_id = model_id
+        self.logger.info(f"Generation model set to {model_id}")
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        """
+        Set the embedding model to be used.
+
+        :param model_id: The ID of the model to be set.
+        :param embedding_size: The size of the embedding.
+        """
+        self.embedding_model_id = model_id
+        self.embedding_size = embedding_size
+        self.logger.info(f"Embedding model set to {model_id} with size {embedding_size}")
+
+    def process_text(self, text: str):
+        """
+        Process the input text to ensure it meets the requirements of the LLM.
+
+        :param text: The input text to be processed.
+        :return: The processed text.
+        """
+        return text[:self.default_input_max_characters].strip()
+
+    def construct_prompt(self, prompt: str, role: str):
+        """
+        Construct a prompt based on the provided input and role.
+
+        :param prompt: The input prompt.
+        :param role: The role of the user (e.g., 'user', 'assistant').
+        :return: The constructed prompt.
+        """
+        return {
+            "role": role,
+            "content": prompt
+        }
+
+    def sample_latency(self, mean_ms: float) -> float:
+        """
+        Sample a latency in seconds from the configured distribution.
+
+        :param mean_ms: The mean latency in milliseconds.
+        :return: The latency in seconds.
+        """
+        if mean_ms <= 0 and self.latency_jitter_ms <= 0:
+            return 0.0
+
+        if self.latency_distribution == FakeLatencyDistributionEnums.UNIFORM.value:
+            latency_ms = self.random.uniform(mean_ms - self.latency_jitter_ms, mean_ms + self.latency_jitter_ms)
+        elif self.latency_distribution == FakeLatencyDistributionEnums.NORMAL.value:
+            latency_ms = self.random.gauss(mean_ms, self.latency_jitter_ms)
+        elif self.latency_distribution == FakeLatencyDistributionEnums.EXPONENTIAL.value:
+            latency_ms = self.random.expovariate(1.0 / mean_ms) if mean_ms > 0 else 0.0
+        else:
+            latency_ms = mean_ms
+
+        return max(latency_ms, 0.0) / 1000.0
+
+    async def simulate_call(self, mean_latency_ms: float) -> bool:
+        """
+        Apply the throughput limit, the simulated latency and the error injection.
+
+        :param mean_latency_ms: The mean latency of the call in milliseconds.
+        :return: False if an error was injected for this call, True otherwise.
+        """
+        if self.max_requests_per_second:
+            now = time.monotonic()
+            start_at = max(now, self.next_request_at)
+            self.next_request_at = start_at + 1.0 / self.max_requests_per_second
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+
+        latency = self.sample_latency(mean_latency_ms)
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+        if self.error_rate > 0 and self.random.random() < self.error_rate:
+            return False
+
+        return True
+
+    def token_features(self, token: str) -> tuple:
+        """
+        Get the deterministic hashed features of a single token.
+
+        :param token: The token to be embedded.
+        :return: A tuple of (dimension, sign) pairs within `embedding_size`.
+        """
+        return hash_token_features(self.seed, self.embedding_model_id, self.embedding_size, token)
+
+    def embed_single(self, text: str) -> List[float]:
+        """
+        Embed a single text as the normalized sum of its token features.
+
+        :param text: The text to be embedded.
+        :return: The embedding of size `embedding_size`.
+        """
+        tokens = re.findall(r"\w+", self.process_text(text).lower()) or [""]
+
+        vector = [0.0] * self.embedding_size
+        for token in tokens:
+            for dimension, sign in self.token_features(token):
+                vector[dimension] += sign
+
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    async def generate_text(self, prompt: str, chat_history: list=[],
+                    max_output_tokens: int=None, temperature: float = None):
+        """
+        Generate a canned answer for the provided prompt.
+
+        :param prompt: The input prompt for text generation.
+        :param chat_history: The history of the chat (optional).
+        :param max_output_tokens: The maximum number of tokens to generate (optional).
+        :param temperature: The temperature for sampling (ignored).
+        :return: The generated text.
+        """
+        if not self.generation_model_id:
+            self.logger.error("Generation model for Fake provider was not set")
+            return None
+
+        max_output_tokens = max_output_tokens if max_output_tokens is not None else self.default_generation_max_output_tokens
+
+        chat_history.append(
+            self.construct_prompt(prompt=prompt, role=FakeEnums.USER.value)
+        )
+
+        if not await self.simulate_call(self.generation_latency_ms):
+            self.logger.error("Injected error while generating text with Fake provider")
+            return None
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        answer = " ".join(CANNED_ANSWERS[digest[0] % len(CANNED_ANSWERS)].split()[:max_output_tokens])
+
+        # 4 characters per token, like the usage estimates elsewhere
+        self.report_usage(model_id=self.generation_model_id,
+                          prompt_tokens=estimate_tokens([str(m.get("content", "")) for m in chat_history]),
+                          completion_tokens=estimate_tokens([answer]))
+        return answer
+
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+        """
+        Embed the provided text into deterministic vector representations.
+
+        :param text: The input text to be embedded.
+        :param document_type: The type of document (ignored).
+        :return: The embedded vector representation of the text.
+        """
+        if isinstance(text, str):
+            text = [text]
+
+        if not self.embedding_model_id or not self.embedding_size:
+            self.logger.error("Embedding model for Fake provider was not set")
+            return None
+
+        if not await self.simulate_call(self.embedding_latency_ms):
+            self.logger.error("Injected error while embedding text with Fake provider")
+            return None
+
+        self.report_usage(model_id=self.embedding_model_id, embedding_tokens=estimate_tokens(text))
+
+        return [ self.embed_single(t) for t in text ]
@@ -0,0 +1,255 @@
+from ..LLMInterface import LLMInterface
+from ..LLMEnums import OllamaEnums
+from typing import Dict, List, Union
+import asyncio
+import httpx
+import logging
+
+class OllamaProvider(LLMInterface):
+
+    def __init__(self, api_url: str,
+                default_input_max_characters: int = 1000,
+                default_generation_max_output_tokens: int = 1000,
+                default_generation_temperature: float = 0.1,
+                keep_alive: str = "30m",
+                num_ctx: int = None,
+                num_parallel: int = 4,
+                embedding_batch_size: int = 32,
+                request_timeout: float = 120.0):
+        """
+        Initialize the OllamaProvider against the native Ollama API.
+
+        :param api_url: The base URL of the Ollama server (e.g., http://ollama:11434).
+        :param default_input_max_characters: The maximum number of characters for input text.
+        :param default_generation_max_output_tokens: The maximum number of tokens for text generation.
+        :param default_generation_temperature: The temperature for text generation.
+        :param keep_alive: How long Ollama keeps a model loaded after a request (e.g., "30m", "-1").
+        :param num_ctx: The context window passed as the `num_ctx` option (optional).
+        :param num_parallel: The concurrent requests allowed per model, matching `OLLAMA_NUM_PARALLEL`.
+        :param embedding_batch_size: The number of texts sent in one `/api/embed` call.
+        :param request_timeout: The timeout of a single HTTP request in seconds.
+        """
+        self.api_url = api_url.rstrip("/")
+
+        self.default_input_max_characters = default_input_max_characters
+        self.default_generation_max_output_tokens = default_generation_max_output_tokens
+        self.default_generation_temperature = default_generation_temperature
+
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.num_parallel = num_parallel if num_parallel and num_parallel > 0 else 1
+        self.embedding_batch_size = embedding_batch_size if embedding_batch_size and embedding_batch_size > 0 else 32
+
+        self.generation_model_id = None
+
+        self.embedding_model_id = None
+        self.embedding_size = None
+
+        self.enums = OllamaEnums
+
+        self.client = httpx.AsyncClient(
+            base_url=self.api_url,
+            timeout=request_timeout,
+            limits=httpx.Limits(
+                max_connections=self.num_parallel * 2,
+                max_keepalive_connections=self.num_parallel * 2,
+            ),
+        )
+        self.model_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        self.logger = logging.getLogger(__name__)
+
+    def set_generation_model(self, model_id: str):
+        """
+        Set the generation model to be used.
+
+        :param model_id: The ID of the model to be set.
+        """
+        self.generation_model_id = model_id
+        self.logger.info(f"Generation model set to {model_id}")
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        """
+        Set the embedding model to be used.
+
+        :param model_id: The ID of the model to be set.
+        :param embedding_size: The size of the embedding.
+        """
+        self.embedding_model_id = model_id
+        self.embedding_size = embedding_size
+        self.logger.info(f"Embedding model set to {model_id} with size {embedding_size}")
+
+    def process_text(self, text: str):
+        """
+        Process the input text to ensure it meets the requirements of the LLM.
+
+        :param text: The input text to be processed.
+        :return: The processed text.
+        """
+        return text[:self.default_input_max_characters].strip()
+
+    def construct_prompt(self, prompt: str, role: str):
+        """
+        Construct a prompt based on the provided input and role.
+
+        :param prompt: The input prompt.
+        :param role: The role of the user (e.g., 'user', 'assistant').
+        :return: The constructed prompt.
+        """
+        return {
+            "role": role,
+            "content": prompt
+        }
+
+    def get_model_semaphore(self, model_id: str) -> asyncio.Semaphore:
+        """
+        Get the semaphore limiting the concurrent requests sent for a model.
+
+        :param model_id: The ID of the model.
+        :return: The semaphore of the model.
+        """
+        if model_id not in self.model_semaphores:
+            self.model_semaphores[model_id] = asyncio.Semaphore(self.num_parallel)
+        return self.model_semaphores[model_id]
+
+    def get_options(self, **options) -> dict:
+        """
+        Build the Ollama `options` payload, dropping unset values.
+
+        :return: The options dictionary.
+        """
+        options["num_ctx"] = self.num_ctx
+        return {k: v for k, v in options.items() if v is not None}
+
+    async def post(self, model_id: str, path: str, payload: dict):
+        """
+        Send a request to the Ollama API under the model concurrency limit.
+
+        :param model_id: The ID of the model the request targets.
+        :param path: The API path (e.g., /api/embed).
+        :param payload: The JSON payload.
+        :return: The decoded JSON response or None on error.
+        """
+        async with self.get_model_semaphore(model_id):
+            try:
+                response = await self.client.post(path, json=payload)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError as e:
+                self.logger.error(f"Error while calling Ollama {path}: {e}")
+                return None
+
+    async def connect(self):
+        """
+        Load the configured models into memory so the first requests do not pay for it.
+        """
+        for model_id, path in [(self.generation_model_id, "/api/generate"),
+                               (self.embedding_model_id, "/api/embed")]:
+            if not model_id:
+                continue
+
+            payload = {"model": model_id, "keep_alive": self.keep_alive}
+            if path == "/api/embed":
+                payload["input"] = []
+
+            if await self.post(model_id=model_id, path=path, payload=payload) is not None:
+                self.logger.info(f"Ollama model {model_id} loaded with keep_alive={self.keep_alive}")
+
+    async def disconnect(self):
+        """
+        Close the pooled HTTP connections to the Ollama server.
+        """
+        await self.client.aclose()
+
+    async def generate_text(self, prompt: str, chat_history: list=[],
+                    max_output_tokens: int=None, temperature: float = None):
+        """
+        Generate text based on the provided prompt and chat history.
+
+        :param prompt: The input prompt for text generation.
+        :param chat_history: The history of the chat (optional).
+        :param max_output_tokens: The maximum number of tokens to generate (optional).
+        :param temperature: The temperature for sampling (optional).
+        :return: The generated text.
+        """
+        if not self.generation_model_id:
+            self.logger.error("Generation model for Ollama was not set")
+            return None
+
+        max_output_tokens = max_output_tokens if max_output_tokens is not None else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
+
+        chat_history.append(
+            self.construct_prompt(prompt=prompt, role=OllamaEnums.USER.value)
+        )
+
+        response = await self.post(
+            model_id=self.generation_model_id,
+            path="/api/chat",
+            payload={
+                "model": self.generation_model_id,
+                "messages": chat_history,
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": self.get_options(num_predict=max_output_tokens, temperature=temperature),
+            }
+        )
+
+        if response:
+            self.report_usage(model_id=self.generation_model_id,
+                              prompt_tokens=response.get("prompt_eval_count", 0),
+                              completion_tokens=response.get("eval_count", 0))
+
+        if not response or not response.get("message") or response["message"].get("content") is None:
+            self.logger.error("Error while generating text with Ollama")
+            return None
+
+        return response["message"]["content"]
+
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+        """
+        Embed the provided text into a vector representation using batched `/api/embed` calls.
+
+        :param text: The input text to be embedded.
+        :param document_type: The type of document (optional).
+        :return: The embedded vector representation of the text.
+        """
+        if isinstance(text, str):
+            text = [text]
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for Ollama was not set")
+            return None
+
+        texts = [self.process_text(t) for t in text]
+        batches = [
+            texts[i:i + self.embedding_batch_size]
+            for i in range(0, len(texts), self.embedding_batch_size)
+        ]
+
+        responses = await asyncio.gather(*[
+            self.post(
+                model_id=self.embedding_model_id,
+                path="/api/embed",
+                payload={
+                    "model": self.embedding_model_id,
+                    "input": batch,
+                    "truncate": True,
+                    "keep_alive": self.keep_alive,
+                    "options": self.get_options(),
+                }
+            )
+            for batch in batches
+        ])
+
+        self.report_usage(model_id=self.embedding_model_id,
+                          embedding_tokens=sum(r.get("prompt_eval_count", 0) for r in responses if r))
+
+        embeddings = []
+        for batch, response in zip(batches, responses):
+            if not response or len(response.get("embeddings") or []) != len(batch):
+                self.logger.error("Error while embedding text with Ollama")
+                return None
+            embeddings.extend(response["embeddings"])
+
+        return embeddings
@@ -1,6 +1,6 @@
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import OpenAIEnums
-from openai import OpenAI
+from openai import AsyncOpenAI
 from typing import List, Union
 import logging
 
@@ -25,7 +25,7 @@ class OpenAIProvider(LLMInterface):
 
         self.enums = OpenAIEnums
         
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             api_key=self.api_key,
             base_url=self.api_url if self.api_url and len(self.api_url) else None
         )
@@ -76,7 +76,7 @@ class OpenAIProvider(LLMInterface):
         
 
 
-    def generate_text(self, prompt: str, chat_history: list=[],
+    async def generate_text(self, prompt: str, chat_history: list=[],
                     max_output_tokens: int=None,temperature: float = None):
         """
         Generate text based on the provided prompt and chat history.
@@ -102,20 +102,31 @@ class OpenAIProvider(LLMInterface):
             self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value)
         )
 
-        response = self.client.chat.completions.create(
+        response = await self.client.chat.completions.create(
             model=self.generation_model_id,
             messages=chat_history,
             max_tokens=max_output_tokens,
             temperature=temperature
         )
 
+        if response and response.usage:
+            self.report_usage(model_id=self.generation_model_id,
+                              prompt_tokens=response.usage.prompt_tokens,
+                              completion_tokens=response.usage.completion_tokens)
+
         if not response or not response.choices or len(response.choices) == 0 or not response.choices[0].message:
             self.logger.error("No response from OpenAI API.")
             return None
         
         return response.choices[0].message.content
+
+    async def disconnect(self):
+        """
+        Close the pooled HTTP connections of the OpenAI client.
+        """
+        await self.client.close()
     
-    def embed_text(self, text:Union[str, List[str]] , document_type: str = None):
+    async def embed_text(self, text:Union[str, List[str]] , document_type: str = None):
         """
         Embed the provided text into a vector representation.
         
@@ -133,11 +144,14 @@ class OpenAIProvider(LLMInterface):
             self.logger.error("Embedding model ID is not set.")
             return None
         
-        response = self.client.embeddings.create(
+        response = await self.client.embeddings.create(
             model=self.embedding_model_id,
-            input=[self.process_text(text)]
+            input=[self.process_text(t) for t in text]
         )
 
+        if response and response.usage:
+            self.report_usage(model_id=self.embedding_model_id, embedding_tokens=response.usage.prompt_tokens)
+
         if not response or not response.data or len(response.data) == 0 or not response.data[0].embedding:
             self.logger.error("Error while embedding text with OpenAI.")
             return None
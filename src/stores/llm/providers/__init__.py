@@ -1,2 +1,4 @@
 from .CoHereProvider import CoHereProvider
-from .OpenAIProvider import OpenAIProvider
\ No newline at end of file
+from .OpenAIProvider import OpenAIProvider
+from .FakeProvider import FakeProvider
+from .OllamaProvider import OllamaProvider
\ No newline at end of file
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class RerankerEnums(Enum):
+    COSINE = "COSINE"
+    LEXICAL = "LEXICAL"
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from models.db_schemes import RetrievedDocument
+from typing import List
+
+class RerankerInterface(ABC):
+
+    @abstractmethod
+    async def rerank(self, query: str, query_vector: list, documents: List[RetrievedDocument],
+                        top_k: int) -> List[RetrievedDocument]:
+        """Re-score the retrieved candidates in one batch and keep the best ones.
+
+        Args:
+            query (str): The query text.
+            query_vector (list): The query embedding.
+            documents (List[RetrievedDocument]): The candidates returned by the vector db.
+            top_k (int): The number of documents to keep.
+
+        Returns:
+            List[RetrievedDocument]: The best `top_k` documents by descending reranker score.
+        """
+        pass
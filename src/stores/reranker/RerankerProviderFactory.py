@@ -0,0 +1,20 @@
+from .providers import CosineReranker, LexicalReranker
+from .RerankerEnums import RerankerEnums
+
+class RerankerProviderFactory:
+    def __init__(self, config):
+        self.config = config
+
+    def create(self, provider: str) -> object:
+        """
+        Create a reranker based on the provider name
+        """
+        if provider == RerankerEnums.COSINE.value:
+            return CosineReranker()
+
+        if provider == RerankerEnums.LEXICAL.value:
+            return LexicalReranker(
+                lexical_weight=self.config.RERANKER_LEXICAL_WEIGHT,
+            )
+
+        return None
@@ -0,0 +1,2 @@
+from .RerankerProviderFactory import RerankerProviderFactory
+from .RerankerEnums import RerankerEnums
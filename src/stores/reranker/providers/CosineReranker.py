@@ -0,0 +1,44 @@
+from ..RerankerInterface import RerankerInterface
+from models.db_schemes import RetrievedDocument
+from typing import List
+import logging
+import numpy as np
+
+
+class CosineReranker(RerankerInterface):
+    def __init__(self):
+        self.logger = logging.getLogger('uvicorn')
+
+    async def rerank(self, query: str, query_vector: list, documents: List[RetrievedDocument],
+                        top_k: int) -> List[RetrievedDocument]:
+        """Re-score the candidates with the exact cosine similarity of their full-precision vectors.
+
+        Args:
+            query (str): The query text.
+            query_vector (list): The query embedding.
+            documents (List[RetrievedDocument]): The candidates, fetched with their vectors.
+            top_k (int): The number of documents to keep.
+
+        Returns:
+            List[RetrievedDocument]: The best `top_k` documents by descending cosine similarity.
+        """
+        if not documents:
+            return []
+
+        if query_vector is None or not all(doc.vector for doc in documents):
+            self.logger.warning("Cosine reranker needs the candidate vectors, keeping the ANN order")
+            return documents[:top_k]
+
+        matrix = np.asarray([doc.vector for doc in documents], dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        scores = matrix @ query
+        order = np.argsort(-scores, kind="stable")[:top_k]
+
+        return [
+            documents[i].model_copy(update={"score": float(scores[i])})
+            for i in order
+        ]
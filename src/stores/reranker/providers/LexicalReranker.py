@@ -0,0 +1,53 @@
+from ..RerankerInterface import RerankerInterface
+from models.db_schemes import RetrievedDocument
+from typing import List
+import math
+import re
+
+
+class LexicalReranker(RerankerInterface):
+    def __init__(self, lexical_weight: float = 0.3):
+        """Blend the vector score with an IDF-weighted term overlap between query and chunk.
+
+        Args:
+            lexical_weight (float): The weight of the lexical score in [0, 1].
+        """
+        self.lexical_weight = lexical_weight if lexical_weight is not None else 0.3
+
+    def tokenize(self, text: str) -> set:
+        return set(re.findall(r"\w+", (text or "").lower()))
+
+    async def rerank(self, query: str, query_vector: list, documents: List[RetrievedDocument],
+                        top_k: int) -> List[RetrievedDocument]:
+        """Re-score the candidates with the blended vector and lexical scores.
+
+        Args:
+            query (str): The query text.
+            query_vector (list): The query embedding.
+            documents (List[RetrievedDocument]): The candidates returned by the vector db.
+            top_k (int): The number of documents to keep.
+
+        Returns:
+            List[RetrievedDocument]: The best `top_k` documents by descending blended score.
+        """
+        if not documents:
+            return []
+
+        query_terms = self.tokenize(query)
+        documents_terms = [self.tokenize(doc.text) for doc in documents]
+
+        # IDF over the candidate set: terms present in every candidate do not discriminate
+        idf = {
+            term: math.log(1 + len(documents) / (1 + sum(term in terms for terms in documents_terms)))
+            for term in query_terms
+        }
+        query_weight = sum(idf.values()) or 1.0
+
+        scored = []
+        for doc, terms in zip(documents, documents_terms):
+            lexical_score = sum(idf[term] for term in query_terms if term in terms) / query_weight
+            score = (1 - self.lexical_weight) * doc.score + self.lexical_weight * lexical_score
+            scored.append(doc.model_copy(update={"score": score}))
+
+        scored.sort(key=lambda doc: doc.score, reverse=True)
+        return scored[:top_k]
@@ -0,0 +1,2 @@
+from .CosineReranker import CosineReranker
+from .LexicalReranker import LexicalReranker
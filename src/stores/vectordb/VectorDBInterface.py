@@ -105,15 +105,34 @@ class VectorDBInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def delete_by_record_ids(self, collection_name: str, record_ids: List[str]) -> bool:
+        """Delete the records with the given IDs from the collection.
+
+        Args:
+            collection_name (str): The name of the collection.
+            record_ids (List[str]): The IDs of the records to delete.
+
+        Returns:
+            bool: True if the records were deleted successfully, False otherwise.
+        """
+        pass
+
     @abstractmethod
     def search_by_vector(self, collection_name: str, vector: list,
-                        limit: int = 10) -> List[RetrievedDocument]:
+                        limit: int = 10, with_vectors: bool = False,
+                        ef_search: Optional[int] = None,
+                        project_id: Optional[int] = None) -> List[RetrievedDocument]:
         """Search for records in the collection based on a vector.
 
         Args:
             collection_name (str): The name of the collection.
             vector (list): The vector to search for.
             limit (int): The maximum number of records to return.
+            with_vectors (bool): Whether to return the stored vectors with the records.
+            ef_search (int, optional): The HNSW search breadth, lower is faster but less exact.
+            project_id (int, optional): The project owning the collection, lets backends
+                reading the chunk text from `chunks` restrict it to the project.
 
         Returns:
             List[Dict[str, Any]]: A list of matching records.
@@ -1,14 +1,27 @@
 from .providers import QdrantDBProvider,PGVectorProvider
 from .VectorDBEnums import VectorDBEnums
+from .VectorDBTracing import TracedVectorDBProvider
+from utils.tracing import is_tracing_enabled
 from controllers.BaseController import BaseController
 from sqlalchemy.orm import sessionmaker
 class VectorDBProviderFactory:
-    def __init__(self,config, db_client:sessionmaker=None):
+    def __init__(self,config, db_client:sessionmaker=None, read_db_client=None):
         self.config = config
         self.db_client = db_client
+        self.read_db_client = read_db_client
         self.controller = BaseController()
 
     def create (self, provider:str) -> object:
+        """
+        Create a vector database provider based on the provider name,
+        traced when tracing is enabled
+        """
+        instance = self.create_provider(provider=provider)
+        if instance is not None and is_tracing_enabled():
+            instance = TracedVectorDBProvider(provider=instance, provider_name=provider)
+        return instance
+
+    def create_provider(self, provider:str) -> object:
         """
         Create a vector database provider based on the provider name
         """
@@ -26,6 +39,9 @@ class VectorDBProviderFactory:
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
                 default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
                 index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD,
+                shared_table=self.config.VECTOR_DB_PGVEC_SHARED_TABLE,
+                store_text=self.config.VECTOR_DB_PGVEC_STORE_TEXT,
+                read_db_client=self.read_db_client,
             )
         
         return None
\ No newline at end of file
@@ -0,0 +1,91 @@
+from .VectorDBInterface import VectorDBInterface
+from models.db_schemes import RetrievedDocument
+from utils.tracing import start_span, set_span_attributes
+from typing import List, Dict, Any, Optional
+
+class TracedVectorDBProvider(VectorDBInterface):
+    """
+    Wraps a vector db provider so its collection, insert and search calls run in
+    client spans carrying the collection, the limit and the result count.
+    """
+
+    def __init__(self, provider: VectorDBInterface, provider_name: str):
+        """
+        Args:
+            provider (VectorDBInterface): The wrapped provider instance.
+            provider_name (str): The vector db backend name, e.g. "QDRANT".
+        """
+        self.provider = provider
+        self.provider_name = provider_name
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def span(self, operation: str, collection_name: Optional[str] = None, **attributes):
+        return start_span(
+            f"vectordb.{operation}",
+            **{
+                "db.system": self.provider_name.lower(),
+                "db.operation.name": operation,
+                "db.collection.name": collection_name,
+                **attributes,
+            },
+        )
+
+    async def connect(self) -> None:
+        return await self.provider.connect()
+
+    async def disconnect(self) -> None:
+        return await self.provider.disconnect()
+
+    async def is_collection_existed(self, collection_name: str, **kwargs) -> bool:
+        return await self.provider.is_collection_existed(collection_name=collection_name, **kwargs)
+
+    async def list_all_collections(self) -> List[str]:
+        with self.span("list_collections") as span:
+            collections = await self.provider.list_all_collections()
+            set_span_attributes(span, **{"db.response.returned_rows": len(collections) if collections else 0})
+            return collections
+
+    async def get_collection_info(self, collection_name: str) -> Dict[str, Any]:
+        with self.span("get_collection_info", collection_name):
+            return await self.provider.get_collection_info(collection_name=collection_name)
+
+    async def delete_collection(self, collection_name: str):
+        with self.span("delete_collection", collection_name):
+            return await self.provider.delete_collection(collection_name=collection_name)
+
+    async def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False) -> bool:
+        with self.span("create_collection", collection_name,
+                       **{"db.vector.dimension": embedding_size, "db.collection.reset": bool(do_reset)}):
+            return await self.provider.create_collection(collection_name=collection_name,
+                                                         embedding_size=embedding_size, do_reset=do_reset)
+
+    async def insert_one(self, collection_name: str, text: str, vector: list,
+                         metadata: Optional[dict] = None, record_id: Optional[str] = None) -> bool:
+        with self.span("insert", collection_name, **{"db.operation.batch.size": 1}):
+            return await self.provider.insert_one(collection_name=collection_name, text=text, vector=vector,
+                                                  metadata=metadata, record_id=record_id)
+
+    async def insert_many(self, collection_name: str, texts: List[str], vectors: List[list],
+                          metadata: List[dict] = None, record_ids: List[str] = None, batch_size: int = 50):
+        with self.span("insert_many", collection_name, **{"db.operation.batch.size": len(texts)}):
+            return await self.provider.insert_many(collection_name=collection_name, texts=texts, vectors=vectors,
+                                                   metadata=metadata, record_ids=record_ids,
+                                                   batch_size=batch_size)
+
+    async def delete_by_record_ids(self, collection_name: str, record_ids: List[str]) -> bool:
+        with self.span("delete", collection_name, **{"db.operation.batch.size": len(record_ids)}):
+            return await self.provider.delete_by_record_ids(collection_name=collection_name, record_ids=record_ids)
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 10,
+                               with_vectors: bool = False, ef_search: Optional[int] = None,
+                               project_id: Optional[int] = None, **kwargs) -> List[RetrievedDocument]:
+        with self.span("search", collection_name,
+                       **{"db.vector.limit": limit, "db.vector.ef_search": ef_search,
+                          "db.vector.probes": kwargs.get("probes")}) as span:
+            results = await self.provider.search_by_vector(collection_name=collection_name, vector=vector,
+                                                           limit=limit, with_vectors=with_vectors,
+                                                           ef_search=ef_search, project_id=project_id, **kwargs)
+            set_span_attributes(span, **{"db.response.returned_rows": len(results) if results else 0})
+            return results
@@ -10,13 +10,25 @@ import json
 class PGVectorProvider(VectorDBInterface):
 
     def __init__(self, db_client, default_vector_size: int = 786,
-                    distance_method: str = None, index_threshold: int=100):
+                    distance_method: str = None, index_threshold: int=100,
+                    shared_table: bool = False, store_text: bool = True,
+                    read_db_client=None):
         
         self.db_client = db_client
+        # searches and collection info go through the read replicas when configured
+        self.read_db_client = read_db_client or db_client
         self.default_vector_size = default_vector_size
         
         self.index_threshold = index_threshold
 
+        # shared mode: every collection is a LIST partition of one table per vector size,
+        # so dropping a collection is a partition drop and collections are listed from pg_inherits
+        self.shared_table = shared_table
+
+        # without stored text, collection tables only hold (chunk_id, vector) and searches
+        # fetch the text of the final top-k from the chunks table
+        self.store_text = store_text
+
         if distance_method == DistanceMethodEnums.COSINE.value:
             distance_method = PgVectorDistanceMethodEnums.COSINE.value
         elif distance_method == DistanceMethodEnums.DOT.value:
@@ -27,6 +39,12 @@ class PGVectorProvider(VectorDBInterface):
 
         self.logger = logging.getLogger("uvicorn")
         self.default_index_name = lambda collection_name: f"{collection_name}_vector_idx"
+        self.chunk_id_index_name = lambda collection_name: f"{collection_name}_chunk_id_idx"
+        # vector counts per collection, maintained in the insert/delete transactions
+        self.stats_table_name = f"{self.pgvector_table_prefix}_collection_stats"
+        self.shared_table_name = lambda embedding_size: (
+            f"{self.pgvector_table_prefix}_collections_{embedding_size}{'' if self.store_text else '_refs'}"
+        )
 
 
     async def connect(self):
@@ -35,15 +53,23 @@ class PGVectorProvider(VectorDBInterface):
                 await session.execute(sql_text(
                     "CREATE EXTENSION IF NOT EXISTS vector"
                 ))
+                await session.execute(sql_text(
+                    f'CREATE TABLE IF NOT EXISTS {self.stats_table_name} ('
+                        f'{PgVectorTableSchemeEnums.COLLECTION.value} text PRIMARY KEY, '
+                        'vector_count bigint NOT NULL DEFAULT 0, '
+                        'updated_at timestamptz NOT NULL DEFAULT now()'
+                    ')'
+                ))
                 await session.commit()
 
     async def disconnect(self):
         pass
 
-    async def is_collection_existed(self, collection_name: str) -> bool:
+    async def is_collection_existed(self, collection_name: str, read_only: bool = False) -> bool:
 
         record = None
-        async with self.db_client() as session:
+        db_client = self.read_db_client if read_only else self.db_client
+        async with db_client() as session:
             async with session.begin():
                 list_tbl = sql_text(f'SELECT * FROM pg_tables WHERE tablename = :collection_name')
                 results = await session.execute(list_tbl, {"collection_name": collection_name})
@@ -55,14 +81,21 @@ class PGVectorProvider(VectorDBInterface):
         records = []
         async with self.db_client() as session:
             async with session.begin():
-                list_tbl = sql_text('SELECT tablename FROM pg_tables WHERE tablename LIKE :prefix')
-                results = await session.execute(list_tbl, {"prefix": self.pgvector_table_prefix})
+                if self.shared_table:
+                    list_tbl = sql_text('SELECT child.relname FROM pg_inherits '
+                                        'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+                                        'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent '
+                                        'WHERE parent.relname LIKE :prefix')
+                    results = await session.execute(list_tbl, {"prefix": self.shared_table_name("%")})
+                else:
+                    list_tbl = sql_text('SELECT tablename FROM pg_tables WHERE tablename LIKE :prefix')
+                    results = await session.execute(list_tbl, {"prefix": self.pgvector_table_prefix})
                 records = results.scalars().all()
         
         return records
     
     async def get_collection_info(self, collection_name: str) -> dict:
-        async with self.db_client() as session:
+        async with self.read_db_client() as session:
             async with session.begin():
                 
                 table_info_sql = sql_text(f'''
@@ -71,14 +104,18 @@ class PGVectorProvider(VectorDBInterface):
                     WHERE tablename = :collection_name
                 ''')
 
-                count_sql = sql_text(f'SELECT COUNT(*) FROM {collection_name}')
-
                 table_info = await session.execute(table_info_sql, {"collection_name": collection_name})
-                record_count = await session.execute(count_sql)
 
                 table_data = table_info.fetchone()
                 if not table_data:
                     return None
+
+                # the seed writes the stats table, only possible when reading on the primary
+                reads_primary = not getattr(self.read_db_client, "has_replicas", False)
+                record_count = await self.get_vector_count(session=session, collection_name=collection_name,
+                                                           seed=reads_primary)
+                table_size = await session.execute(sql_text('SELECT pg_total_relation_size(CAST(:name AS regclass))'),
+                                                   {"name": collection_name})
                 
                 return {
                     "table_info": {
@@ -88,7 +125,8 @@ class PGVectorProvider(VectorDBInterface):
                         "tablespace": table_data[3],
                         "hasindexes": table_data[4],
                     },
-                    "record_count": record_count.scalar_one(),
+                    "record_count": record_count,
+                    "table_size_bytes": table_size.scalar_one(),
                 }
             
     async def delete_collection(self, collection_name: str):
@@ -98,10 +136,32 @@ class PGVectorProvider(VectorDBInterface):
 
                 delete_sql = sql_text(f'DROP TABLE IF EXISTS {collection_name}')
                 await session.execute(delete_sql)
+                await session.execute(sql_text(
+                    f'DELETE FROM {self.stats_table_name} WHERE {PgVectorTableSchemeEnums.COLLECTION.value} = :name'
+                ), {"name": collection_name})
                 await session.commit()
         
         return True
 
+    def collection_columns(self, embedding_size: int) -> str:
+        """Get the column definitions of a collection table, without the id column."""
+        if not self.store_text:
+            return (f'{PgVectorTableSchemeEnums.VECTOR.value} vector({embedding_size}), '
+                    f'{PgVectorTableSchemeEnums.CHUNK_ID.value} integer NOT NULL')
+
+        return (f'{PgVectorTableSchemeEnums.TEXT.value} text, '
+                f'{PgVectorTableSchemeEnums.VECTOR.value} vector({embedding_size}), '
+                f'{PgVectorTableSchemeEnums.METADATA.value} jsonb DEFAULT \'{{}}\', '
+                f'{PgVectorTableSchemeEnums.CHUNK_ID.value} integer')
+
+    def insert_columns(self) -> List[str]:
+        """Get the columns written by the inserts."""
+        if not self.store_text:
+            return [PgVectorTableSchemeEnums.VECTOR.value, PgVectorTableSchemeEnums.CHUNK_ID.value]
+
+        return [PgVectorTableSchemeEnums.TEXT.value, PgVectorTableSchemeEnums.VECTOR.value,
+                PgVectorTableSchemeEnums.METADATA.value, PgVectorTableSchemeEnums.CHUNK_ID.value]
+
     async def create_collection(self, collection_name: str,
                                     embedding_size: int,
                                     do_reset: bool = False):
@@ -110,27 +170,109 @@ class PGVectorProvider(VectorDBInterface):
             _ = await self.delete_collection(collection_name=collection_name)
 
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed and self.shared_table:
+            return await self.create_collection_partition(collection_name=collection_name,
+                                                          embedding_size=embedding_size)
+
         if not is_collection_existed:
             self.logger.info(f"Creating collection: {collection_name}")
             async with self.db_client() as session:
                 async with session.begin():
                     create_sql = sql_text(
                         f'CREATE TABLE {collection_name} ('
-                            f'{PgVectorTableSchemeEnums.ID.value} bigserial PRIMARY KEY,'
-                            f'{PgVectorTableSchemeEnums.TEXT.value} text, '
-                            f'{PgVectorTableSchemeEnums.VECTOR.value} vector({embedding_size}), '
-                            f'{PgVectorTableSchemeEnums.METADATA.value} jsonb DEFAULT \'{{}}\', '
-                            f'{PgVectorTableSchemeEnums.CHUNK_ID.value} integer, '
-                            f'FOREIGN KEY ({PgVectorTableSchemeEnums.CHUNK_ID.value}) REFERENCES chunks(chunk_id) ON DELETE CASCADE'
+                            f'{PgVectorTableSchemeEnums.ID.value} bigserial PRIMARY KEY, '
+                            f'{self.collection_columns(embedding_size)}'
                         ')'
                     )
                     await session.execute(create_sql)
+                    await session.execute(self.create_chunk_id_index_sql(collection_name))
+                    await self.increment_vector_count(session=session, collection_name=collection_name, count=0)
                     await session.commit()
             
             return True
 
         return False
     
+    async def create_collection_partition(self, collection_name: str, embedding_size: int) -> bool:
+        """Create the collection as a LIST partition of the shared table of its vector size."""
+        shared_table_name = self.shared_table_name(embedding_size)
+        self.logger.info(f"Creating collection: {collection_name} as a partition of {shared_table_name}")
+        async with self.db_client() as session:
+            async with session.begin():
+                # serialize concurrent creations of the shared table
+                await session.execute(sql_text('SELECT pg_advisory_xact_lock(hashtext(:name))'),
+                                      {"name": shared_table_name})
+                await session.execute(sql_text(
+                    f'CREATE TABLE IF NOT EXISTS {shared_table_name} ('
+                        f'{PgVectorTableSchemeEnums.ID.value} bigserial, '
+                        f'{self.collection_columns(embedding_size)}, '
+                        f'{PgVectorTableSchemeEnums.COLLECTION.value} text NOT NULL, '
+                        f'PRIMARY KEY ({PgVectorTableSchemeEnums.COLLECTION.value}, {PgVectorTableSchemeEnums.ID.value})'
+                    f') PARTITION BY LIST ({PgVectorTableSchemeEnums.COLLECTION.value})'
+                ))
+                # created on the shared table, so every partition gets its own
+                await session.execute(self.create_chunk_id_index_sql(shared_table_name))
+                # the partition keeps the collection name, so inserts and searches address it
+                # directly: the pruned form of a parent query, without planning over every partition
+                await session.execute(sql_text(
+                    f'CREATE TABLE {collection_name} PARTITION OF {shared_table_name} '
+                    f'({PgVectorTableSchemeEnums.COLLECTION.value} DEFAULT \'{collection_name}\') '
+                    f'FOR VALUES IN (\'{collection_name}\')'
+                ))
+                await self.increment_vector_count(session=session, collection_name=collection_name, count=0)
+                await session.commit()
+
+        return True
+
+    def create_chunk_id_index_sql(self, table_name: str):
+        """The index serving the deletes by chunk id."""
+        return sql_text(
+            f'CREATE INDEX IF NOT EXISTS {self.chunk_id_index_name(table_name)} '
+            f'ON {table_name} ({PgVectorTableSchemeEnums.CHUNK_ID.value})'
+        )
+
+    async def is_chunk_id_indexed(self, session, collection_name: str) -> bool:
+        """Whether an index of the collection leads with chunk_id, missing on older collections."""
+        result = await session.execute(sql_text(
+            'SELECT 1 FROM pg_index i '
+            'JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] '
+            'WHERE i.indrelid = CAST(:name AS regclass) AND a.attname = :column'
+        ), {"name": collection_name, "column": PgVectorTableSchemeEnums.CHUNK_ID.value})
+        return result.first() is not None
+
+    async def increment_vector_count(self, session, collection_name: str, count: int):
+        """Add `count` to the stored vector count of a collection, in the caller's transaction."""
+        await session.execute(sql_text(
+            f'INSERT INTO {self.stats_table_name} ({PgVectorTableSchemeEnums.COLLECTION.value}, vector_count) '
+            'VALUES (:name, :count) '
+            f'ON CONFLICT ({PgVectorTableSchemeEnums.COLLECTION.value}) DO UPDATE '
+            f'SET vector_count = {self.stats_table_name}.vector_count + EXCLUDED.vector_count, updated_at = now()'
+        ), {"name": collection_name, "count": count})
+
+    async def get_vector_count(self, session, collection_name: str, seed: bool = True) -> int:
+        """
+        Get the vector count of a collection from the stats table, seeding it once for older
+        collections (`seed` is False on read-only sessions, the count is then only computed).
+        """
+        result = await session.execute(sql_text(
+            f'SELECT vector_count FROM {self.stats_table_name} '
+            f'WHERE {PgVectorTableSchemeEnums.COLLECTION.value} = :name'
+        ), {"name": collection_name})
+        vector_count = result.scalar_one_or_none()
+        if vector_count is not None:
+            return vector_count
+
+        result = await session.execute(sql_text(f'SELECT COUNT(*) FROM {collection_name}'))
+        vector_count = result.scalar_one()
+        if not seed:
+            return vector_count
+
+        await session.execute(sql_text(
+            f'INSERT INTO {self.stats_table_name} ({PgVectorTableSchemeEnums.COLLECTION.value}, vector_count) '
+            f'VALUES (:name, :count) ON CONFLICT ({PgVectorTableSchemeEnums.COLLECTION.value}) DO NOTHING'
+        ), {"name": collection_name, "count": vector_count})
+        return vector_count
+
     async def is_index_existed(self, collection_name: str) -> bool:
         index_name = self.default_index_name(collection_name)
         async with self.db_client() as session:
@@ -153,9 +295,7 @@ class PGVectorProvider(VectorDBInterface):
         
         async with self.db_client() as session:
             async with session.begin():
-                count_sql = sql_text(f'SELECT COUNT(*) FROM {collection_name}')
-                result = await session.execute(count_sql)
-                records_count = result.scalar_one()
+                records_count = await self.get_vector_count(session=session, collection_name=collection_name)
 
                 if records_count < self.index_threshold:
                     return False
@@ -199,18 +339,21 @@ class PGVectorProvider(VectorDBInterface):
         
         async with self.db_client() as session:
             async with session.begin():
+                columns = self.insert_columns()
                 insert_sql = sql_text(f'INSERT INTO {collection_name} '
-                                    f'({PgVectorTableSchemeEnums.TEXT.value}, {PgVectorTableSchemeEnums.VECTOR.value}, {PgVectorTableSchemeEnums.METADATA.value}, {PgVectorTableSchemeEnums.CHUNK_ID.value}) '
-                                    'VALUES (:text, :vector, :metadata, :chunk_id)'
+                                    f'({", ".join(columns)}) '
+                                    f'VALUES ({", ".join(":" + c for c in columns)})'
                                     )
                 
                 metadata_json = json.dumps(metadata, ensure_ascii=False) if metadata is not None else "{}"
-                await session.execute(insert_sql, {
+                values = {
                     'text': text,
                     'vector': "[" + ",".join([ str(v) for v in vector ]) + "]",
                     'metadata': metadata_json,
                     'chunk_id': record_id
-                })
+                }
+                await session.execute(insert_sql, {c: values[c] for c in columns})
+                await self.increment_vector_count(session=session, collection_name=collection_name, count=1)
                 await session.commit()
 
                 await self.create_vector_index(collection_name=collection_name)
@@ -234,6 +377,11 @@ class PGVectorProvider(VectorDBInterface):
         if not metadata or len(metadata) == 0:
             metadata = [None] * len(texts)
         
+        columns = self.insert_columns()
+        batch_insert_sql = sql_text(f'INSERT INTO {collection_name} '
+                                    f'({", ".join(columns)}) '
+                                    f'VALUES ({", ".join(":" + c for c in columns)})')
+
         async with self.db_client() as session:
             async with session.begin():
                 for i in range(0, len(texts), batch_size):
@@ -246,6 +394,13 @@ class PGVectorProvider(VectorDBInterface):
 
                     for _text, _vector, _metadata, _record_id in zip(batch_texts, batch_vectors, batch_metadata, batch_record_ids):
                         
+                        if not self.store_text:
+                            values.append({
+                                'vector': "[" + ",".join([ str(v) for v in _vector ]) + "]",
+                                'chunk_id': _record_id
+                            })
+                            continue
+
                         metadata_json = json.dumps(_metadata, ensure_ascii=False) if _metadata is not None else "{}"
                         values.append({
                             'text': _text,
@@ -254,32 +409,78 @@ class PGVectorProvider(VectorDBInterface):
                             'chunk_id': _record_id
                         })
                     
-                    batch_insert_sql = sql_text(f'INSERT INTO {collection_name} '
-                                    f'({PgVectorTableSchemeEnums.TEXT.value}, '
-                                    f'{PgVectorTableSchemeEnums.VECTOR.value}, '
-                                    f'{PgVectorTableSchemeEnums.METADATA.value}, '
-                                    f'{PgVectorTableSchemeEnums.CHUNK_ID.value}) '
-                                    f'VALUES (:text, :vector, :metadata, :chunk_id)')
-                    
                     await session.execute(batch_insert_sql, values)
 
+                await self.increment_vector_count(session=session, collection_name=collection_name,
+                                                  count=len(vectors))
+
         await self.create_vector_index(collection_name=collection_name)
 
         return True
     
-    async def search_by_vector(self, collection_name: str, vector: list, limit: int):
-
+    async def delete_by_record_ids(self, collection_name: str, record_ids: list):
+        """
+        Delete the vectors of the given chunk ids, e.g. those of re-processed assets.
+        Collections created before the chunk_id index get it on their first delete.
+        """
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed or not record_ids:
+            return True
+
+        try:
+            async with self.db_client() as session:
+                async with session.begin():
+                    if not await self.is_chunk_id_indexed(session=session, collection_name=collection_name):
+                        await session.execute(self.create_chunk_id_index_sql(collection_name))
+                    result = await session.execute(sql_text(
+                        f'DELETE FROM {collection_name} '
+                        f'WHERE {PgVectorTableSchemeEnums.CHUNK_ID.value} = ANY(:record_ids)'
+                    ), {"record_ids": [int(record_id) for record_id in record_ids]})
+                    await self.increment_vector_count(session=session, collection_name=collection_name,
+                                                      count=-result.rowcount)
+        except Exception as e:
+            self.logger.error(f"Error deleting vectors from collection {collection_name}: {e}")
+            return False
+
+        self.logger.info(f"Deleted {result.rowcount} vectors from collection: {collection_name}")
+        return True
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int,
+                                with_vectors: bool = False, ef_search: int = None, probes: int = None,
+                                project_id: int = None):
+        """
+        Search the nearest vectors of a collection.
+
+        `ef_search` tunes HNSW indexes and `probes` (pgvector only) the lists scanned by
+        IVFFLAT indexes; lower is faster but less exact. `project_id` restricts the join
+        to `chunks` of the reference-only collections to the project's partition.
+        """
+
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name, read_only=True)
         if not is_collection_existed:
             self.logger.error(f"Can not search for records in a non-existed collection: {collection_name}")
             return False
         
         vector = "[" + ",".join([ str(v) for v in vector ]) + "]"
-        async with self.db_client() as session:
+        vector_column = f', {PgVectorTableSchemeEnums.VECTOR.value}::text as vector' if with_vectors else ''
+        async with self.read_db_client() as session:
             async with session.begin():
+                if ef_search:
+                    # hnsw.ef_search caps the number of rows the index scan returns
+                    await session.execute(sql_text(f'SET LOCAL hnsw.ef_search = {max(int(ef_search), int(limit))}'))
+                if probes:
+                    await session.execute(sql_text(f'SET LOCAL ivfflat.probes = {int(probes)}'))
+
+                if not self.store_text:
+                    return await self.search_by_vector_refs(session=session, collection_name=collection_name,
+                                                            vector=vector, limit=limit, with_vectors=with_vectors,
+                                                            project_id=project_id)
+
+                # order by the distance expression itself so the vector index can serve the query
                 search_sql = sql_text(f'SELECT {PgVectorTableSchemeEnums.TEXT.value} as text, 1 - ({PgVectorTableSchemeEnums.VECTOR.value} <=> :vector) as score'
+                                    f'{vector_column}'
                                     f' FROM {collection_name}'
-                                    ' ORDER BY score DESC '
+                                    f' ORDER BY {PgVectorTableSchemeEnums.VECTOR.value} <=> :vector '
                                     f'LIMIT {limit}'
                                     )
                 
@@ -290,7 +491,49 @@ class PGVectorProvider(VectorDBInterface):
                 return [
                     RetrievedDocument(
                         text=record.text,
-                        score=record.score
+                        score=record.score,
+                        vector=json.loads(record.vector) if with_vectors else None,
                     )
                     for record in records
-                ]
\ No newline at end of file
+                ]
+
+    async def search_by_vector_refs(self, session, collection_name: str, vector: str, limit: int,
+                                    with_vectors: bool = False, project_id: int = None):
+        """
+        Search a collection holding only chunk references: the top-k is computed on the
+        collection table, then only those rows are joined to `chunks` to get their text.
+        """
+        vector_column = f', {PgVectorTableSchemeEnums.VECTOR.value}::text as vector' if with_vectors else ''
+
+        # the project id lets the join prune the chunks partitions down to one
+        project_filter = 'AND chunks.chunk_project_id = :project_id' if project_id is not None else ''
+
+        search_sql = sql_text(f'WITH top_k AS ('
+                                f'SELECT {PgVectorTableSchemeEnums.CHUNK_ID.value} as chunk_id, '
+                                f'{PgVectorTableSchemeEnums.VECTOR.value} <=> :vector as distance'
+                                f'{vector_column}'
+                                f' FROM {collection_name}'
+                                f' ORDER BY {PgVectorTableSchemeEnums.VECTOR.value} <=> :vector '
+                                f'LIMIT {limit}'
+                            f') '
+                            f'SELECT chunks.chunk_text as text, 1 - top_k.distance as score'
+                            f'{", top_k.vector" if with_vectors else ""}'
+                            f' FROM top_k JOIN chunks ON chunks.chunk_id = top_k.chunk_id {project_filter}'
+                            f' ORDER BY top_k.distance'
+                            )
+
+        params = {"vector": vector}
+        if project_id is not None:
+            params["project_id"] = int(project_id)
+
+        result = await session.execute(search_sql, params)
+        records = result.fetchall()
+
+        return [
+            RetrievedDocument(
+                text=record.text,
+                score=record.score,
+                vector=json.loads(record.vector) if with_vectors else None,
+            )
+            for record in records
+        ]
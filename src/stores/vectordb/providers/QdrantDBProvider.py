@@ -199,14 +199,43 @@ class QdrantDBProvider(VectorDBInterface):
         self.logger.info(f"Inserted {len(texts)} documents into collection {collection_name}")
         return True
     
+    async def delete_by_record_ids(self, collection_name: str, record_ids: List[str]) -> bool:
+        """Delete the points with the given IDs from the Qdrant database.
+
+        Args:
+            collection_name (str): The name of the collection.
+            record_ids (List[str]): The IDs of the points to delete.
+
+        Returns:
+            bool: True if the deletion was successful, False otherwise.
+        """
+        if not await self.is_collection_existed(collection_name=collection_name):
+            return True
+
+        try:
+            self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=record_ids),
+            )
+        except Exception as e:
+            self.logger.error(f"Error deleting documents: {e}")
+            return False
+
+        self.logger.info(f"Deleted {len(record_ids)} documents from collection {collection_name}")
+        return True
+
     async def search_by_vector(self, collection_name: str, vector: list,
-                        limit: int = 5) -> List[RetrievedDocument]:
+                        limit: int = 5, with_vectors: bool = False,
+                        ef_search: int = None, project_id: int = None) -> List[RetrievedDocument]:
         """Search for documents in the Qdrant database using a vector.
 
         Args:
             collection_name (str): The name of the collection.
             vector (list): The vector to search for.
             limit (int): The maximum number of results to return.
+            with_vectors (bool): Whether to return the stored vectors with the results.
+            ef_search (int, optional): The HNSW search breadth (`hnsw_ef`).
+            project_id (int, optional): Unused, the payloads hold the text.
 
         Returns:
             List[RetrievedDocument]: A list of RetrievedDocument objects containing the search results.
@@ -219,7 +248,9 @@ class QdrantDBProvider(VectorDBInterface):
             results = self.client.search(
                 collection_name=collection_name,
                 query_vector=vector,
-                limit=limit
+                limit=limit,
+                with_vectors=with_vectors,
+                search_params=models.SearchParams(hnsw_ef=ef_search) if ef_search else None
             )
             
             if not results or len(results) == 0:
@@ -230,6 +261,7 @@ class QdrantDBProvider(VectorDBInterface):
                 RetrievedDocument(
                     score=result.score,
                     text=result.payload["text"],
+                    vector=result.vector if with_vectors else None,
                 )
                 for result in results
             ]
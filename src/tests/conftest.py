@@ -0,0 +1,28 @@
+"""
+Shared test setup: run from the repository or from `src/`, with or without a `.env`.
+
+The settings of `src/.env` are exported whatever the working directory; the ones
+it does not set fall back to `src/.env.example`, then to TEST_DEFAULTS. The tests
+needing a real service (Postgres) skip when it is unreachable.
+"""
+from dotenv import dotenv_values
+import os
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# required by Settings but missing from .env.example
+TEST_DEFAULTS = {
+    "GENERATION_MODEL_ID_LITERAL": '["gpt-3.5-turbo-0125"]',
+    "VECTOR_DB_BACKEND_LITERAL": '["QDRANT", "PGVECTOR"]',
+}
+
+for env_file in (".env", ".env.example"):
+    for name, value in dotenv_values(os.path.join(SRC_DIR, env_file)).items():
+        if value is not None:
+            os.environ.setdefault(name, value)
+
+for name, value in TEST_DEFAULTS.items():
+    os.environ.setdefault(name, value)
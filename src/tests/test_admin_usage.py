@@ -0,0 +1,78 @@
+"""
+The LLM usage admin routes, on a stub session typing the sums like Postgres does.
+"""
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from helpers import get_settings, get_db_client
+from routes.admin import admin_router
+from sqlalchemy.sql.elements import Cast
+from types import SimpleNamespace
+import pytest
+
+ADMIN_TOKEN = "test-admin-token"
+COUNTERS = {"request_count": 3, "prompt_tokens": 1200, "completion_tokens": 300, "embedding_tokens": 0,
+            "cost_usd": 0.0042}
+
+
+class StubSession:
+    """
+    Answers every select with one row. Like asyncpg, an uncast SUM over a
+    bigint column comes back as a Decimal.
+    """
+
+    def __init__(self, keys: dict):
+        self.keys = keys
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        row = {}
+        for column in stmt.selected_columns:
+            if column.name in COUNTERS:
+                value = COUNTERS[column.name]
+                row[column.name] = value if isinstance(column.element, Cast) else Decimal(str(value))
+            else:
+                row[column.name] = self.keys.get(column.name)
+        return SimpleNamespace(all=lambda: [SimpleNamespace(_mapping=row)])
+
+
+@pytest.fixture
+def client():
+    session = StubSession(keys={"usage_project_id": 7, "usage_endpoint": "/api/v1/nlp/index/answer/{project_id}",
+                                "usage_provider": "OPENAI", "usage_model": "gpt-4o-mini"})
+
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    settings = get_settings()
+    settings.PROFILING_ADMIN_TOKEN = ADMIN_TOKEN
+
+    app = FastAPI()
+    app.include_router(admin_router)
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[get_db_client] = lambda: session_factory
+    return TestClient(app)
+
+
+def test_usage_by_project(client):
+    response = client.get("/api/v1/admin/usage", params={"hours": 1}, headers={"X-Admin-Token": ADMIN_TOKEN})
+
+    assert response.status_code == 200
+    assert response.json()["projects"] == [{"usage_project_id": 7, **COUNTERS}]
+
+
+def test_project_usage(client):
+    response = client.get("/api/v1/admin/usage/7", headers={"X-Admin-Token": ADMIN_TOKEN})
+
+    assert response.status_code == 200
+    [usage] = response.json()["usage"]
+    assert usage["usage_model"] == "gpt-4o-mini"
+    assert usage["prompt_tokens"] == 1200
+    assert usage["cost_usd"] == 0.0042
+
+
+def test_usage_requires_the_admin_token(client):
+    assert client.get("/api/v1/admin/usage").status_code == 403
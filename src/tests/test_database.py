@@ -0,0 +1,59 @@
+"""
+Request-scoped sessions: which session `RequestSessionFactory.reader()` hands out.
+"""
+from helpers.database import RequestSessionFactory, ReplicaRouter
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+
+
+def create_router(replicas: list, healthy: list) -> ReplicaRouter:
+    router = ReplicaRouter(primary_client=lambda: AsyncSession(), replica_engines={})
+    router.replica_clients = {name: AsyncSession for name in replicas}
+    router.healthy = healthy
+    return router
+
+
+def read_sessions(factory: RequestSessionFactory, count: int = 2) -> list:
+    async def run():
+        sessions = []
+        for _ in range(count):
+            async with factory.reader() as session:
+                sessions.append(session)
+        return sessions
+
+    return asyncio.run(run())
+
+
+def test_reader_uses_the_request_session_without_replicas():
+    session = AsyncSession()
+
+    assert read_sessions(RequestSessionFactory(session)) == [session, session]
+    assert read_sessions(RequestSessionFactory(session, read_client=create_router([], []))) == [session, session]
+
+
+def test_reader_uses_the_request_session_without_healthy_replica():
+    session = AsyncSession()
+    factory = RequestSessionFactory(session, read_client=create_router(["replica_0"], healthy=[]))
+
+    assert read_sessions(factory) == [session, session]
+
+
+def test_reader_uses_a_replica_until_the_request_writes():
+    session = AsyncSession()
+    factory = RequestSessionFactory(session, read_client=create_router(["replica_0"], healthy=["replica_0"]))
+
+    assert session not in read_sessions(factory, count=1)
+
+    factory.mark_written()
+    assert read_sessions(factory, count=1) == [session]
+
+
+def test_reader_pins_one_replica_per_request():
+    router = create_router(["replica_0", "replica_1"], healthy=["replica_0", "replica_1"])
+    picked = []
+    get_replica_client = router.get_replica_client
+    router.get_replica_client = lambda: picked.append(1) or get_replica_client()
+
+    read_sessions(RequestSessionFactory(AsyncSession(), read_client=router), count=3)
+
+    assert len(picked) == 1
@@ -0,0 +1,50 @@
+"""
+FakeProvider embeddings: deterministic per seed and model, cached without
+holding on to the provider instances.
+"""
+from stores.llm.providers.FakeProvider import FakeProvider
+import asyncio
+import gc
+import weakref
+
+
+def create_provider(seed: int = 0, model_id: str = "fake-embed", embedding_size: int = 16) -> FakeProvider:
+    provider = FakeProvider(seed=seed)
+    provider.set_embedding_model(model_id, embedding_size)
+    return provider
+
+
+def embed(provider: FakeProvider, texts: list) -> list:
+    return asyncio.run(provider.embed_text(texts))
+
+
+def test_embeddings_depend_on_seed_and_model():
+    texts = ["retrieval augmented generation"]
+    first, same = create_provider(), create_provider()
+    other_seed, other_model = create_provider(seed=1), create_provider(model_id="other-embed")
+
+    assert embed(first, texts) == embed(same, texts)
+    assert embed(first, texts) != embed(other_seed, texts)
+    assert embed(first, texts) != embed(other_model, texts)
+
+
+def test_switching_models_keeps_the_other_instances_embeddings():
+    texts = ["retrieval augmented generation"]
+    provider, other = create_provider(), create_provider()
+    expected = embed(provider, texts)
+
+    other.set_embedding_model("other-embed", 32)
+
+    assert embed(provider, texts) == expected
+    assert len(embed(other, texts)[0]) == 32
+
+
+def test_cache_does_not_keep_providers_alive():
+    provider = create_provider()
+    embed(provider, ["some text"])
+    reference = weakref.ref(provider)
+
+    del provider
+    gc.collect()
+
+    assert reference() is None
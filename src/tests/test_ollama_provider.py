@@ -0,0 +1,127 @@
+"""
+OllamaProvider against a stub Ollama API (httpx.MockTransport): request bodies,
+`/api/embed` batching and the per-model concurrency limit.
+"""
+from stores.llm.providers.OllamaProvider import OllamaProvider
+import asyncio
+import httpx
+import json
+
+
+class StubOllama:
+    """Records the requests and the concurrent requests in flight per model."""
+
+    def __init__(self, delay: float = 0.0, embedding_size: int = 3):
+        self.delay = delay
+        self.embedding_size = embedding_size
+        self.requests = []
+        self.in_flight = {}
+        self.max_in_flight = {}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        model = payload["model"]
+        self.requests.append((request.url.path, payload))
+
+        self.in_flight[model] = self.in_flight.get(model, 0) + 1
+        self.max_in_flight[model] = max(self.max_in_flight.get(model, 0), self.in_flight[model])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight[model] -= 1
+
+        if request.url.path == "/api/embed":
+            return httpx.Response(200, json={
+                "model": model,
+                "embeddings": [[float(len(text))] * self.embedding_size for text in payload["input"]],
+                "prompt_eval_count": len(payload["input"]),
+            })
+        if request.url.path == "/api/chat":
+            return httpx.Response(200, json={
+                "model": model,
+                "message": {"role": "assistant", "content": "stub answer"},
+                "prompt_eval_count": 7,
+                "eval_count": 2,
+            })
+        return httpx.Response(404)
+
+
+def create_provider(stub: StubOllama, **kwargs) -> OllamaProvider:
+    provider = OllamaProvider(api_url="http://ollama:11434", **kwargs)
+    provider.client = httpx.AsyncClient(base_url=provider.api_url, transport=httpx.MockTransport(stub.handle))
+    provider.set_generation_model("llama3.2")
+    provider.set_embedding_model("nomic-embed-text", 3)
+    return provider
+
+
+def test_embed_text_batches_inputs():
+    stub = StubOllama()
+    provider = create_provider(stub, embedding_batch_size=4, keep_alive="1h", num_ctx=2048)
+    texts = [f"text {'x' * (i + 1)}" for i in range(10)]
+
+    embeddings = asyncio.run(provider.embed_text(texts))
+
+    assert [path for path, _ in stub.requests] == ["/api/embed"] * 3
+    assert [payload["input"] for _, payload in stub.requests] == [texts[0:4], texts[4:8], texts[8:10]]
+    for _, payload in stub.requests:
+        assert payload["model"] == "nomic-embed-text"
+        assert payload["keep_alive"] == "1h"
+        assert payload["truncate"] is True
+        assert payload["options"] == {"num_ctx": 2048}
+    # one vector per input, in the input order
+    assert embeddings == [[float(len(text))] * 3 for text in texts]
+
+
+def test_embed_text_fails_on_missing_embeddings():
+    stub = StubOllama()
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"embeddings": []})
+
+    provider = create_provider(stub)
+    provider.client = httpx.AsyncClient(base_url=provider.api_url, transport=httpx.MockTransport(handle))
+
+    assert asyncio.run(provider.embed_text(["a", "b"])) is None
+
+
+def test_generate_text_payload():
+    stub = StubOllama()
+    provider = create_provider(stub, keep_alive="-1", num_ctx=4096)
+
+    answer = asyncio.run(provider.generate_text("what is rag?", chat_history=[], max_output_tokens=64,
+                                                temperature=0.3))
+
+    assert answer == "stub answer"
+    path, payload = stub.requests[0]
+    assert path == "/api/chat"
+    assert payload["model"] == "llama3.2"
+    assert payload["stream"] is False
+    assert payload["keep_alive"] == "-1"
+    assert payload["messages"][-1] == {"role": "user", "content": "what is rag?"}
+    assert payload["options"] == {"num_predict": 64, "temperature": 0.3, "num_ctx": 4096}
+
+
+def test_generate_text_omits_unset_num_ctx():
+    stub = StubOllama()
+    provider = create_provider(stub)
+
+    asyncio.run(provider.generate_text("hello", chat_history=[]))
+
+    assert "num_ctx" not in stub.requests[0][1]["options"]
+
+
+def test_concurrency_is_capped_per_model():
+    stub = StubOllama(delay=0.05)
+    provider = create_provider(stub, num_parallel=2, embedding_batch_size=1)
+
+    async def run():
+        await asyncio.gather(
+            *[provider.generate_text(f"question {i}", chat_history=[]) for i in range(6)],
+            provider.embed_text([f"chunk {i}" for i in range(6)]),
+        )
+
+    asyncio.run(run())
+
+    assert len(stub.requests) == 12
+    # OLLAMA_NUM_PARALLEL requests at most per model, the two models in parallel
+    assert stub.max_in_flight == {"llama3.2": 2, "nomic-embed-text": 2}
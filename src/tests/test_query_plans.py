@@ -0,0 +1,171 @@
+"""
+Check that the queries built by `models/` are served by index scans.
+
+Loads synthetic projects, assets and chunks into the configured Postgres inside
+a transaction, runs ANALYZE, then EXPLAINs the statements the model methods
+execute and fails if a plan reads a relation with a sequential scan. The
+transaction is rolled back, nothing is kept. Skipped when Postgres is not
+reachable or not migrated.
+
+    python -m pytest tests/test_query_plans.py
+"""
+from helpers import get_settings, create_db_engine
+from models.AssetModel import AssetModel
+from models.ChunkModel import ChunkModel
+from models.ProjectModel import ProjectModel
+from models.ProjectStatsModel import ProjectStatsModel
+from models.enums.DataBaseEnum import DataBaseEnum
+from models.enums.AssetTypeEnum import AssetTypeEnum
+from sqlalchemy import text as sql_text
+from sqlalchemy.dialects import postgresql
+import asyncio
+import json
+import pytest
+
+PROJECTS = 20
+ASSETS_PER_PROJECT = 200
+CHUNKS_PER_ASSET = 10
+# a relation this small is read with a sequential scan whatever its indexes, the
+# planner rightly prefers it to an index lookup
+MAX_SEQ_SCAN_PAGES = 8
+
+
+def model_queries(project_id: int, asset_name: str, asset_ids: list, chunk_id: int) -> dict:
+    """
+    The statements of the model methods, keyed by `Model.method`, built by the
+    same builders the methods execute.
+
+    `ProjectModel.get_all_projects` is left out: paging over every project
+    without a filter reads the whole table by design.
+    """
+    return {
+        "ProjectModel.get_project_or_create_one": ProjectModel.get_project_query(project_id=project_id),
+        "AssetModel.get_all_project_assets": AssetModel.get_all_project_assets_query(
+            asset_project_id=project_id,
+            asset_type=AssetTypeEnum.FILE.value,
+        ),
+        "AssetModel.get_asset_record": AssetModel.get_asset_record_query(
+            asset_project_id=project_id,
+            asset_name=asset_name,
+        ),
+        "AssetModel.get_asset_by_content_hash": AssetModel.get_asset_by_content_hash_query(
+            asset_project_id=project_id,
+            content_hash="0" * 64,
+        ),
+        "ChunkModel.get_chunk": ChunkModel.get_chunk_query(chunk_id=chunk_id),
+        "ChunkModel.get_poject_chunks": ChunkModel.get_poject_chunks_query(project_id=project_id, page_no=3),
+        "ChunkModel.get_poject_chunks[asset_ids]": ChunkModel.get_poject_chunks_query(
+            project_id=project_id,
+            asset_ids=asset_ids,
+        ),
+        "ProjectStatsModel.get_project_stats": ProjectStatsModel.get_project_stats_query(project_id=project_id),
+    }
+
+
+def find_seq_scans(plan: dict) -> list:
+    """Collect the relations read by a Seq Scan anywhere in the plan tree."""
+    scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        scans.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        scans.extend(find_seq_scans(child))
+    return scans
+
+
+async def load_synthetic_data(connection) -> list:
+    result = await connection.execute(sql_text(
+        'INSERT INTO projects (project_uuid) SELECT gen_random_uuid() FROM generate_series(1, :n) '
+        'RETURNING project_id'
+    ), {"n": PROJECTS})
+    project_ids = result.scalars().all()
+
+    for project_id in project_ids:
+        await connection.execute(sql_text(
+            f'CREATE TABLE IF NOT EXISTS {DataBaseEnum.CHUNK_PARTITION_PREFIX.value}{int(project_id)} '
+            f'PARTITION OF {DataBaseEnum.COLLECTION_CHUNK_NAME.value} FOR VALUES IN ({int(project_id)})'
+        ))
+
+    await connection.execute(sql_text(
+        'INSERT INTO assets (asset_uuid, asset_type, asset_name, asset_size, asset_content_hash, asset_project_id) '
+        'SELECT gen_random_uuid(), :asset_type, \'asset_\' || i || \'.pdf\', 1024, '
+        'encode(sha256((p || \':\' || i)::bytea), \'hex\'), p '
+        'FROM unnest(CAST(:project_ids AS integer[])) p, generate_series(1, :n) i'
+    ), {"asset_type": AssetTypeEnum.FILE.value, "project_ids": project_ids, "n": ASSETS_PER_PROJECT})
+
+    await connection.execute(sql_text(
+        'INSERT INTO chunks (chunk_uuid, chunk_text, chunk_metadata, chunk_order, chunk_project_id, chunk_asset_id) '
+        'SELECT gen_random_uuid(), repeat(\'lorem ipsum \', 20), \'{}\', i, a.asset_project_id, a.asset_id '
+        'FROM assets a, generate_series(1, :n) i '
+        'WHERE a.asset_project_id = ANY(CAST(:project_ids AS integer[]))'
+    ), {"project_ids": project_ids, "n": CHUNKS_PER_ASSET})
+
+    await connection.execute(sql_text(
+        'INSERT INTO project_stats (stats_project_id) '
+        'SELECT p FROM unnest(CAST(:project_ids AS integer[])) p ON CONFLICT DO NOTHING'
+    ), {"project_ids": project_ids})
+
+    await connection.execute(sql_text('ANALYZE projects, assets, chunks, project_stats'))
+    return project_ids
+
+
+async def get_relation_pages(connection, relation_name: str) -> int:
+    result = await connection.execute(sql_text('SELECT relpages FROM pg_class WHERE relname = :name'),
+                                      {"name": relation_name})
+    return result.scalar_one_or_none() or 0
+
+
+async def explain_model_queries() -> dict:
+    """The relations read by a sequential scan, by query; skips without Postgres."""
+    engine = create_db_engine(get_settings(), name="plan_check")
+    try:
+        try:
+            connection = await asyncio.wait_for(engine.connect(), timeout=5)
+        except Exception as e:
+            pytest.skip(f"Postgres is not reachable: {e}")
+
+        async with connection:
+            result = await connection.execute(sql_text("SELECT to_regclass('assets'), to_regclass('chunks')"))
+            if None in result.one():
+                pytest.skip("Postgres is not migrated, run `alembic upgrade head`")
+
+            transaction = await connection.begin()
+            try:
+                project_ids = await load_synthetic_data(connection)
+                project_id = project_ids[len(project_ids) // 2]
+
+                result = await connection.execute(sql_text(
+                    'SELECT MIN(chunk_id) FROM chunks WHERE chunk_project_id = :project_id'
+                ), {"project_id": project_id})
+                chunk_id = result.scalar_one()
+                result = await connection.execute(sql_text(
+                    'SELECT asset_id FROM assets WHERE asset_project_id = :project_id ORDER BY asset_id LIMIT 3'
+                ), {"project_id": project_id})
+                asset_ids = result.scalars().all()
+
+                queries = model_queries(project_id=project_id, asset_name=f"asset_{ASSETS_PER_PROJECT // 2}.pdf",
+                                        asset_ids=asset_ids, chunk_id=chunk_id)
+                seq_scans = {}
+                for name, stmt in queries.items():
+                    compiled = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+                    result = await connection.execute(sql_text(f'EXPLAIN (FORMAT JSON) {compiled}'))
+                    plan = result.scalar_one()
+                    plan = json.loads(plan) if isinstance(plan, str) else plan
+
+                    relations = [
+                        relation for relation in find_seq_scans(plan[0]["Plan"])
+                        if await get_relation_pages(connection, relation) > MAX_SEQ_SCAN_PAGES
+                    ]
+                    if relations:
+                        seq_scans[name] = relations
+                return seq_scans
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
+
+
+def test_model_queries_use_indexes():
+    seq_scans = asyncio.run(explain_model_queries())
+    assert not seq_scans, "sequential scans: " + "; ".join(
+        f"{name} on {', '.join(relations)}" for name, relations in seq_scans.items()
+    )
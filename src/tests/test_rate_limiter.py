@@ -0,0 +1,44 @@
+"""
+LLMRateLimiter: priority and fair-queuing order, and the bookkeeping of the
+per-project finish tags.
+"""
+from stores.llm.LLMEnums import LLMPriorityEnums
+from stores.llm.LLMRateLimiter import LLMRateLimiter
+import asyncio
+
+INTERACTIVE = LLMPriorityEnums.INTERACTIVE.value
+
+
+def test_finish_tags_of_idle_projects_are_evicted():
+    limiter = LLMRateLimiter(name="test")
+
+    async def run():
+        for project_id in range(100):
+            await limiter.acquire(priority=INTERACTIVE, tokens=10, project_id=project_id)
+        # a project's next call moves the virtual time past the earlier tags
+        await limiter.acquire(priority=INTERACTIVE, tokens=10, project_id="active")
+        await limiter.acquire(priority=INTERACTIVE, tokens=10, project_id="active")
+
+    asyncio.run(run())
+
+    assert len(limiter.project_finish) <= 2
+    assert sum(len(heap) for heap in limiter.finish_order.values()) <= 2
+
+
+def test_projects_share_the_tokens_fairly():
+    # one request at a time: the queue builds up behind the first call
+    limiter = LLMRateLimiter(name="test", requests_per_minute=600)
+    order = []
+
+    async def call(project_id):
+        await limiter.acquire(priority=INTERACTIVE, tokens=100, project_id=project_id)
+        order.append(project_id)
+
+    async def run():
+        limiter.request_bucket.tokens = 1
+        await asyncio.gather(*[call("bulk") for _ in range(3)], call("small"))
+
+    asyncio.run(run())
+
+    # the small project is served before the bulk project's backlog
+    assert order.index("small") < 2
@@ -0,0 +1,23 @@
+"""
+Summary of a traffic replay.
+"""
+from benchmarks.replay_traffic import summarize, format_row
+
+
+def test_failed_requests_latencies_are_reported():
+    results = [
+        {"endpoint": "/search", "latency": 0.1, "ok": True, "status": 200, "send_lag": 0.0, "duration": 10.0},
+        {"endpoint": "/search", "latency": 0.2, "ok": True, "status": 200, "send_lag": 0.0, "duration": 10.0},
+        {"endpoint": "/search", "latency": 30.0, "ok": False, "status": "ReadTimeout", "send_lag": 0.0,
+         "duration": 10.0},
+    ]
+
+    [total, search] = summarize(results)
+
+    assert search["requests"] == 3
+    assert search["errors"] == 1
+    assert search["max_ms"] == 200.0
+    assert search["error_max_ms"] == 30000.0
+    assert search["error_statuses"] == {"ReadTimeout": 1}
+    assert "error_p95=30000.0ms" in format_row(search)
+    assert total["error_p50_ms"] == 30000.0
@@ -0,0 +1,29 @@
+"""
+MMR selection and the adaptive cutoff of utils/retrieval.py.
+"""
+from utils.retrieval import mmr_select, adaptive_cutoff
+
+
+def test_mmr_relevance_is_cosine_to_the_query():
+    query = [1.0, 0.0]
+    # the longest vector is the least similar to the query
+    vectors = [[10.0, 10.0], [0.9, 0.1], [1.0, 0.5]]
+
+    assert mmr_select(query_vector=query, vectors=vectors, k=3, lambda_mult=1.0) == [1, 2, 0]
+
+
+def test_mmr_diversifies_and_drops_duplicates():
+    query = [1.0, 0.0]
+    vectors = [[1.0, 0.1], [1.0, 0.11], [0.6, 0.8]]
+
+    assert mmr_select(query_vector=query, vectors=vectors, k=2, lambda_mult=0.3) == [0, 2]
+    assert mmr_select(query_vector=query, vectors=vectors, k=3, lambda_mult=1.0,
+                      duplicate_threshold=0.99) == [0, 2]
+
+
+def test_adaptive_cutoff():
+    scores = [0.9, 0.2, 0.85, 0.8]
+
+    assert adaptive_cutoff(scores, min_relative_score=0.5) == [0, 2, 3]
+    assert adaptive_cutoff(scores, max_score_gap=0.3) == [0, 2, 3]
+    assert adaptive_cutoff(scores, min_relative_score=0.99, min_results=2) == [0, 2]
@@ -0,0 +1,118 @@
+"""
+Tracing with TRACING_EXPORTER="memory": the rag.*, llm.*, vectordb.* and SQL
+spans, read back from the in-memory exporter.
+"""
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from controllers import NLPController
+from fastapi import FastAPI
+from helpers import get_settings
+from models.db_schemes import Project, DataChunk
+from sqlalchemy import create_engine, text as sql_text
+from stores.llm.LLMProviderFactory import LLMProviderFactory
+from stores.vectordb.VectorDBTracing import TracedVectorDBProvider
+from stores.vectordb.providers.QdrantDBProvider import QdrantDBProvider
+from types import SimpleNamespace
+from utils import tracing
+import asyncio
+
+EMBEDDING_SIZE = 16
+
+
+@pytest.fixture(scope="module")
+def span_exporter():
+    settings = get_settings()
+    settings.TRACING_ENABLED = True
+    settings.TRACING_EXPORTER = tracing.EXPORTER_MEMORY
+    settings.TRACING_SAMPLE_RATIO = 1.0
+
+    app = FastAPI()
+    tracing.setup_tracing(app, settings)
+    yield tracing.memory_exporter
+
+    tracing.shutdown_tracing(app)
+    tracing.tracer = None
+    tracing.memory_exporter = None
+
+
+@pytest.fixture
+def spans(span_exporter):
+    span_exporter.clear()
+
+    def finished_spans(name: str) -> list:
+        return [span for span in span_exporter.get_finished_spans() if span.name == name]
+
+    return finished_spans
+
+
+@pytest.fixture
+def nlp_controller(span_exporter, tmp_path):
+    settings = get_settings()
+    llm_provider = LLMProviderFactory(settings).create("FAKE")
+    llm_provider.set_generation_model("fake-chat")
+    llm_provider.set_embedding_model("fake-embed", EMBEDDING_SIZE)
+
+    vectordb_client = TracedVectorDBProvider(
+        QdrantDBProvider(db_client=str(tmp_path), default_vector_size=EMBEDDING_SIZE, distance_method="cosine"),
+        provider_name="QDRANT",
+    )
+    asyncio.run(vectordb_client.connect())
+    yield NLPController(vectordb_client=vectordb_client, generation_client=llm_provider,
+                        embedding_client=llm_provider, template_parser=None)
+    asyncio.run(vectordb_client.disconnect())
+
+
+def test_search_spans(nlp_controller, spans):
+    project = Project(project_id=1)
+    chunks = [DataChunk(chunk_text=f"document {i} about retrieval", chunk_metadata={}) for i in range(5)]
+
+    async def run():
+        assert await nlp_controller.index_into_vector_db(project=project, chunks=chunks,
+                                                         chunks_ids=list(range(1, 6)))
+        return await nlp_controller.search_vector_db_collection(project=project, text="retrieval", limit=2)
+
+    assert asyncio.run(run())
+
+    for name in ("rag.query_embed", "rag.vector_search", "llm.embed", "vectordb.insert_many", "vectordb.search"):
+        assert spans(name), f"missing span {name}"
+
+    [query_embed] = spans("rag.query_embed")
+    assert query_embed.attributes["project.id"] == 1
+
+    # the embedding call of the query is a child of its stage span and carries the reported usage
+    [query_embedding] = [span for span in spans("llm.embed")
+                         if span.parent and span.parent.span_id == query_embed.context.span_id]
+    assert query_embedding.attributes["gen_ai.usage.input_tokens"] > 0
+
+    [search] = spans("vectordb.search")
+    assert search.parent.span_id == spans("rag.vector_search")[0].context.span_id
+    assert search.attributes["db.system"] == "qdrant"
+    assert search.attributes["db.response.returned_rows"] > 0
+
+
+def test_llm_spans_carry_reported_usage(nlp_controller, spans):
+    answer = asyncio.run(nlp_controller.generation_client.generate_text("what is retrieval?", chat_history=[]))
+    assert answer
+
+    [generate] = spans("llm.generate")
+    assert generate.attributes["gen_ai.system"] == "FAKE"
+    assert generate.attributes["gen_ai.request.model"] == "fake-chat"
+    assert generate.attributes["gen_ai.usage.output_tokens"] > 0
+    assert "gen_ai.usage.input_tokens" in generate.attributes
+
+
+def test_db_spans(span_exporter, spans):
+    engine = SimpleNamespace(sync_engine=create_engine("sqlite://"))
+    tracing.setup_db_tracing(engine, name="test")
+
+    with tracing.start_span("parent") as parent:
+        with engine.sync_engine.connect() as connection:
+            connection.execute(sql_text("SELECT 1"))
+
+    [select] = spans("SELECT")
+    assert select.parent.span_id == parent.context.span_id
+    assert select.attributes["db.system"] == "sqlite"
+    assert select.attributes["db.operation.name"] == "SELECT"
+    assert select.attributes["db.engine"] == "test"
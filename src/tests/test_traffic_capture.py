@@ -0,0 +1,42 @@
+"""
+Scrubbing of the captured query texts.
+"""
+from utils.traffic_capture import sanitize_text
+import pytest
+
+
+@pytest.mark.parametrize("text", [
+    "call me at 555-123-4567",
+    "call me at (555) 123-4567",
+    "call me at +1 (555) 123-4567",
+    "call me at +44 20 7946 0958",
+    "call me at 555-1234",
+    "call me at 06 12 34 56 78",
+    "call me at 5551234567",
+    "my card is 4111 1111 1111 1111",
+    "my card is 4111-1111-1111-1111",
+    "my card is 4111111111111111",
+    "my card is 3782 822463 10005",
+])
+def test_phone_and_card_numbers_are_scrubbed(text):
+    scrubbed = sanitize_text(text)
+    assert scrubbed.endswith("<number>"), scrubbed
+    assert not any(c.isdigit() for c in scrubbed), scrubbed
+
+
+@pytest.mark.parametrize("text", [
+    "invoices of 2024-01-15",
+    "invoices from 15.01.2024 to 20/02/2024",
+    "sales between 1990-2024",
+    "orders at 10:30-11:45",
+    "top 10 results for 2023",
+    "version 3.12.1 release notes",
+    "order 20240115",
+])
+def test_dates_and_short_numbers_are_kept(text):
+    assert sanitize_text(text) == text
+
+
+def test_emails_and_urls_are_scrubbed():
+    assert sanitize_text("mail jane.doe@example.com or see https://example.com/x?y=1") == \
+        "mail <email> or see <url>"
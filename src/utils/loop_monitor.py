@@ -0,0 +1,95 @@
+from utils.metrics import EVENT_LOOP_LAG, EVENT_LOOP_BLOCKED
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopMonitor:
+    """
+    Measures the event loop lag and reports the callbacks blocking it.
+
+    A task sleeps `interval_ms` in a loop and records how late it wakes up into
+    the lag histogram. A watchdog thread checks that task's heartbeat: when the
+    loop is late by more than `block_threshold_ms`, it samples the stack of the
+    loop thread while it is still blocked and logs it, once per stall.
+    """
+
+    def __init__(self, interval_ms: float = 250.0, block_threshold_ms: float = 100.0, stack_depth: int = 20):
+        self.interval = interval_ms / 1000.0
+        self.block_threshold = block_threshold_ms / 1000.0
+        self.stack_depth = stack_depth
+
+        self.heartbeat = None
+        self.loop_thread_id = None
+        self.task = None
+        self.watchdog = None
+        self.stopped = threading.Event()
+
+    async def start(self):
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.stopped.clear()
+        self.task = asyncio.create_task(self.measure_lag())
+        self.watchdog = threading.Thread(target=self.watch, name="event-loop-watchdog", daemon=True)
+        self.watchdog.start()
+
+    async def stop(self):
+        self.stopped.set()
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.watchdog:
+            await asyncio.to_thread(self.watchdog.join)
+            self.watchdog = None
+
+    async def measure_lag(self):
+        while True:
+            expected_at = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected_at, 0.0)
+            EVENT_LOOP_LAG.observe(lag)
+            self.heartbeat = now
+
+            if lag >= self.block_threshold:
+                logger.warning("Event loop was blocked for %.0f ms", lag * 1000)
+
+    def watch(self):
+        # poll often enough to catch the loop thread within the stall
+        check_interval = max(self.block_threshold / 2, 0.005)
+        reported_heartbeat = None
+
+        while not self.stopped.wait(check_interval):
+            heartbeat = self.heartbeat
+            late_by = time.monotonic() - heartbeat - self.interval
+            if late_by < self.block_threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            EVENT_LOOP_BLOCKED.inc()
+
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame, limit=self.stack_depth)) if frame else "<unavailable>\n"
+            logger.warning(
+                "Event loop blocked for more than %.0f ms, loop thread stack (innermost last):\n%s",
+                late_by * 1000, stack,
+            )
+
+
+def create_loop_monitor(settings):
+    """The event loop monitor configured by the LOOP_MONITOR_* settings, None if disabled."""
+    if not settings.LOOP_MONITOR_ENABLED:
+        return None
+    return EventLoopMonitor(
+        interval_ms=settings.LOOP_MONITOR_INTERVAL_MS,
+        block_threshold_ms=settings.LOOP_MONITOR_BLOCK_THRESHOLD_MS,
+        stack_depth=settings.LOOP_MONITOR_STACK_DEPTH,
+    )
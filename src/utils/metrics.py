@@ -1,31 +1,158 @@
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from prometheus_client import (Counter, Gauge, Histogram, CollectorRegistry, REGISTRY,
+                               generate_latest, multiprocess, CONTENT_TYPE_LATEST)
+from fastapi import FastAPI, Response
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+import os
 import time
 
+# With several workers, PROMETHEUS_MULTIPROC_DIR (set before start, emptied on deploy)
+# makes every process write its samples there and /metrics aggregate them
+MULTIPROCESS_MODE = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
 # Initialize Prometheus metrics
 REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP Requests', ['method', 'endpoint', 'status'])
 REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP Request Latency', ['method', 'endpoint'])
+REQUEST_IN_PROGRESS = Gauge('http_requests_in_progress', 'HTTP Requests being served', ['method'],
+                            multiprocess_mode='livesum')
+
+# endpoint label of requests matching no route, instead of their raw path
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+# RAG pipeline metrics
+RAG_STAGE_LATENCY = Histogram('rag_stage_duration_seconds', 'RAG pipeline stage latency', ['stage', 'provider', 'backend'],
+                              buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+RAG_STAGE_COUNT = Counter('rag_stage_total', 'RAG pipeline stage executions', ['stage', 'provider', 'backend', 'status'])
+
+# Database pool and query metrics
+DB_POOL_CHECKOUT_WAIT = Histogram('db_pool_checkout_wait_seconds', 'Time waited for a pooled DB connection', ['engine'],
+                                  buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30))
+DB_POOL_IN_USE = Gauge('db_pool_connections_in_use', 'DB connections checked out of the pool', ['engine'],
+                       multiprocess_mode='livesum')
+DB_POOL_IDLE = Gauge('db_pool_connections_idle', 'Idle DB connections in the pool', ['engine'],
+                     multiprocess_mode='livesum')
+DB_QUERY_LATENCY = Histogram('db_query_duration_seconds', 'DB query latency', ['engine', 'operation'],
+                             buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30))
+DB_REPLICA_LAG = Gauge('db_replica_lag_seconds', 'Replication lag of a read replica', ['engine'],
+                       multiprocess_mode='livemax')
+
+# LLM rate limiter metrics
+LLM_RATE_LIMIT_QUEUE_DEPTH = Gauge('llm_rate_limit_queue_depth', 'LLM calls waiting for the rate limiter', ['provider', 'priority'],
+                                   multiprocess_mode='livesum')
+LLM_RATE_LIMIT_WAIT = Histogram('llm_rate_limit_wait_seconds', 'LLM call wait time in the rate limiter', ['provider', 'priority'],
+                                buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
+
+# LLM usage reported by the providers
+LLM_TOKEN_USAGE = Counter('llm_token_usage_total', 'LLM tokens billed by the providers',
+                          ['project', 'endpoint', 'provider', 'model', 'kind'])
+LLM_COST = Counter('llm_cost_usd_total', 'LLM cost in USD from the configured token prices',
+                   ['project', 'endpoint', 'provider', 'model'])
+
+# Event loop health
+EVENT_LOOP_LAG = Histogram('event_loop_lag_seconds', 'Delay of the event loop in running a due timer',
+                           buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+EVENT_LOOP_BLOCKED = Counter('event_loop_blocked_total', 'Event loop stalls longer than the blocking threshold')
+
+def format_server_timing(timings: dict) -> str:
+    """Format stage durations (seconds) as a Server-Timing header value."""
+    return ", ".join(f"{stage};dur={duration * 1000:.1f}" for stage, duration in timings.items())
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and in-flight requests.
+
+    Requests are labelled with the template of the route that served them
+    (e.g. /api/v1/nlp/index/answer/{project_id}), so the number of series stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request:Request, call_next):
-        
-        start_time = time.time()
-        
-        response = await call_next(request)
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-        duration = time.time() - start_time
-        endpoint = request.url.path
+        in_progress = REQUEST_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            in_progress.dec()
+
+            # the router stores the matched route in the scope
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or UNMATCHED_ENDPOINT
+
+            REQUEST_LATENCY.labels(method=method, endpoint=endpoint).observe(duration)
+            REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=status_code).inc()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool recording how long callers wait for a connection."""
+    metrics_label = "primary"
+
+    def connect(self):
+        start_time = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(engine=self.metrics_label).observe(time.perf_counter() - start_time)
+
+
+def setup_db_metrics(engine, name: str = "primary"):
+    """Export pool usage and query durations of an async SQLAlchemy engine."""
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+    pool.metrics_label = name
+
+    def update_pool_gauges(*args):
+        DB_POOL_IN_USE.labels(engine=name).set(pool.checkedout())
+        DB_POOL_IDLE.labels(engine=name).set(pool.checkedin())
+
+    event.listen(sync_engine, "checkout", update_pool_gauges)
+    event.listen(sync_engine, "checkin", update_pool_gauges)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get("query_start_time")
+        if not start_times:
+            return
+        operation = statement.lstrip().split(" ", 1)[0].upper() if statement else "UNKNOWN"
+        DB_QUERY_LATENCY.labels(engine=name, operation=operation).observe(time.perf_counter() - start_times.pop())
 
-        REQUEST_LATENCY.labels(method=request.method, endpoint=endpoint).observe(duration)
-        REQUEST_COUNT.labels(method=request.method, endpoint=endpoint, status=response.status_code).inc()
 
-        return response
-    
 def setup_metrics(app: FastAPI):
 
     app.add_middleware(PrometheusMiddleware)
 
     @app.get("/TrhBVe_m5gg2002_E5VVqS", include_in_schema=False)
     def metrics():
-        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
+        registry = REGISTRY
+        if MULTIPROCESS_MODE:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_metrics_process_dead():
+    """Drop the live gauges of the current worker from the multiprocess aggregation."""
+    if MULTIPROCESS_MODE:
+        multiprocess.mark_process_dead(os.getpid())
\ No newline at end of file
@@ -0,0 +1,176 @@
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+from typing import List, Optional
+import asyncio
+import cProfile
+import hmac
+import json
+import logging
+import marshal
+import os
+import random
+import time
+import uuid
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # optional: fall back to cProfile
+    Profiler = None
+
+PROFILE_TOKEN_HEADER = b"x-admin-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileStore:
+    """
+    Directory of request profiles: `<id>.html` (pyinstrument) or `<id>.pstats`
+    (cProfile), each with a `<id>.json` sidecar describing the request.
+    """
+
+    def __init__(self, directory: str, max_profiles: int = 200):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        os.makedirs(self.directory, exist_ok=True)
+
+    def save(self, profile_id: str, extension: str, content, meta: dict):
+        mode = "w" if isinstance(content, str) else "wb"
+        with open(os.path.join(self.directory, f"{profile_id}.{extension}"), mode) as f:
+            f.write(content)
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as f:
+            json.dump({**meta, "id": profile_id, "format": extension}, f)
+        self.prune()
+
+    def list(self) -> List[dict]:
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return sorted(profiles, key=lambda p: p.get("created_at", 0), reverse=True)
+
+    def get_path(self, profile_id: str) -> Optional[str]:
+        if not profile_id.isalnum():
+            return None
+        for extension in ("html", "pstats"):
+            path = os.path.join(self.directory, f"{profile_id}.{extension}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def prune(self):
+        for profile in self.list()[self.max_profiles:]:
+            for extension in ("html", "pstats", "json"):
+                path = os.path.join(self.directory, f"{profile['id']}.{extension}")
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling the requests carrying the admin token header,
+    plus a random `sample_rate` fraction of the others.
+
+    One request is profiled at a time per process: the Python profilers hook the
+    whole thread, so concurrent requests would mix in the same profile.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, admin_token: str = None,
+                 sample_rate: float = 0.0, interval_ms: float = 1.0):
+        self.app = app
+        self.store = store
+        self.admin_token = admin_token.encode("utf-8") if admin_token else None
+        self.sample_rate = sample_rate or 0.0
+        self.interval = interval_ms / 1000.0
+        self.active = False
+
+    def should_profile(self, scope: Scope) -> bool:
+        if self.active:
+            return False
+
+        if self.admin_token:
+            for name, value in scope.get("headers", []):
+                if name == PROFILE_TOKEN_HEADER and hmac.compare_digest(value, self.admin_token):
+                    return True
+
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self.active = True
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        if Profiler is not None:
+            profiler = Profiler(interval=self.interval, async_mode="enabled")
+            start, stop = profiler.start, profiler.stop
+        else:
+            profiler = cProfile.Profile()
+            start, stop = profiler.enable, profiler.disable
+
+        started_at = time.time()
+        start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stop()
+            self.active = False
+
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "created_at": started_at,
+                "duration_ms": round((time.time() - started_at) * 1000, 3),
+            }
+            try:
+                await asyncio.to_thread(self.save_profile, profiler, profile_id, meta)
+            except Exception as e:
+                logger.error(f"Failed to store profile {profile_id}: {e}")
+
+    def save_profile(self, profiler, profile_id: str, meta: dict):
+        if Profiler is not None:
+            self.store.save(profile_id, "html", profiler.output_html(), meta)
+            return
+
+        # same content as Profile.dump_stats, readable with pstats.Stats(path)
+        profiler.create_stats()
+        self.store.save(profile_id, "pstats", marshal.dumps(profiler.stats), meta)
+
+
+def setup_profiling(app: FastAPI, settings):
+    """
+    Install the profiling middleware when `PROFILING_ENABLED`; otherwise nothing
+    is added to the request path.
+    """
+    app.profile_store = None
+    if not settings.PROFILING_ENABLED:
+        return
+
+    directory = settings.PROFILING_DIR
+    if not os.path.isabs(directory):
+        directory = os.path.join(os.path.dirname(os.path.dirname(__file__)), directory)
+
+    app.profile_store = ProfileStore(directory=directory, max_profiles=settings.PROFILING_MAX_PROFILES)
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=app.profile_store,
+        admin_token=settings.PROFILING_ADMIN_TOKEN,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval_ms=settings.PROFILING_INTERVAL_MS,
+    )
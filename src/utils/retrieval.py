@@ -0,0 +1,84 @@
+from typing import List, Optional
+import numpy as np
+
+
+def mmr_select(query_vector: list, vectors: List[list], k: int,
+                lambda_mult: float = 0.7, duplicate_threshold: Optional[float] = None) -> List[int]:
+    """
+    Select up to `k` candidates with Maximal Marginal Relevance.
+
+    Each step picks the candidate maximizing
+    `lambda_mult * relevance - (1 - lambda_mult) * max_similarity_to_selected`,
+    where both terms are cosine similarities. The vector db scores are not used, their
+    scale depends on the backend and distance, `lambda_mult` would not weigh the same.
+
+    :param query_vector: The query embedding.
+    :param vectors: The candidate embeddings.
+    :param k: The number of candidates to select.
+    :param lambda_mult: 1.0 keeps the pure relevance order, 0.0 maximizes diversity.
+    :param duplicate_threshold: Candidates with a cosine similarity above this value to an
+                                already selected one are dropped (optional).
+    :return: The indices of the selected candidates, in selection order.
+    """
+    if len(vectors) == 0 or k <= 0:
+        return []
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+
+    query = np.asarray(query_vector, dtype=np.float32)
+    query /= max(float(np.linalg.norm(query)), 1e-12)
+
+    relevance = matrix @ query
+    similarity = matrix @ matrix.T
+
+    max_similarity = np.zeros(len(vectors), dtype=np.float32)
+    available = np.ones(len(vectors), dtype=bool)
+    selected = []
+
+    while len(selected) < k and available.any():
+        mmr = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        mmr[~available] = -np.inf
+
+        best = int(np.argmax(mmr))
+        selected.append(best)
+        available[best] = False
+
+        max_similarity = np.maximum(max_similarity, similarity[best])
+        if duplicate_threshold is not None:
+            available &= similarity[best] < duplicate_threshold
+
+    return selected
+
+
+def adaptive_cutoff(scores: List[float], min_relative_score: Optional[float] = None,
+                    max_score_gap: Optional[float] = None, min_results: int = 1) -> List[int]:
+    """
+    Drop the candidates that fall far below the best score.
+
+    :param scores: The relevance scores of the candidates.
+    :param min_relative_score: Keep candidates scoring at least this fraction of the best score.
+    :param max_score_gap: Cut everything after the first drop larger than this between
+                          consecutive scores (in descending order).
+    :param min_results: The minimum number of candidates to keep.
+    :return: The indices of the kept candidates, in their original order.
+    """
+    if len(scores) == 0:
+        return []
+
+    order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")
+    ranked = np.asarray(scores, dtype=np.float64)[order]
+
+    keep = len(ranked)
+    if min_relative_score is not None and ranked[0] > 0:
+        keep = min(keep, int(np.sum(ranked >= ranked[0] * min_relative_score)))
+
+    if max_score_gap is not None and len(ranked) > 1:
+        gaps = np.nonzero(ranked[:-1] - ranked[1:] > max_score_gap)[0]
+        if len(gaps):
+            keep = min(keep, int(gaps[0]) + 1)
+
+    keep = max(keep, min(min_results, len(ranked)))
+    kept = set(order[:keep].tolist())
+
+    return [i for i in range(len(scores)) if i in kept]
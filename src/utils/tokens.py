@@ -0,0 +1,9 @@
+from typing import List
+
+
+def estimate_tokens(texts: List[str]) -> int:
+    """
+    Rough token count of texts, ~4 characters per token, for the places that
+    need one before the provider reports the billed usage.
+    """
+    return sum(len(t or "") for t in texts) // 4
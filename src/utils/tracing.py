@@ -0,0 +1,216 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi import FastAPI
+from sqlalchemy import event
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+import logging
+
+try:
+    from opentelemetry import trace, propagate
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # optional: tracing stays disabled
+    trace = None
+
+# span exporters selectable with TRACING_EXPORTER
+EXPORTER_OTLP = "otlp"
+EXPORTER_CONSOLE = "console"
+EXPORTER_MEMORY = "memory"
+
+# statements longer than this are truncated in the db spans
+MAX_STATEMENT_LENGTH = 2000
+
+logger = logging.getLogger(__name__)
+
+# set by setup_tracing; while None every helper below is a no-op
+tracer = None
+# the InMemorySpanExporter when TRACING_EXPORTER="memory", for tests to read the spans
+memory_exporter = None
+# the span of the LLM call in progress, receiving the token usage the provider reports
+current_llm_span = ContextVar("current_llm_span", default=None)
+
+
+def is_tracing_enabled() -> bool:
+    return tracer is not None
+
+
+@contextmanager
+def start_span(name: str, kind=None, **attributes):
+    """
+    Run the block in a child span of the current one. Attributes set to None are
+    skipped; exceptions are recorded on the span and re-raised.
+    Yields None when tracing is disabled.
+    """
+    if tracer is None:
+        yield None
+        return
+
+    with tracer.start_as_current_span(
+        name,
+        kind=kind if kind is not None else SpanKind.INTERNAL,
+        attributes={k: v for k, v in attributes.items() if v is not None},
+    ) as span:
+        yield span
+
+
+def set_span_attributes(span, **attributes):
+    """Set the attributes not None on a span yielded by `start_span`."""
+    if span is None:
+        return
+    for key, value in attributes.items():
+        if value is not None:
+            span.set_attribute(key, value)
+
+
+def set_span_error(span, description: str = None):
+    """Mark a span yielded by `start_span` as failed without an exception."""
+    if span is None:
+        return
+    span.set_status(Status(StatusCode.ERROR, description))
+
+
+def set_llm_usage_attributes(input_tokens: int, output_tokens: int = None):
+    """Set the billed token counts on the span of the LLM call in progress, if any."""
+    set_span_attributes(
+        current_llm_span.get(),
+        **{"gen_ai.usage.input_tokens": input_tokens, "gen_ai.usage.output_tokens": output_tokens},
+    )
+
+
+def create_exporter(settings):
+    if settings.TRACING_EXPORTER == EXPORTER_MEMORY:
+        return InMemorySpanExporter()
+    if settings.TRACING_EXPORTER == EXPORTER_CONSOLE:
+        return ConsoleSpanExporter()
+    if settings.TRACING_EXPORTER == EXPORTER_OTLP:
+        # opentelemetry-exporter-otlp-proto-http, also configurable by the OTEL_EXPORTER_OTLP_* env vars
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        if settings.TRACING_OTLP_ENDPOINT:
+            return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+        return OTLPSpanExporter()
+    raise ValueError(f"Unknown TRACING_EXPORTER: {settings.TRACING_EXPORTER}")
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening the server span of each request, continuing the
+    trace of the `traceparent` header sent by nginx or the calling service.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope.get("headers", [])}
+        method = scope["method"]
+
+        with tracer.start_as_current_span(
+            method,
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # the route template is only known once the router matched the request
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.set_attribute("http.route", route)
+                    span.update_name(f"{method} {route}")
+
+
+def setup_db_tracing(engine, name: str = "primary"):
+    """Open a client span around every statement of an async SQLAlchemy engine."""
+    if tracer is None:
+        return
+
+    sync_engine = engine.sync_engine
+    url = sync_engine.url
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(" ", 1)[0].upper() if statement else "UNKNOWN"
+        span = tracer.start_span(
+            f"{operation} {url.database}" if url.database else operation,
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": sync_engine.dialect.name,
+                "db.namespace": url.database or "",
+                "db.operation.name": operation,
+                "db.query.text": (statement or "")[:MAX_STATEMENT_LENGTH],
+                "db.engine": name,
+                "server.address": url.host or "",
+            },
+        )
+        conn.info.setdefault("tracing_spans", []).append(span)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("tracing_spans")
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("tracing_spans") if conn is not None else None
+        if not spans:
+            return
+        span = spans.pop()
+        span.record_exception(exception_context.original_exception)
+        span.set_status(Status(StatusCode.ERROR, type(exception_context.original_exception).__name__))
+        span.end()
+
+
+def setup_tracing(app: FastAPI, settings):
+    """
+    Configure the OpenTelemetry tracer when `TRACING_ENABLED`; otherwise nothing
+    is added to the request path and the span helpers stay no-ops.
+    """
+    global tracer, memory_exporter
+
+    if not settings.TRACING_ENABLED:
+        return
+    if trace is None:
+        logger.warning("TRACING_ENABLED is set but opentelemetry-sdk is not installed, tracing disabled")
+        return
+
+    exporter = create_exporter(settings)
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    if settings.TRACING_EXPORTER == EXPORTER_MEMORY:
+        # synchronous export, so the spans are readable as soon as they end
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        memory_exporter = exporter
+    else:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+
+    app.tracer_provider = provider
+    tracer = provider.get_tracer("minirag")
+    app.add_middleware(TracingMiddleware)
+
+
+def shutdown_tracing(app: FastAPI):
+    """Flush the pending spans of the batch processor."""
+    provider = getattr(app, "tracer_provider", None)
+    if provider is not None:
+        provider.shutdown()
@@ -0,0 +1,190 @@
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+from typing import Iterable, Optional
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+# routes whose requests are captured
+CAPTURED_ROUTES = (
+    "/api/v1/nlp/index/search/{project_id}",
+    "/api/v1/nlp/index/answer/{project_id}",
+)
+# body fields kept in the capture, everything else is dropped
+CAPTURED_FIELDS = ("text", "limit")
+# captured bodies larger than this are skipped
+MAX_BODY_BYTES = 64 * 1024
+
+# personal data scrubbed from the captured query texts
+REDACTIONS = [
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"\bhttps?://\S+"), "<url>"),
+    # card numbers grouped by 4 (or 4-6-5), and long digit runs: unformatted cards and phones
+    (re.compile(r"\b\d{4}(?:[ -]\d{4}){2}[ -]\d{1,7}\b|\b\d{4}[ -]\d{6}[ -]\d{5}\b"), "<number>"),
+    (re.compile(r"\b\d{9,19}\b"), "<number>"),
+    # phone numbers: optional country code, area code and a 3-4 digit group, or a bare
+    # 3-4 local number; a 4 digit group with a separator is required, dates and year
+    # ranges (2024-01-15, 1990-2024) do not match
+    (re.compile(r"""
+        (?<![\w+])
+        (?:
+            (?:\+\d{1,3}[ .-]?)?
+            (?:\(\d{1,4}\)|\d{2,4})
+            [ .-]?\d{3,4}
+          | \d{3}
+        )
+        [ .-]\d{4}\b
+    """, re.VERBOSE), "<number>"),
+    # phone numbers written in pairs (06 12 34 56 78)
+    (re.compile(r"(?<![\w+])\d{2}(?:[ .-]\d{2}){4}\b"), "<number>"),
+]
+
+logger = logging.getLogger(__name__)
+
+
+def sanitize_text(text: str, redact_text: bool = False) -> str:
+    """
+    Scrub emails, urls and phone/card-like numbers from a query. With `redact_text`,
+    the words themselves are replaced, only the word count and lengths are kept.
+    """
+    for pattern, replacement in REDACTIONS:
+        text = pattern.sub(replacement, text)
+    if redact_text:
+        text = " ".join("x" * len(word) for word in text.split())
+    return text
+
+
+def sanitize_body(body: dict, redact_text: bool = False) -> dict:
+    sanitized = {k: body[k] for k in CAPTURED_FIELDS if k in body}
+    if isinstance(sanitized.get("text"), str):
+        sanitized["text"] = sanitize_text(sanitized["text"], redact_text=redact_text)
+    return sanitized
+
+
+class TrafficRecorder:
+    """
+    Appends the captured requests to a JSONL file, one request per line; the writes
+    run in a worker thread so the event loop never waits on the disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    async def record(self, record: dict):
+        try:
+            await asyncio.to_thread(self.write, record)
+        except Exception as e:
+            logger.error(f"Failed to capture request: {e}")
+
+
+class TrafficCaptureMiddleware:
+    """
+    Pure ASGI middleware recording a `sample_rate` fraction of the search and answer
+    requests (time, project, sanitized body, status, latency) for replay.
+    """
+
+    def __init__(self, app: ASGIApp, recorder: TrafficRecorder, sample_rate: float = 1.0,
+                 redact_text: bool = False, routes: Iterable[str] = CAPTURED_ROUTES):
+        self.app = app
+        self.recorder = recorder
+        self.sample_rate = sample_rate
+        self.redact_text = redact_text
+        self.routes = set(routes)
+
+    def should_capture(self, scope: Scope) -> bool:
+        # the route is only matched downstream, a cheap path check first
+        return (scope["type"] == "http" and scope["method"] == "POST" and "/index/" in scope["path"]
+                and random.random() < self.sample_rate)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not self.should_capture(scope):
+            await self.app(scope, receive, send)
+            return
+
+        chunks, body_size = [], 0
+        status_code = 500
+
+        async def receive_wrapper() -> Message:
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request" and body_size <= MAX_BODY_BYTES:
+                body_size += len(message.get("body", b""))
+                chunks.append(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        timestamp = time.time()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started_at
+            record = self.build_record(scope, b"".join(chunks), body_size, timestamp, duration, status_code)
+            if record is not None:
+                await self.recorder.record(record)
+
+    def build_record(self, scope: Scope, body: bytes, body_size: int, timestamp: float,
+                     duration: float, status_code: int) -> Optional[dict]:
+        endpoint = getattr(scope.get("route"), "path", None)
+        if endpoint not in self.routes or body_size > MAX_BODY_BYTES:
+            return None
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return None
+        if not isinstance(payload, dict):
+            return None
+
+        project_id = scope.get("path_params", {}).get("project_id")
+        if isinstance(project_id, str) and project_id.isdigit():
+            project_id = int(project_id)
+
+        return {
+            "timestamp": round(timestamp, 6),
+            "method": scope["method"],
+            "endpoint": endpoint,
+            "project_id": project_id,
+            "body": sanitize_body(payload, redact_text=self.redact_text),
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+        }
+
+
+def setup_traffic_capture(app: FastAPI, settings):
+    """
+    Install the capture middleware when `TRAFFIC_CAPTURE_ENABLED`; otherwise nothing
+    is added to the request path.
+    """
+    if not settings.TRAFFIC_CAPTURE_ENABLED:
+        return
+
+    path = settings.TRAFFIC_CAPTURE_PATH
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+    # one file per worker process, appended concurrently otherwise
+    root, extension = os.path.splitext(path)
+    path = f"{root}-{os.getpid()}{extension or '.jsonl'}"
+
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        recorder=TrafficRecorder(path),
+        sample_rate=settings.TRAFFIC_CAPTURE_SAMPLE_RATE,
+        redact_text=settings.TRAFFIC_CAPTURE_REDACT_TEXT,
+    )